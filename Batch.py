@@ -0,0 +1,217 @@
+from analysis import popup_warnings
+from analysis.result_cache import content_hash
+from analysis.results_store import ResultsStore
+from Main import Main, read_main_inputs
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+###############################################################################
+# KBE APPLICATION BATCH FILE                                                  #
+# From this file, the KBE application is run without the ParaPy GUI. The      #
+# chosen outputs are evaluated and written to a JSON report. Warnings are     #
+# collected in the report instead of showing warning boxes.                   #
+#                                                                             #
+# Inputs:                                                                     #
+# - Geometry input .dat file                                                  #
+# - Flow conditions input .dat file                                           #
+# - Material properties input .dat file                                       #
+# - The outputs to evaluate: forces, weights, failure, distributions and/or   #
+#   step                                                                      #
+###############################################################################
+
+OUTPUTS = ["forces", "weights", "failure", "distributions", "step"]
+
+FAILURE_MODES = ["tensile_yielding", "compressive_buckling", "shear_yielding",
+                 "shear_buckling", "bending_deflection", "column_buckling"]
+
+# The entries of the report for each of the outputs
+OUTPUT_ENTRIES = {"forces": ["total_force", "c_l", "c_d", "ld_ratio"],
+                  "weights": ["skin_thickness", "n_ribs", "weight_mainplate",
+                              "weight_endplate", "weight_strut",
+                              "weight_ribs", "total_weight"],
+                  "failure": ["failure", "due_to_ribs"]
+                  + ["modes." + mode for mode in FAILURE_MODES],
+                  "distributions": ["span_position", "lift_distribution",
+                                    "drag_distribution", "deflection_z",
+                                    "deflection_x", "bending_moment_x",
+                                    "bending_moment_z",
+                                    "maximum_tensile_stress",
+                                    "maximum_compressive_stress",
+                                    "maximum_shear_stress"],
+                  "step": ["step_file"]}
+
+
+def to_builtin(value):
+    """ Convert numpy values (also inside lists, tuples and dictionaries) to
+    the corresponding Python types, such that they can be written to JSON.
+    """
+    if isinstance(value, dict):
+        return {key: to_builtin(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [to_builtin(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def evaluate_forces(obj):
+    """ Evaluate the aerodynamic forces and coefficients of the spoiler. """
+    analysis = obj.avl_analysis
+    return {'total_force': analysis.total_force,
+            'c_l': analysis.c_l,
+            'c_d': analysis.c_d,
+            'ld_ratio': analysis.ld_ratio}
+
+
+def evaluate_weights(obj):
+    """ Evaluate the sized skin thickness, amount of ribs and the weights of
+    the spoiler components. """
+    skin_thickness, n_ribs = obj.skin_thickness_iterator
+    weights = obj.structural_analysis.weights
+    return {'skin_thickness': skin_thickness,
+            'n_ribs': n_ribs,
+            'weight_mainplate': weights[0],
+            'weight_endplate': weights[1],
+            'weight_strut': weights[2],
+            'weight_ribs': weights[3],
+            'total_weight': weights[4]}
+
+
+def evaluate_failure(obj):
+    """ Evaluate the failure flags of the sized spoiler. If all main plates
+    are analysed, the failure flags of each plate are added as well. """
+    failure, due_to_ribs, modes = obj.structural_analysis.failure
+    report = {'failure': failure,
+              'due_to_ribs': due_to_ribs,
+              'modes': dict(zip(FAILURE_MODES, modes))}
+    if obj.plate_mode == "all":
+        plate_failure = obj.structural_analysis.plate_failure
+        report['plate_failure'] = [plate[0] for plate in plate_failure]
+        report['plate_due_to_ribs'] = [plate[1] for plate in plate_failure]
+    return report
+
+
+def evaluate_distributions(obj):
+    """ Evaluate the spanwise distributions of the sized spoiler: the loads
+    on the critical plate at the sizing velocity, the deflections, the
+    bending moments and the maximum stresses. """
+    structure = obj.structural_analysis
+    bending = structure.bending_xz
+    return {'span_position': bending[4],
+            'lift_distribution': structure.force_z,
+            'drag_distribution': structure.force_x,
+            'deflection_z': bending[2],
+            'deflection_x': bending[3],
+            'bending_moment_x': bending[5],
+            'bending_moment_z': bending[6],
+            'maximum_tensile_stress': structure.maximum_normal_stress[0],
+            'maximum_compressive_stress': structure.maximum_normal_stress[1],
+            'maximum_shear_stress': structure.maximum_shear_stress}
+
+
+def default_step_file(inputs):
+    """ Return the default name of the STEP file of a design, which
+    contains a hash of its inputs. """
+    return "spoiler_" + content_hash(inputs)[:12] + ".stp"
+
+
+def evaluate_step(obj, step_file):
+    """ Write the STEP file of the spoiler geometry and return its name.
+    An error is raised if no file name is given or the file is not
+    written. """
+    if not step_file:
+        raise ValueError("No name of the STEP file is given")
+    obj.step_writer.step_writer_components.write(step_file)
+    if not os.path.isfile(step_file):
+        raise IOError("The STEP file " + step_file + " was not written")
+    return {'step_file': step_file}
+
+
+def evaluate_design(inputs, outputs=OUTPUTS, step_file=None):
+    """ Create the Main object from the inputs dictionary, evaluate the
+    chosen outputs and return the report as a dictionary. Warnings are
+    collected in the report instead of showing warning boxes. If no name of
+    the STEP file is given, it is named after the inputs. The name is
+    resolved against the current directory, so callers that evaluate the
+    design in another directory should give an absolute path. """
+    popup_warnings.set_headless(True)
+    if "step" in outputs:
+        step_file = os.path.abspath(step_file or default_step_file(inputs))
+    # Use the coarse tessellation for the analyses, unless a level of detail
+    # is given in the inputs. The STEP file is always written with the
+    # export level of detail, see Main.step_writer.
+    level_of_detail = inputs.get('level_of_detail', "draft")
+    obj = Main(label="Spoiler", **dict(inputs,
+                                       level_of_detail=level_of_detail))
+
+    report = {'inputs': inputs}
+    if "forces" in outputs:
+        report['forces'] = evaluate_forces(obj)
+    if "weights" in outputs:
+        report['weights'] = evaluate_weights(obj)
+    if "failure" in outputs:
+        report['failure'] = evaluate_failure(obj)
+    if "distributions" in outputs:
+        report['distributions'] = evaluate_distributions(obj)
+    if "step" in outputs:
+        report['step'] = evaluate_step(obj, step_file)
+    report['warnings'] = list(popup_warnings.collected_warnings)
+    return to_builtin(report)
+
+
+def parse_value(text):
+    """ Parse a value given on the command line. Numbers, booleans and lists
+    are read as JSON, anything else is kept as a string. """
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def parse_arguments(arguments=None):
+    """ Parse the command line arguments of the batch run. """
+    parser = argparse.ArgumentParser(
+        description="Run the spoiler KBE application without the GUI.")
+    parser.add_argument("--geometry", default="inputs/input_geometry.dat",
+                        help="geometry input file")
+    parser.add_argument("--flow",
+                        default="inputs/input_flow_conditions.dat",
+                        help="flow conditions input file")
+    parser.add_argument("--material",
+                        default="inputs/input_material_properties.dat",
+                        help="material properties input file")
+    parser.add_argument("--outputs", nargs="+", choices=OUTPUTS,
+                        default=OUTPUTS, help="outputs to evaluate")
+    parser.add_argument("--step-file", default=None,
+                        help="name of the STEP file to write, default is "
+                             "named after a hash of the inputs")
+    parser.add_argument("--report", default="report.json",
+                        help="name of the JSON report to write")
+    parser.add_argument("--store", default=None,
+                        help="directory of a results store to which the "
+                             "report is appended")
+    parser.add_argument("--set", nargs="+", default=[], metavar="NAME=VALUE",
+                        help="override Main inputs, e.g. spoiler_angle=8 "
+                             "sizing_method=bisection")
+    return parser.parse_args(arguments)
+
+
+if __name__ == '__main__':
+    args = parse_arguments()
+    main_inputs = read_main_inputs(args.geometry, args.flow, args.material)
+    for setting in args.set:
+        name, value = setting.split("=", 1)
+        main_inputs[name] = parse_value(value)
+    design_report = evaluate_design(main_inputs, args.outputs,
+                                    args.step_file)
+
+    with open(args.report, 'w') as report_file:
+        json.dump(design_report, report_file, indent=4)
+    print("Report written to " + os.path.abspath(args.report))
+    if args.store is not None:
+        ResultsStore(args.store).append_report(design_report)
+        print("Report appended to " + os.path.abspath(args.store))
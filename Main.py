@@ -3,12 +3,15 @@ from parapy.geom import *
 from parapy.core.validate import *
 
 from analysis.spoiler_files import Spoiler
-from analysis.AVL_main import AvlAnalysis
+from analysis.spoiler_files.level_of_detail import LEVELS_OF_DETAIL
+from analysis.AVL_main import AvlAnalysis, alpha_cases
 from analysis.XFOIL_main import XFoilAnalysis
 from analysis.structural_calculations import StructuralAnalysis
 from analysis.STEP_writer import StepWriter
+from analysis.iteration_methods import find_root, bisect_monotone
 from numpy import round
-from math import cos, tan, radians
+from math import cos, tan, radians, floor, log10
+from analysis.popup_warnings import generate_warning
 from inputs.read_inputs import read_geometry_inputs, read_material_inputs, \
     read_flow_inputs
 
@@ -55,16 +58,36 @@ class Main(GeomBase):
     car_maximum_height = Input(validator=Positive())
     car_middle_to_back_ratio = Input(validator=Range(0.99, 1.51))
 
+    # Level of detail of the tessellation: draft, analysis or export
+    level_of_detail = Input("analysis",
+                            validator=OneOf(list(LEVELS_OF_DETAIL)))
+
     # Aerodynamic Inputs
     velocity = Input()
     maximum_velocity = Input()
     density = Input()
     iteration_parameter = Input("angle")
     target_downforce = Input(0.)
+    iteration_method = Input("increment",
+                             validator=OneOf(["increment", "bracket"]))
+    downforce_tolerance = Input(5.)  # [N], only used by the bracket method
+    aerodynamic_backend = Input("avl", validator=OneOf(["avl", "vlm"]))
+    # Changes of the car attitude [deg] that are analysed as extra AVL cases
+    attitude_changes = Input([])
 
     # Structural Inputs
     spoiler_skin_thickness = Input()
     n_ribs = Input()
+    sizing_method = Input("increment",
+                          validator=OneOf(["increment", "bisection"]))
+    thickness_tolerance = Input(0.05)  # [mm], only used by bisection
+    maximum_skin_thickness = Input(50.)  # [mm], only used by bisection
+    maximum_ribs = Input(20)  # only used by bisection
+    volume_method = Input("analytic", validator=OneOf(["analytic", "occ"]))
+    beam_method = Input("integration",
+                        validator=OneOf(["finite_element", "integration"]))
+    plate_mode = Input("critical", validator=OneOf(["critical", "all"]))
+    sideslip_angle = Input(0.)  # [deg], of the structural load case
     youngs_modulus = Input()
     yield_strength = Input()
     shear_strength = Input()
@@ -95,26 +118,65 @@ class Main(GeomBase):
                        car_length=self.car_length,
                        car_width=self.car_width,
                        car_maximum_height=self.car_maximum_height,
-                       car_middle_to_back_ratio=self.car_middle_to_back_ratio)
+                       car_middle_to_back_ratio=self.car_middle_to_back_ratio,
+                       level_of_detail=self.level_of_detail)
+
+    @Part(in_tree=False)
+    def export_geometry(self):
+        """ Geometry of the spoiler with the export level of detail, from
+        which the STEP file is written. """
+        return Spoiler(spoiler_airfoils=self.spoiler_airfoils,
+                       spoiler_span=self.spoiler_span,
+                       spoiler_chord=self.spoiler_chord,
+                       spoiler_angle=self.spoiler_angle,
+                       plate_amount=self.plate_amount,
+                       plate_distance=self.plate_distance,
+                       strut_amount=self.strut_amount,
+                       strut_airfoil_shape=self.strut_airfoil_shape,
+                       strut_lat_location=self.imposed_strut_width,
+                       strut_height=self.strut_height,
+                       strut_chord_fraction=self.imposed_strut_chord_fraction,
+                       strut_thickness=self.strut_thickness,
+                       strut_sweep=self.strut_sweep,
+                       strut_cant=self.strut_cant,
+                       endplate_present=self.endplate_present,
+                       endplate_thickness=self.endplate_thickness,
+                       endplate_sweep=self.endplate_sweep,
+                       endplate_cant=self.endplate_cant,
+                       car_length=self.car_length,
+                       car_width=self.car_width,
+                       car_maximum_height=self.car_maximum_height,
+                       car_middle_to_back_ratio=self.car_middle_to_back_ratio,
+                       level_of_detail="export")
 
     @Part
     def step_writer(self):
-        """ STEP writer module of the geometry. """
-        return StepWriter(geometry_input=self.geometry)
+        """ STEP writer module of the geometry. The STEP file is always
+        written with the export level of detail. """
+        return StepWriter(geometry_input=self.geometry
+                          if self.level_of_detail == "export"
+                          else self.export_geometry)
 
     @Attribute
     def avl_case(self):
-        """ This attribute creates the AVL case based on the car geometry. """
+        """ This attribute creates the AVL case based on the car geometry.
+        For each of the attitude changes, an extra case is added, which are
+        all run in the same AVL session. The incoming flow angle is always
+        the first case. """
         case = [('Incoming flow angle', {'alpha':
-                                             self.geometry.car_model.avl_angle})]
-        return case
+                                             self.geometry.car_avl_angle})]
+        return case + alpha_cases([self.geometry.car_avl_angle + change
+                                   for change in self.attitude_changes],
+                                  prefix="Attitude")
 
     @action(label="Geometry Iterator")
     def geometry_iterator(self):
         """ This action changes the geometry to achieve a certain downforce
         level. As input, the variable parameter and the target downforce is
         given. The iterator increases the parameter until the downforce is
-        reached. The geometry is changed automatically. """
+        reached. The geometry is changed automatically. If the iteration
+        method is set to "bracket", the parameter is instead solved for
+        with a bracketing root finder, see bracketed_geometry_iterator. """
 
         print("-----------------------------------------------")
         print('Geometry iterator: The chosen parameter will be ')
@@ -140,6 +202,9 @@ class Main(GeomBase):
             print("-----------------------------------------------")
             return None
 
+        if self.iteration_method == "bracket":
+            return self.bracketed_geometry_iterator(current)
+
         # Print the zero measurements on the screen
         print("Iteration #: " + str(iteration_n))
         print("Current downforce: " + str(round(current, 1)) + " [N]")
@@ -162,7 +227,9 @@ class Main(GeomBase):
             current = AvlAnalysis(spoiler_input=self.geometry,
                                   case_settings=self.avl_case,
                                   velocity=self.velocity,
-                                  density=self.density).total_force
+                                  density=self.density,
+                                  backend=self.aerodynamic_backend
+                                  ).total_force
 
             # Print the iteration and current downforce on screen
             print("Iteration #: " + str(iteration_n))
@@ -171,13 +238,67 @@ class Main(GeomBase):
         print("ITERATION FINISHED")
         print("-----------------------------------------------")
 
+    def bracketed_geometry_iterator(self, current):
+        """ This method solves for the iteration parameter that gives the
+        target downforce, within the downforce tolerance. The root is first
+        bracketed by taking increasing steps in the direction of the target,
+        which allows the parameter to decrease as well, after which it is
+        refined with secant and bisection steps. The parameter value, the
+        number of AVL analyses and whether the search converged are printed
+        and returned. If the search did not converge, the parameter is reset
+        to its starting value, which is then the value that is returned. """
+        name, step, lower, upper = ITERATION_PARAMETERS[
+            self.iteration_parameter]
+        start = getattr(self, name)
+        iteration_n = 0
+
+        def downforce_error(value):
+            """ Sets the parameter, runs a new AVL analysis and returns the
+            difference with the target downforce. """
+            nonlocal iteration_n
+            iteration_n += 1
+            setattr(self, name, value)
+            force = AvlAnalysis(spoiler_input=self.geometry,
+                                case_settings=self.avl_case,
+                                velocity=self.velocity,
+                                density=self.density,
+                                backend=self.aerodynamic_backend).total_force
+            print("Iteration #: " + str(iteration_n))
+            print(name + ": " + str(round(value, 3)))
+            print("Current downforce: " + str(round(force, 1)) + " [N]")
+            return force - self.target_downforce
+
+        print("Iteration #: 0")
+        print(name + ": " + str(round(start, 3)))
+        print("Current downforce: " + str(round(current, 1)) + " [N]")
+        value, error, evaluations, converged = find_root(
+            downforce_error, start, current - self.target_downforce, step,
+            lower, upper, self.downforce_tolerance)
+
+        print("")
+        if converged:
+            setattr(self, name, value)
+            print("Converged " + name + ": " + str(round(value, 3)))
+            print("Downforce: " + str(round(error + self.target_downforce,
+                                            1)) + " [N]")
+        else:
+            value = start
+            setattr(self, name, start)
+            print("Target downforce could not be reached within the "
+                  "limits of the parameter.")
+        print("Number of AVL analyses: " + str(evaluations + 1))
+        print("ITERATION FINISHED")
+        print("-----------------------------------------------")
+        return value, evaluations + 1, converged
+
     @Part
     def avl_analysis(self):
         """ AVL Analysis of the given spoiler geometry. """
         return AvlAnalysis(spoiler_input=self.geometry,
                            case_settings=self.avl_case,
                            velocity=self.velocity,
-                           density=self.density)
+                           density=self.density,
+                           backend=self.aerodynamic_backend)
 
     @Part
     def xfoil_analysis(self):
@@ -185,7 +306,7 @@ class Main(GeomBase):
         return XFoilAnalysis(spoiler=self.geometry,
                              velocity=self.velocity,
                              density=self.density,
-                             angle_of_attack=self.geometry.car_model.avl_angle)
+                             angle_of_attack=self.geometry.car_avl_angle)
 
     @Attribute
     def skin_thickness_iterator(self):
@@ -194,7 +315,11 @@ class Main(GeomBase):
         the spoiler. If a failure mode occurs, the skin thickness is
         increased and calculations are performed again. If it turns out that
         the spoiler only fails due to the lack of ribs, the amount of ribs
-        are increased. In the Python Console, a log is printed. """
+        are increased. In the Python Console, a log is printed. Since the
+        aerodynamic loads do not depend on the skin thickness, a single
+        structural analysis is re-evaluated for each candidate. If the
+        sizing method is set to "bisection", the skin thickness and amount
+        of ribs are found with bisected_skin_thickness instead. """
 
         print("-----------------------------------------------")
         print('Structural iterator: the spoiler skin thickness '
@@ -208,43 +333,59 @@ class Main(GeomBase):
         skin_thickness = self.spoiler_skin_thickness / 1000.
         number_of_ribs = self.n_ribs
 
+        # The structural analysis is created once. Only the skin thickness
+        # and the amount of ribs are changed in the iteration loop, such that
+        # the aerodynamic loads and the cutouts of the main plate are not
+        # calculated again for every candidate.
+        structural_analysis = StructuralAnalysis(
+            spoiler_airfoils=self.spoiler_airfoils,
+            spoiler_span=self.spoiler_span / 1000.,
+            spoiler_chord=self.spoiler_chord / 1000.,
+            spoiler_angle=self.spoiler_angle,
+            spoiler_skin_thickness=skin_thickness,
+            plate_amount=self.plate_amount,
+            plate_distance=self.plate_distance,
+            n_ribs=number_of_ribs,
+            strut_amount=self.strut_amount,
+            strut_airfoil_shape=self.strut_airfoil_shape,
+            strut_lat_location=self.imposed_strut_width,
+            strut_height=self.strut_height / 1000.,
+            strut_chord_fraction=self.imposed_strut_chord_fraction,
+            strut_thickness=self.strut_thickness / 1000.,
+            strut_sweep=self.strut_sweep,
+            strut_cant=self.strut_cant,
+            endplate_present=self.endplate_present,
+            endplate_thickness=self.endplate_thickness / 1000.,
+            endplate_sweep=self.endplate_sweep,
+            endplate_cant=self.endplate_cant,
+            car_length=self.car_length / 1000,
+            car_width=self.car_width / 1000,
+            car_maximum_height=self.car_maximum_height / 1000,
+            car_middle_to_back_ratio=self.car_middle_to_back_ratio,
+            maximum_velocity=self.maximum_velocity,
+            air_density=self.density,
+            aerodynamic_backend=self.aerodynamic_backend,
+            youngs_modulus=self.youngs_modulus * 10 ** 9,
+            yield_strength=self.yield_strength,
+            shear_strength=self.shear_strength,
+            material_density=self.material_density,
+            poisson_ratio=self.poisson_ratio,
+            volume_method=self.volume_method,
+            beam_method=self.beam_method,
+            sideslip_angle=self.sideslip_angle,
+            plate_mode=self.plate_mode,
+            level_of_detail=self.level_of_detail)
+
+        if self.sizing_method == "bisection":
+            return self.bisected_skin_thickness(structural_analysis)
+
         # enter iteration loop
         while failure:
             print('Current skin thickness = '
                   + str(round(skin_thickness, (len(str(delta_thickness)) - 2)))
                   + ', amount of ribs = ' + str(number_of_ribs))
-            structural_analysis = StructuralAnalysis(
-                spoiler_airfoils=self.spoiler_airfoils,
-                spoiler_span=self.spoiler_span / 1000.,
-                spoiler_chord=self.spoiler_chord / 1000.,
-                spoiler_angle=self.spoiler_angle,
-                spoiler_skin_thickness=skin_thickness,
-                plate_amount=self.plate_amount,
-                plate_distance=self.plate_distance,
-                n_ribs=number_of_ribs,
-                strut_amount=self.strut_amount,
-                strut_airfoil_shape=self.strut_airfoil_shape,
-                strut_lat_location=self.imposed_strut_width,
-                strut_height=self.strut_height / 1000.,
-                strut_chord_fraction=self.imposed_strut_chord_fraction,
-                strut_thickness=self.strut_thickness / 1000.,
-                strut_sweep=self.strut_sweep,
-                strut_cant=self.strut_cant,
-                endplate_present=self.endplate_present,
-                endplate_thickness=self.endplate_thickness / 1000.,
-                endplate_sweep=self.endplate_sweep,
-                endplate_cant=self.endplate_cant,
-                car_length=self.car_length / 1000,
-                car_width=self.car_width / 1000,
-                car_maximum_height=self.car_maximum_height / 1000,
-                car_middle_to_back_ratio=self.car_middle_to_back_ratio,
-                maximum_velocity=self.maximum_velocity,
-                air_density=self.density,
-                youngs_modulus=self.youngs_modulus * 10 ** 9,
-                yield_strength=self.yield_strength,
-                shear_strength=self.shear_strength,
-                material_density=self.material_density,
-                poisson_ratio=self.poisson_ratio)
+            structural_analysis.spoiler_skin_thickness = skin_thickness
+            structural_analysis.n_ribs = number_of_ribs
 
             failure = structural_analysis.failure[0]
             failure_due_to_ribs = structural_analysis.failure[1]
@@ -259,6 +400,11 @@ class Main(GeomBase):
             for i in range(len(failure_due_to_mode)):
                 if failure_due_to_mode[i]:
                     print(failure_text[i])
+            if self.plate_mode == "all" and failure:
+                print('   -Failing main plates: ' + str(
+                    [plate for plate, plate_failure in
+                     enumerate(structural_analysis.plate_failure)
+                     if plate_failure[0] or plate_failure[1]]))
 
             if failure_due_to_ribs:
                 failure = True
@@ -286,6 +432,80 @@ class Main(GeomBase):
 
         return skin_thickness, number_of_ribs
 
+    def bisected_skin_thickness(self, structural_analysis):
+        """ This method finds the skin thickness and amount of ribs with
+        the lowest total weight for which no failure mode occurs. The
+        failure modes are treated as monotone constraints in the skin
+        thickness: for each amount of ribs, the minimum skin thickness that
+        avoids all failure modes except column buckling is bisected up to
+        the thickness tolerance. If column buckling still occurs, or the
+        weight is still decreasing, the amount of ribs is increased in an
+        outer loop. It returns the skin thickness in meters and the amount
+        of ribs. If no feasible design exists up to the maximum skin
+        thickness and the maximum amount of ribs, a ValueError is raised. """
+        tolerance = self.thickness_tolerance / 1000.
+        decimals = 1 - floor(log10(tolerance))
+        failures = {}
+
+        def evaluate(skin_thickness, number_of_ribs):
+            """ Returns the failure of the spoiler for the given skin
+            thickness and amount of ribs. """
+            if (skin_thickness, number_of_ribs) not in failures:
+                structural_analysis.spoiler_skin_thickness = skin_thickness
+                structural_analysis.n_ribs = number_of_ribs
+                failures[(skin_thickness, number_of_ribs)] = \
+                    structural_analysis.failure
+                print('Skin thickness = '
+                      + str(round(skin_thickness, decimals))
+                      + ', amount of ribs = ' + str(number_of_ribs)
+                      + (': failure' if structural_analysis.failure[0]
+                         else ': no failure'))
+            return failures[(skin_thickness, number_of_ribs)]
+
+        best = None
+        number_of_ribs = self.n_ribs
+        while number_of_ribs <= self.maximum_ribs:
+            skin_thickness, evaluations = bisect_monotone(
+                lambda thickness: not evaluate(thickness,
+                                               number_of_ribs)[0],
+                self.spoiler_skin_thickness / 1000.,
+                self.maximum_skin_thickness / 1000.,
+                tolerance)
+            if skin_thickness is None:
+                print('No feasible skin thickness found')
+                break
+
+            if evaluate(skin_thickness, number_of_ribs)[1]:
+                print('Failure occurred only due to lack of ribs, '
+                      'increasing amount of ribs...')
+            else:
+                structural_analysis.spoiler_skin_thickness = skin_thickness
+                structural_analysis.n_ribs = number_of_ribs
+                weight = structural_analysis.weights[4]
+                print('Feasible design with a total weight of '
+                      + str(round(weight, 4)) + ' kg')
+                if best is not None and weight >= best[2]:
+                    break
+                best = (skin_thickness, number_of_ribs, weight)
+            print("")
+            number_of_ribs += 1
+
+        print("")
+        print("-----------------------------------------------")
+        if best is None:
+            print('No feasible skin thickness and amount of ribs found')
+            print("-----------------------------------------------")
+            raise ValueError("No feasible skin thickness up to "
+                             + str(self.maximum_skin_thickness)
+                             + " mm and amount of ribs up to "
+                             + str(self.maximum_ribs) + " found")
+        print('Final skin thickness = ' + str(round(best[0], decimals))
+              + ' m')
+        print('Final amount of ribs = ' + str(best[1]))
+        print('Calculated total weight = ' + str(round(best[2], 4)) + ' kg')
+        print("-----------------------------------------------")
+        return best[0], best[1]
+
     @Part
     def structural_analysis(self):
         """ Structural analysis for the calculated spoiler geometry,
@@ -322,11 +542,18 @@ class Main(GeomBase):
                                   self.car_middle_to_back_ratio,
                                   maximum_velocity=self.maximum_velocity,
                                   air_density=self.density,
+                                  aerodynamic_backend=
+                                  self.aerodynamic_backend,
                                   youngs_modulus=self.youngs_modulus * 10 ** 9,
                                   yield_strength=self.yield_strength,
                                   shear_strength=self.shear_strength,
                                   material_density=self.material_density,
-                                  poisson_ratio=self.poisson_ratio)
+                                  poisson_ratio=self.poisson_ratio,
+                                  volume_method=self.volume_method,
+                                  beam_method=self.beam_method,
+                                  sideslip_angle=self.sideslip_angle,
+                                  plate_mode=self.plate_mode,
+                                  level_of_detail=self.level_of_detail)
 
     @Attribute
     def imposed_strut_width(self):
@@ -364,28 +591,17 @@ class Main(GeomBase):
             return self.strut_chord_fraction
 
 
-def generate_warning(warning_header, msg):
-    """ Generate a warning box if a condition is violated. Inputs are the
-    warning box header and warning box message. """
-    from tkinter import Tk, messagebox
-
-    window = Tk()
-    window.withdraw()
-
-    messagebox.showwarning(warning_header, msg)
-
-    window.deiconify()
-    window.destroy()
-    window.quit()
+# Parameters of the geometry iterator: the name of the Main input, the step
+# size and the lower and upper limit of the input.
+ITERATION_PARAMETERS = {"angle": ("spoiler_angle", 1., -40., 40.),
+                        "span": ("spoiler_span", 50., 50., float('inf')),
+                        "chord": ("spoiler_chord", 25., 25., float('inf')),
+                        "velocity": ("velocity", 2., 2., float('inf'))}
 
 
-if __name__ == '__main__':
-    from parapy.gui import display
-
-    geometry = "inputs/input_geometry.dat"
-    flow = "inputs/input_flow_conditions.dat"
-    material = "inputs/input_material_properties.dat"
-
+def read_main_inputs(geometry, flow, material):
+    """ Read the geometry, flow conditions and material properties input
+    files and return the inputs of the Main class in a dictionary. """
     # GEOMETRY INPUTS
     (spoiler_airfoils, spoiler_span, spoiler_chord, spoiler_angle,
      plate_amount, strut_amount, strut_airfoil_shape,
@@ -406,37 +622,47 @@ if __name__ == '__main__':
     initial_spoiler_skin_thickness = 1
     initial_n_ribs = 1
 
+    return dict(spoiler_airfoils=spoiler_airfoils,
+                spoiler_span=spoiler_span,
+                spoiler_chord=spoiler_chord,
+                spoiler_angle=spoiler_angle,
+                plate_amount=plate_amount,
+                strut_amount=strut_amount,
+                strut_airfoil_shape=strut_airfoil_shape,
+                strut_lat_location=strut_lat_location,
+                strut_height=strut_height,
+                strut_chord_fraction=strut_chord_fraction,
+                strut_thickness=strut_thickness,
+                strut_sweep=strut_sweep,
+                strut_cant=strut_cant,
+                endplate_present=endplate_present,
+                endplate_thickness=endplate_thickness,
+                endplate_sweep=endplate_sweep,
+                endplate_cant=endplate_cant,
+                velocity=velocity,
+                maximum_velocity=maximum_velocity,
+                density=density,
+                spoiler_skin_thickness=initial_spoiler_skin_thickness,
+                n_ribs=initial_n_ribs,
+                youngs_modulus=youngs_modulus,
+                yield_strength=yield_strength,
+                shear_strength=shear_strength,
+                material_density=material_density,
+                poisson_ratio=poisson_ratio,
+                car_length=car_length,
+                car_width=car_width,
+                car_maximum_height=car_maximum_height,
+                car_middle_to_back_ratio=car_middle_to_back_ratio)
+
+
+if __name__ == '__main__':
+    from parapy.gui import display
+
+    geometry = "inputs/input_geometry.dat"
+    flow = "inputs/input_flow_conditions.dat"
+    material = "inputs/input_material_properties.dat"
+
     obj = Main(label="Spoiler",
-               spoiler_airfoils=spoiler_airfoils,
-               spoiler_span=spoiler_span,
-               spoiler_chord=spoiler_chord,
-               spoiler_angle=spoiler_angle,
-               plate_amount=plate_amount,
-               strut_amount=strut_amount,
-               strut_airfoil_shape=strut_airfoil_shape,
-               strut_lat_location=strut_lat_location,
-               strut_height=strut_height,
-               strut_chord_fraction=strut_chord_fraction,
-               strut_thickness=strut_thickness,
-               strut_sweep=strut_sweep,
-               strut_cant=strut_cant,
-               endplate_present=endplate_present,
-               endplate_thickness=endplate_thickness,
-               endplate_sweep=endplate_sweep,
-               endplate_cant=endplate_cant,
-               velocity=velocity,
-               maximum_velocity=maximum_velocity,
-               density=density,
-               spoiler_skin_thickness=initial_spoiler_skin_thickness,
-               n_ribs=initial_n_ribs,
-               youngs_modulus=youngs_modulus,
-               yield_strength=yield_strength,
-               shear_strength=shear_strength,
-               material_density=material_density,
-               poisson_ratio=poisson_ratio,
-               car_length=car_length,
-               car_width=car_width,
-               car_maximum_height=car_maximum_height,
-               car_middle_to_back_ratio=car_middle_to_back_ratio)
+               **read_main_inputs(geometry, flow, material))
 
     display(obj)
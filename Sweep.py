@@ -0,0 +1,220 @@
+from Batch import OUTPUTS, OUTPUT_ENTRIES, evaluate_design, parse_value
+from Main import read_main_inputs
+from analysis.results_store import ResultsStore
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+
+import argparse
+import csv
+import os
+import tempfile
+
+import numpy as np
+
+###############################################################################
+# KBE APPLICATION SWEEP FILE                                                  #
+# From this file, a design of experiments over the Main inputs is run. The    #
+# designs are evaluated in parallel by a pool of worker processes, each with  #
+# its own ParaPy model and its own scratch directory for AVL and XFOIL.       #
+# The results are streamed to a single CSV table, and optionally appended to  #
+# a columnar results store (see analysis/results_store.py).                   #
+#                                                                             #
+# Inputs:                                                                     #
+# - Geometry, flow conditions and material properties input .dat files,       #
+#   which define the baseline design                                          #
+# - Either a grid of values per input (full factorial design), or a range     #
+#   per input and an amount of samples (Latin hypercube design)               #
+# - The outputs to evaluate, see Batch.py                                     #
+###############################################################################
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Main inputs which only take integer values
+INTEGER_INPUTS = ("plate_amount", "strut_amount", "n_ribs", "maximum_ribs")
+
+
+def grid_designs(grid):
+    """ Return the full factorial design of the grid, which is a dictionary
+    with a list of values per input. """
+    names = list(grid)
+    return [dict(zip(names, values))
+            for values in product(*[grid[name] for name in names])]
+
+
+def latin_hypercube_designs(ranges, samples, seed=None):
+    """ Return a Latin hypercube design, which is a dictionary with the
+    lower and upper bound per input. Each range is divided in as many
+    intervals as there are samples, and every interval is sampled exactly
+    once per input. Inputs in INTEGER_INPUTS are sampled from the integer
+    levels between the bounds instead, which are divided as evenly as
+    possible over the samples. """
+    random = np.random.RandomState(seed)
+    designs = [{} for _ in range(samples)]
+    for name, (lower, upper) in ranges.items():
+        if name in INTEGER_INPUTS:
+            levels = np.arange(int(np.ceil(lower)), int(np.floor(upper)) + 1)
+            indices = random.permutation(samples) * len(levels) // samples
+            for design, index in zip(designs, indices):
+                design[name] = int(levels[index])
+            continue
+        fractions = (random.permutation(samples)
+                     + random.uniform(size=samples)) / samples
+        for design, fraction in zip(designs, fractions):
+            design[name] = lower + fraction * (upper - lower)
+    return designs
+
+
+def initialise_worker():
+    """ Every worker process runs in its own temporary directory, such that
+    the input and output files of AVL and XFOIL of concurrent designs do not
+    overwrite each other. """
+    os.chdir(tempfile.mkdtemp(prefix="spoiler_sweep_"))
+
+
+def evaluate_variant(index, inputs, outputs, step_file=None):
+    """ Evaluate a single design in a worker process. Failures of a design
+    are returned in the report, such that the other designs continue. """
+    try:
+        return index, evaluate_design(inputs, outputs, step_file)
+    except Exception as error:
+        return index, {'inputs': inputs,
+                       'error': type(error).__name__ + ": " + str(error)}
+
+
+def flatten(report, prefix=""):
+    """ Flatten the nested report dictionary to a single row, in which the
+    column names are the keys joined with dots. """
+    row = {}
+    for key, value in report.items():
+        name = prefix + str(key)
+        if isinstance(value, dict):
+            row.update(flatten(value, name + "."))
+        elif isinstance(value, list) and key != 'spoiler_airfoils':
+            row[name] = " | ".join(str(item) for item in value)
+        elif isinstance(value, list):
+            row[name] = " ".join(value)
+        else:
+            row[name] = value
+    return row
+
+
+def table_columns(inputs, outputs):
+    """ Return the columns of the results table: the design number, the
+    inputs, the chosen outputs, the warnings and a possible error. """
+    columns = ['design'] + ['inputs.' + name for name in inputs]
+    for output in outputs:
+        columns += [output + '.' + entry for entry in OUTPUT_ENTRIES[output]]
+    return columns + ['warnings', 'error']
+
+
+def run_sweep(baseline, designs, outputs, table, workers=None, store=None,
+              step_directory=None):
+    """ Evaluate all designs, which override inputs of the baseline, with a
+    pool of worker processes and write the results to the CSV table as soon
+    as they are available. If a results store is given, the reports are
+    appended to it as well; this is done by the main process only, such that
+    the workers never write to the same files. The STEP files are written
+    to the step directory, named after the design number. Their paths are
+    made absolute before the designs are dispatched, since every worker
+    runs in its own scratch directory. """
+    step_directory = os.path.abspath(step_directory or os.getcwd())
+    if "step" in outputs:
+        os.makedirs(step_directory, exist_ok=True)
+    inputs = list(baseline)
+    for design in designs:
+        inputs += [name for name in design if name not in inputs]
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=initialise_worker) as executor, \
+            open(table, 'w', newline='') as table_file:
+        writer = csv.DictWriter(table_file,
+                                fieldnames=table_columns(inputs, outputs),
+                                restval='', extrasaction='ignore')
+        writer.writeheader()
+        futures = [executor.submit(evaluate_variant, index,
+                                   dict(baseline, **design), outputs,
+                                   os.path.join(step_directory, "design_"
+                                                + str(index) + ".stp"))
+                   for index, design in enumerate(designs)]
+        for finished, future in enumerate(as_completed(futures)):
+            index, report = future.result()
+            writer.writerow(dict(flatten(report), design=index))
+            table_file.flush()
+            if store is not None:
+                store.append_report(dict(report, design=index))
+            print("Design " + str(index)
+                  + (" failed: " + report['error'] if 'error' in report
+                     else " finished")
+                  + " (" + str(finished + 1) + " of " + str(len(designs))
+                  + ")")
+
+
+def parse_arguments(arguments=None):
+    """ Parse the command line arguments of the sweep. """
+    parser = argparse.ArgumentParser(
+        description="Run a design of experiments over the Main inputs.")
+    parser.add_argument("--geometry", default="inputs/input_geometry.dat",
+                        help="geometry input file of the baseline design")
+    parser.add_argument("--flow",
+                        default="inputs/input_flow_conditions.dat",
+                        help="flow conditions input file")
+    parser.add_argument("--material",
+                        default="inputs/input_material_properties.dat",
+                        help="material properties input file")
+    parser.add_argument("--grid", nargs="+", default=[],
+                        metavar="NAME=V1,V2,...",
+                        help="values per input of a full factorial design")
+    parser.add_argument("--range", nargs="+", default=[],
+                        metavar="NAME=LOWER:UPPER",
+                        help="range per input of a Latin hypercube design")
+    parser.add_argument("--samples", type=int, default=100,
+                        help="amount of Latin hypercube samples")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="random seed of the Latin hypercube design")
+    parser.add_argument("--outputs", nargs="+", choices=OUTPUTS,
+                        default=["forces", "weights", "failure"],
+                        help="outputs to evaluate")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="amount of worker processes, default is the "
+                             "amount of cores")
+    parser.add_argument("--table", default="sweep.csv",
+                        help="name of the CSV table to write")
+    parser.add_argument("--store", default=None,
+                        help="directory of a results store to which the "
+                             "reports are appended")
+    parser.add_argument("--step-directory", default=".",
+                        help="directory to which the STEP files of the "
+                             "designs are written, if requested")
+    return parser.parse_args(arguments)
+
+
+if __name__ == '__main__':
+    args = parse_arguments()
+    baseline_inputs = read_main_inputs(os.path.join(ROOT, args.geometry),
+                                       os.path.join(ROOT, args.flow),
+                                       os.path.join(ROOT, args.material))
+
+    grid_values = {}
+    for setting in args.grid:
+        name, values = setting.split("=", 1)
+        grid_values[name] = [parse_value(value)
+                             for value in values.split(",")]
+    ranges = {}
+    for setting in args.range:
+        name, bounds = setting.split("=", 1)
+        ranges[name] = [float(bound) for bound in bounds.split(":")]
+
+    variants = grid_designs(grid_values)
+    if ranges:
+        hypercube = latin_hypercube_designs(ranges, args.samples, args.seed)
+        variants = [dict(grid_design, **sample) for grid_design in variants
+                    for sample in hypercube]
+
+    results_store = None
+    if args.store is not None:
+        results_store = ResultsStore(os.path.abspath(args.store))
+
+    print("Evaluating " + str(len(variants)) + " designs")
+    run_sweep(baseline_inputs, variants, args.outputs,
+              os.path.abspath(args.table), args.workers, results_store,
+              args.step_directory)
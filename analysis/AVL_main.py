@@ -1,10 +1,19 @@
 from analysis.spoiler_files import Spoiler
+from analysis.avl_sections import AVLSections
+from analysis.avl_surfaces import AVLSurfaces, number_to_letter
+from analysis.result_cache import ResultCache, content_hash
+from analysis.vortex_lattice import section_geometry, surface_lattice, \
+    mirror_lattice, vortex_lattice_analysis, solution_cache
 from parapy.core import *
+from parapy.core.validate import OneOf
 from math import sin, radians
 
 import kbeutils.avl as avl
 import matplotlib.pyplot as plt
 import numpy as np
+import os
+
+DIR = os.path.dirname(__file__)
 
 ###############################################################################
 # AVL ANALYSIS CLASS                                                          #
@@ -17,22 +26,27 @@ import numpy as np
 # - Density, the air density at the moment of the aerodynamic analysis        #
 # - (OPTIONAL) Viscosity, the viscosity of the fluid at the moment of the     #
 #   aerodynamic analysis. Default is set to air.                              #
+# - (OPTIONAL) Cache settings. AVL results are stored on disk, keyed by the   #
+#   AVL geometry, case settings and Mach number, such that a repeated         #
+#   analysis does not run AVL again.                                          #
+# - (OPTIONAL) Backend, either the external AVL executable ("avl") or the     #
+#   in-process vortex lattice method of vortex_lattice.py ("vlm")             #
 ###############################################################################
 
 
-def number_to_letter(integer):
-    """ This function converts the quantify number of the main plate to a
-    letter in the alphabet. This is done, because the name of an AVL
-    surface cannot contain any digits. 0 converts to A, 1 to B etc. """
-
-    alphabet = ["A", "B", "C", "D", "E", "F", "G", "H", "I", "J", "K",
-                "L", "M", "N", "O", "P", "Q", "R", "S", "T", "U", "V",
-                "W", "X", "Y", "Z"]
-    return alphabet[integer]
-
-
-from analysis.avl_sections import AVLSections
-from analysis.avl_surfaces import AVLSurfaces
+def alpha_cases(alphas, prefix="Alpha"):
+    """ This function creates a list of AVL cases, one for each of the
+    given angles of attack [deg]. All cases are run in the same AVL session.
+    The results are stored by case name, so angles of attack that result in
+    the same name (equal to three decimals) are not allowed. """
+    cases = [(prefix + " " + "{:+.3f}".format(alpha), {'alpha': alpha})
+             for alpha in alphas]
+    names = [name for name, settings in cases]
+    duplicates = sorted(set(name for name in names if names.count(name) > 1))
+    if duplicates:
+        raise ValueError("Duplicate AVL cases: " + ", ".join(duplicates)
+                         + ". Please give each angle of attack only once.")
+    return cases
 
 
 class AvlAnalysis(avl.Interface):
@@ -43,6 +57,17 @@ class AvlAnalysis(avl.Interface):
     velocity = Input()
     density = Input()
     viscosity = Input(1.47e-5)
+    # Because of the low velocities, the flow is assumed incompressible.
+    mach = Input(0.0)
+
+    # The vortex lattice method gives the results without starting AVL.
+    backend = Input("avl", validator=OneOf(["avl", "vlm"]))
+    n_section_points = Input(201)  # only used by the vlm backend
+
+    # Cache settings
+    use_cache = Input(True)
+    cache_directory = Input(os.path.join(DIR, 'avl_cache'))
+    cache_size = Input(256 * 1024 ** 2)  # [bytes]
 
     @Part(in_tree=False)
     def spoiler(self):
@@ -76,7 +101,8 @@ class AvlAnalysis(avl.Interface):
                        car_maximum_height=
                        self.spoiler_input.car_maximum_height/1000,
                        car_middle_to_back_ratio=
-                       self.spoiler_input.car_middle_to_back_ratio)
+                       self.spoiler_input.car_middle_to_back_ratio,
+                       car_geometry=False)
 
     @Attribute
     def reference_area(self):
@@ -125,10 +151,7 @@ class AvlAnalysis(avl.Interface):
                                  reference_point=self.spoiler.position.point,
                                  surfaces=[plate.surface for plate
                                            in self.avl_surfaces],
-                                 mach=0.0
-                                 # Because of the low velocities, the flow is
-                                 # assumed incompressible.
-                                 )
+                                 mach=self.mach)
 
     @Part
     def cases(self):
@@ -141,19 +164,125 @@ class AvlAnalysis(avl.Interface):
                         settings=self.case_settings[child.index][1]
                         )
 
+    @Attribute
+    def geometry_key(self):
+        """ This attribute collects everything that defines the generated
+        AVL geometry: the reference values and, for each surface, its
+        discretisation, mirror point, angle and the airfoil, chord and
+        position of each of its sections. """
+        surfaces = []
+        for i in range(self.spoiler.plate_amount):
+            surface = self.avl_surfaces[i]
+            sections = []
+            for section in self.spoiler.main_plate[i].sections:
+                position = section.position
+                sections.append([section.airfoil_name, section.chord,
+                                 [position.point.x, position.point.y,
+                                  position.point.z],
+                                 [[vector.x, vector.y, vector.z]
+                                  for vector in (position.Vx, position.Vy,
+                                                 position.Vz)]])
+            surfaces.append([number_to_letter(i), surface.n_chordwise,
+                             surface.n_spanwise, surface.duplicate,
+                             surface.angle, sections])
+        reference = [self.reference_area, self.spoiler.spoiler_span,
+                     self.spoiler.spoiler_chord,
+                     [self.spoiler.position.point.x,
+                      self.spoiler.position.point.y,
+                      self.spoiler.position.point.z]]
+        return reference, surfaces
+
+    @Attribute
+    def cache_key(self):
+        """ This attribute returns the hash under which the results of this
+        analysis are cached. The velocity and density are not part of the
+        key, since the AVL coefficients do not depend on them. """
+        return content_hash(self.geometry_key, self.case_settings, self.mach)
+
+    @Attribute
+    def vlm_lattices(self):
+        """ This attribute creates the vortex lattice of each AVL surface,
+        together with its mirrored copy, for the vlm backend. The section
+        properties are determined from points on the section curves, the
+        same curves from which the AVL sections are created. """
+        lattices = {}
+        for i in range(self.spoiler.plate_amount):
+            surface = self.avl_surfaces[i]
+            chord_fractions = (np.arange(surface.n_chordwise) + 0.75) \
+                / surface.n_chordwise
+            sections = []
+            for section in self.spoiler.main_plate[i].sections:
+                points = section.curve.equispaced_points(
+                    self.n_section_points)
+                sections.append(section_geometry(
+                    [[point.x, point.y, point.z] for point in points],
+                    chord_fractions))
+            lattice = surface_lattice(sections, surface.n_chordwise,
+                                      surface.n_spanwise, surface.angle)
+            lattices[number_to_letter(i)] = [
+                lattice, mirror_lattice(lattice, surface.duplicate)]
+        return lattices
+
+    @Attribute
+    def vlm_solution(self):
+        """ This attribute returns the solved vortex lattice of the geometry.
+        Solutions are kept in memory under the hash of the geometry, so an
+        analysis of the same geometry at another velocity or angle of attack
+        (as in the velocity iterator or the structural analysis) does not
+        create and solve the lattice again. """
+        key = content_hash(self.geometry_key, self.n_section_points)
+        return solution_cache.get(key, lambda: self.vlm_lattices)
+
+    @Attribute
+    def vlm_results(self):
+        """ This attribute returns the results of the vortex lattice method
+        for all cases, in the same format as the AVL results. Only the angle
+        of attack can be set in the case settings. """
+        for name, settings in self.case_settings:
+            if set(settings) - {'alpha'}:
+                raise ValueError("The vlm backend only supports the 'alpha' "
+                                 "setting, case '" + name + "' also sets "
+                                 + str(sorted(set(settings) - {'alpha'})))
+        results = vortex_lattice_analysis(
+            self.vlm_solution,
+            [settings.get('alpha', 0.) for name, settings
+             in self.case_settings],
+            self.reference_area)
+        return {name: result for (name, settings), result
+                in zip(self.case_settings, results)}
+
+    @Attribute
+    def case_results(self):
+        """ This attribute returns the AVL results for all cases. If the
+        same geometry and cases have been analysed before, the results are
+        read from the cache instead of running AVL again. With the vlm
+        backend, the results are calculated in-process instead. """
+        if self.backend == "vlm":
+            return self.vlm_results
+        if not self.use_cache:
+            return self.results
+        cache = ResultCache(self.cache_directory, self.cache_size)
+        results = cache.get(self.cache_key)
+        if results is None:
+            results = self.results
+            cache.put(self.cache_key, results)
+        return results
+
     @Attribute
     def total_force(self):
         """ This attribute calculates the total downforce produced by the
         spoiler, based on the resulting lift coefficient, the dynamic pressure
         and the reference area. """
-        cl = self.results[self.case_settings[0][0]]['Totals']['CLtot']
+        cl = self.case_results[self.case_settings[0][0]]['Totals'][
+            'CLtot']
         force = cl*self.dyn_pressure*self.reference_area
         return force
 
     @Attribute
     def c_l(self):
         """ This attribute returns the resulting lift coefficient. """
-        return self.results[self.case_settings[0][0]]['Totals']['CLtot']
+        return self.case_results[self.case_settings[0][0]]['Totals'][
+            'CLtot']
 
     @Attribute
     def parasite_drag_coefficient(self):
@@ -175,8 +304,8 @@ class AvlAnalysis(avl.Interface):
     @Attribute
     def c_d(self):
         """ This attribute returns the resulting drag coefficient. """
-        return (self.results[self.case_settings[0][0]]['Totals']['CDind'] +
-                self.parasite_drag_coefficient)
+        return (self.case_results[self.case_settings[0][0]]['Totals']
+                ['CDind'] + self.parasite_drag_coefficient)
 
     @Attribute
     def ld_ratio(self):
@@ -184,20 +313,45 @@ class AvlAnalysis(avl.Interface):
         aerodynamic efficiency). """
         return self.c_l / self.c_d
 
+    @Attribute
+    def case_names(self):
+        """ This attribute returns the names of all cases, in the order of
+        the case settings. """
+        return [name for name, settings in self.case_settings]
+
+    @Attribute
+    def case_c_l(self):
+        """ This attribute returns the resulting lift coefficient of each of
+        the cases as an array. """
+        return np.array([self.case_results[name]['Totals']['CLtot']
+                         for name in self.case_names])
+
+    @Attribute
+    def case_total_force(self):
+        """ This attribute returns the total downforce of each of the cases
+        as an array. """
+        return self.case_c_l * self.dyn_pressure * self.reference_area
+
+    @Attribute
+    def strip_forces(self):
+        """ This attribute returns the strip forces of all cases and plates
+        as a dictionary of arrays, each shaped (case, plate, strip). The
+        amount of strips follows from the results (both sides of the
+        plate). """
+        keys = ['Yle', 'Chord', 'c cl', 'cl', 'cd']
+        return {key: np.array([[self.case_results[name]['StripForces']
+                                [number_to_letter(i)][key]
+                                for i in range(self.spoiler.plate_amount)]
+                               for name in self.case_names])
+                for key in keys}
+
     @Attribute
     def lift_distribution(self):
         """ This attribute returns the lift distribution along the span. The
         first list contains the span-wise location, the second list contains
         the local lift coefficient multiplied with the local chord. """
-        y_pos = np.zeros((40, self.spoiler.plate_amount))
-        lift = np.zeros((40, self.spoiler.plate_amount))
-        for i in range(self.spoiler.plate_amount):
-            y_pos[:, i] = np.array([self.results[self.case_settings[0][0]]
-                                   ['StripForces'][number_to_letter(i)]
-                                   ['Yle']])
-            lift[:, i] = np.array([self.results[self.case_settings[0][0]]
-                                  ['StripForces'][number_to_letter(i)]
-                                  ['c cl']])
+        y_pos = self.strip_forces['Yle'][0].T
+        lift = self.strip_forces['c cl'][0].T
         return y_pos, lift
 
     @Attribute
@@ -206,20 +360,9 @@ class AvlAnalysis(avl.Interface):
         span. The first list contains the span-wise location, the second list
         contains the local (total) drag coefficient multiplied with the local
         chord. """
-        y_pos = np.zeros((40, self.spoiler.plate_amount))
-        drag = np.zeros((40, self.spoiler.plate_amount))
-        for i in range(self.spoiler.plate_amount):
-            y_pos[:, i] = np.array([self.results[self.case_settings[0][0]]
-                                    ['StripForces'][number_to_letter(i)]
-                                    ['Yle']])
-            drag[:, i] = (np.multiply(
-                          np.array([self.results[self.case_settings[0][0]]
-                                   ['StripForces'][number_to_letter(i)]
-                                   ['cd']]),
-                          np.array([self.results[self.case_settings[0][0]]
-                                   ['StripForces'][number_to_letter(i)]
-                                   ['Chord']])) +
-                          self.parasite_drag_coefficient)
+        y_pos = self.strip_forces['Yle'][0].T
+        drag = (self.strip_forces['cd'][0].T * self.strip_forces['Chord'][0].T
+                + self.parasite_drag_coefficient)
         return y_pos, drag
 
     @action(label="Plot lift distribution")
@@ -227,10 +370,11 @@ class AvlAnalysis(avl.Interface):
         """ This action retrieves the lift distribution from the attribute and
         returns a plot of the lift distribution along the span. The left side
         and the right side of the main plate are plotted separately. """
-        x1 = np.zeros((20, self.spoiler.plate_amount))
-        x2 = np.zeros((20, self.spoiler.plate_amount))
-        y1 = np.zeros((20, self.spoiler.plate_amount))
-        y2 = np.zeros((20, self.spoiler.plate_amount))
+        half = len(self.lift_distribution[0]) // 2
+        x1 = np.zeros((half, self.spoiler.plate_amount))
+        x2 = np.zeros((half, self.spoiler.plate_amount))
+        y1 = np.zeros((half, self.spoiler.plate_amount))
+        y2 = np.zeros((half, self.spoiler.plate_amount))
 
         plt.figure()
         for i in range(self.spoiler.plate_amount):
@@ -256,16 +400,31 @@ class AvlAnalysis(avl.Interface):
         plt.ylabel("Local downforce coefficient")
         plt.show()
 
+    @action(label="Plot downforce per case")
+    def case_force_plot(self):
+        """ This action plots the total downforce of each of the cases
+        against its angle of attack, for example to show the downforce
+        versus the ride attitude of the car. """
+        alphas = [settings.get('alpha', 0.)
+                  for name, settings in self.case_settings]
+        plt.figure()
+        plt.plot(alphas, self.case_total_force, c="black", marker="o")
+        plt.title("Downforce per case")
+        plt.xlabel("Angle of attack [deg]")
+        plt.ylabel("Total downforce [N]")
+        plt.show()
+
     @action(label="Plot drag distribution")
     def drag_plot(self):
         """ This action retrieves the (total) drag distribution from the
         attribute and returns a plot of the drag distribution along the span.
         THe left side and the right side of the main plate are plotted
         separately. """
-        x1 = np.zeros((20, self.spoiler.plate_amount))
-        x2 = np.zeros((20, self.spoiler.plate_amount))
-        y1 = np.zeros((20, self.spoiler.plate_amount))
-        y2 = np.zeros((20, self.spoiler.plate_amount))
+        half = len(self.drag_distribution[0]) // 2
+        x1 = np.zeros((half, self.spoiler.plate_amount))
+        x2 = np.zeros((half, self.spoiler.plate_amount))
+        y1 = np.zeros((half, self.spoiler.plate_amount))
+        y2 = np.zeros((half, self.spoiler.plate_amount))
 
         plt.figure()
         for i in range(self.spoiler.plate_amount):
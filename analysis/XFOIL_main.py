@@ -1,11 +1,35 @@
 from analysis.spoiler_files import Spoiler
+from analysis.polar_database import PolarDatabase, shape_hash
+from analysis.panel_method import panel_method
 from parapy.core import *
 from parapy.geom import *
 from parapy.lib.xfoil import *
 
 from kbeutils.geom.curve import airfoil_points_in_xy_plane
+from concurrent.futures import ProcessPoolExecutor
 import matplotlib.pyplot as plt
 import numpy as np
+import os
+import tempfile
+
+DIR = os.path.dirname(__file__)
+
+
+def station_polar(coordinates, reynolds_number, alpha_range, ncrit=None):
+    """ This function runs XFOIL for the section coordinates of a single
+    span station. It is run in a worker process, in its own temporary
+    directory, such that the files of concurrent XFOIL runs do not collide.
+    The coordinates are given as tuples, since they are sent to the worker
+    process. """
+    directory = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="xfoil_") as scratch:
+        os.chdir(scratch)
+        try:
+            return run_xfoil([Point(*point) for point in coordinates],
+                             reynolds_number, alpha_range, norm=True,
+                             pane=True, cleanup=True, ncrit=ncrit)
+        finally:
+            os.chdir(directory)
 
 
 class XFoilAnalysis(GeomBase):
@@ -15,6 +39,14 @@ class XFoilAnalysis(GeomBase):
     velocity = Input()
     density = Input()
     angle_of_attack = Input()
+    # Spanwise polars: amount of stations per plate and worker processes
+    n_stations = Input(5)
+    workers = Input(None)
+    ncrit = Input(None)  # None uses the XFOIL default
+    # Polars are stored per section shape, Reynolds number and ncrit
+    use_database = Input(True)
+    database_directory = Input(os.path.join(DIR, 'polar_database'))
+    reynolds_tolerance = Input(0.1)
 
     @Part(in_tree=False)
     def cutting_plane(self):
@@ -37,16 +69,185 @@ class XFoilAnalysis(GeomBase):
                                           self.analysis_section.edges[0],
                                           n_points=200)
 
+    @Attribute
+    def polar_database(self):
+        return PolarDatabase(self.database_directory,
+                             self.reynolds_tolerance)
+
     @Attribute
     def xfoil_analysis(self):
-        return run_xfoil(self.analysis_points,
-                         self.reynolds_number,
-                         (self.angle_of_attack,
-                          self.angle_of_attack + 10, 1),
-                         norm=True,  # normalize airfoil if necessary
-                         pane=True,  # smooth out the airfoil
-                         cleanup=True,  # remove files generated by xfoil
-                         ncrit=None)
+        """ This attribute returns the polar of the analysis section. It is
+        read from the polar database if the section has been analysed
+        before, otherwise XFOIL is run and the polar is stored. """
+        if self.use_database:
+            shape = shape_hash([(point.x, point.y)
+                                for point in self.analysis_points])
+            polar = self.polar_database.get(shape, self.reynolds_number,
+                                            self.ncrit, self.alpha_range)
+            if polar is not None:
+                return polar
+        polar = run_xfoil(self.analysis_points,
+                          self.reynolds_number,
+                          self.alpha_range,
+                          norm=True,  # normalize airfoil if necessary
+                          pane=True,  # smooth out the airfoil
+                          cleanup=True,  # remove files generated by xfoil
+                          ncrit=self.ncrit)
+        if self.use_database:
+            self.polar_database.put(shape, self.reynolds_number, self.ncrit,
+                                    self.alpha_range, polar)
+        return polar
+
+    @Attribute
+    def alpha_range(self):
+        return self.angle_of_attack, self.angle_of_attack + 10, 1
+
+    @Attribute
+    def station_locations(self):
+        """ This attribute returns the plate number and y-location of each
+        of the span stations. The stations are placed in the middle of equal
+        parts of the half span of each plate. """
+        locations = []
+        for i, plate in enumerate(self.spoiler.main_plate):
+            for j in range(self.n_stations):
+                locations.append((i, plate.position.point.y + (j + 0.5)
+                                  / self.n_stations * plate.span / 2))
+        return locations
+
+    @Part(in_tree=False)
+    def station_planes(self):
+        return Plane(quantify=len(self.station_locations),
+                     reference=Point(0, self.station_locations[child.index][1],
+                                     0),
+                     normal=VY)
+
+    @Part(in_tree=False)
+    def station_sections(self):
+        return IntersectedShapes(quantify=len(self.station_locations),
+                                 shape_in=self.spoiler.main_plate[
+                                     self.station_locations[child.index][0]
+                                 ].surface,
+                                 tool=self.station_planes[child.index])
+
+    @Attribute
+    def station_points(self):
+        return [[(point.x, point.y, point.z) for point in
+                 airfoil_points_in_xy_plane(curve_in=section.edges[0],
+                                            n_points=200)]
+                for section in self.station_sections]
+
+    @Attribute
+    def spanwise_polars(self):
+        """ This attribute runs the XFOIL polars of all span stations
+        concurrently in a pool of worker processes. Stations of which the
+        polar is in the polar database are not run again. It returns the
+        polar of each station, in the same format as xfoil_analysis. """
+        polars = [None] * len(self.station_points)
+        shapes = [shape_hash(points) for points in self.station_points]
+        if self.use_database:
+            polars = [self.polar_database.get(shape, self.reynolds_number,
+                                              self.ncrit, self.alpha_range)
+                      for shape in shapes]
+
+        # Equal sections (e.g. of equal plates) are only run once
+        missing = {}
+        for k, polar in enumerate(polars):
+            if polar is None:
+                missing.setdefault(shapes[k], k)
+        if missing:
+            stations = list(missing.values())
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                results = executor.map(
+                    station_polar,
+                    [self.station_points[k] for k in stations],
+                    [self.reynolds_number] * len(stations),
+                    [self.alpha_range] * len(stations),
+                    [self.ncrit] * len(stations))
+                computed = dict(zip(missing, results))
+            for shape, polar in computed.items():
+                if self.use_database:
+                    self.polar_database.put(shape, self.reynolds_number,
+                                            self.ncrit, self.alpha_range,
+                                            polar)
+            polars = [computed[shapes[k]] if polar is None else polar
+                      for k, polar in enumerate(polars)]
+        return polars
+
+    @Attribute
+    def spanwise_polar_table(self):
+        """ This attribute assembles the spanwise polars in a table. It
+        returns the angles of attack and the lift, drag and moment
+        coefficients as arrays shaped (plate, station, angle). The y-location
+        of the stations is shaped (plate, station). Angles for which XFOIL
+        did not converge are NaN. """
+        start, end, step = self.alpha_range
+        alphas = np.arange(start, end + step / 2., step)
+        shape = (self.spoiler.plate_amount, self.n_stations, len(alphas))
+        table = {'alpha': np.broadcast_to(alphas, shape),
+                 'y': np.reshape([location[1] for location
+                                  in self.station_locations], shape[:2]),
+                 'cl': np.full(shape, np.nan),
+                 'cd': np.full(shape, np.nan),
+                 'cm': np.full(shape, np.nan)}
+        for k, polar in enumerate(self.spanwise_polars):
+            i, j = divmod(k, self.n_stations)
+            for row in polar:
+                n = int(round((row[0] - start) / step))
+                table['cl'][i, j, n] = row[1]
+                table['cd'][i, j, n] = row[2]
+                table['cm'][i, j, n] = row[4]
+        return table
+
+    @action(label="Plot spanwise maximum downforce")
+    def stall_map_plot(self):
+        table = self.spanwise_polar_table
+        plt.figure()
+        for i in range(self.spoiler.plate_amount):
+            cl = np.where(np.isnan(table['cl'][i]), -np.inf, table['cl'][i])
+            plt.plot(table['y'][i], np.max(cl, axis=1), marker="o",
+                     label="Plate " + str(i + 1))
+        plt.xlabel("Span-wise location [mm]")
+        plt.ylabel("Maximum local downforce coefficient")
+        plt.title("Maximum local downforce coefficient along the span")
+        plt.legend()
+        plt.show()
+
+    @Attribute
+    def inviscid_polar(self):
+        """ This attribute returns the inviscid polar of the analysis
+        section, calculated with the panel method instead of XFOIL. It
+        returns the angles of attack and the lift and moment coefficients as
+        arrays. """
+        alphas = PolarDatabase.alphas(self.alpha_range)
+        c_l, c_m = panel_method([(point.x, point.y)
+                                 for point in self.analysis_points], alphas)
+        return alphas, c_l, c_m
+
+    @Attribute
+    def inviscid_lift_slope(self):
+        """ This attribute returns the inviscid lift slope [1/deg] and the
+        zero-lift angle of attack [deg] of the analysis section. """
+        alphas, c_l, c_m = self.inviscid_polar
+        slope, offset = np.polyfit(alphas, c_l, 1)
+        return slope, -offset / slope
+
+    @action(label="Plot inviscid spoiler angle vs downforce")
+    def inviscid_cl_alpha_plot(self):
+        alphas, c_l, c_m = self.inviscid_polar
+        plt.plot(alphas - self.angle_of_attack, c_l, 'k')
+        plt.xlabel("Spoiler angle")
+        plt.ylabel("Local downforce coefficient")
+        plt.title("Inviscid local downforce coefficient versus spoiler angle")
+        plt.show()
+
+        slope, zero_lift_angle = self.inviscid_lift_slope
+        print("-----------------------------------------------")
+        print("Inviscid lift slope is " + str(np.round(slope, 4))
+              + " per degree,")
+        print("zero lift at a spoiler angle of "
+              + str(np.round(zero_lift_angle - self.angle_of_attack, 2))
+              + " degrees.")
+        print("-----------------------------------------------")
 
     @action(label="Plot spoiler angle vs downforce")
     def cl_alpha_plot(self):
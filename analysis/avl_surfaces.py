@@ -1,6 +1,5 @@
 from parapy.core import *
 import kbeutils.avl as avl
-from analysis.AVL_main import number_to_letter
 
 ###############################################################################
 # AVL SURFACE CLASS                                                           #
@@ -11,15 +10,29 @@ from analysis.AVL_main import number_to_letter
 # - Y-position of the surface mirror point.                                   #
 # - AVL sections that define the aerodynamic surface.                         #
 # - Angle of the surface, positive defined upwards.                           #
+# - (OPTIONAL) Amount of chordwise and spanwise vortices of the surface.      #
 ###############################################################################
 
 
+def number_to_letter(integer):
+    """ This function converts the quantify number of the main plate to a
+    letter in the alphabet. This is done, because the name of an AVL
+    surface cannot contain any digits. 0 converts to A, 1 to B etc. """
+
+    alphabet = ["A", "B", "C", "D", "E", "F", "G", "H", "I", "J", "K",
+                "L", "M", "N", "O", "P", "Q", "R", "S", "T", "U", "V",
+                "W", "X", "Y", "Z"]
+    return alphabet[integer]
+
+
 class AVLSurfaces(Base):
 
     number = Input()
     duplicate = Input()
     sections = Input()
     angle = Input()
+    n_chordwise = Input(12)
+    n_spanwise = Input(20)
 
     @Part
     def surface(self):
@@ -27,9 +40,9 @@ class AVLSurfaces(Base):
         multiple plates can be distinguished when multiple main plates are
         present. """
         return avl.Surface(name=number_to_letter(self.number),
-                           n_chordwise=12,
+                           n_chordwise=self.n_chordwise,
                            chord_spacing=avl.Spacing.equal,
-                           n_spanwise=20,
+                           n_spanwise=self.n_spanwise,
                            span_spacing=avl.Spacing.equal,
                            y_duplicate=self.duplicate,
                            sections=[section for section in self.sections],
@@ -0,0 +1,124 @@
+import numpy as np
+
+###############################################################################
+# ITERATION METHODS                                                           #
+# In this file, the numerical methods used by the iterators of the Main      #
+# class are defined. They only use the value of a given function, such that  #
+# every function evaluation can be a full aerodynamic or structural          #
+# analysis.                                                                   #
+###############################################################################
+
+
+def bracket_root(function, x0, f0, step, lower, upper, max_evaluations):
+    """
+    Function which searches for an interval around the root of a
+    monotonically increasing function. Starting from x0 (with function
+    value f0), steps are taken towards the root, doubling the step size
+    each time, until the function changes sign. The steps are limited by
+    the lower and upper bound. It returns the bracket (a, f(a), b, f(b)),
+    or None if no sign change is found, and the number of evaluations.
+    """
+    direction = 1. if f0 < 0 else -1.
+    a, fa = x0, f0
+    evaluations = 0
+    while evaluations < max_evaluations:
+        b = min(max(a + direction * step, lower), upper)
+        if b == a:
+            # The bound is reached without finding a sign change
+            return None, evaluations
+        fb = function(b)
+        evaluations += 1
+        if np.sign(fb) != np.sign(fa):
+            return (a, fa, b, fb), evaluations
+        a, fa = b, fb
+        step *= 2.
+    return None, evaluations
+
+
+def secant_bisection(function, a, fa, b, fb, tolerance, max_evaluations):
+    """
+    Function which finds the root of a function within the bracket [a, b],
+    in which f(a) and f(b) have opposite signs. Secant steps are taken
+    between the ends of the bracket, but a bisection step is used whenever
+    the secant step falls outside the bracket or the previous step did not
+    halve the bracket. The iteration stops when the absolute function
+    value is below the tolerance. It returns the root, its function value
+    and the number of evaluations.
+    """
+    x, fx = (a, fa) if abs(fa) < abs(fb) else (b, fb)
+    evaluations = 0
+    use_bisection = False
+    while abs(fx) > tolerance and evaluations < max_evaluations:
+        x = b - fb * (b - a) / (fb - fa)
+        if use_bisection or not min(a, b) < x < max(a, b):
+            x = (a + b) / 2
+        fx = function(x)
+        evaluations += 1
+
+        width = abs(b - a)
+        if np.sign(fx) == np.sign(fa):
+            a, fa = x, fx
+        else:
+            b, fb = x, fx
+        use_bisection = abs(b - a) > 0.5 * width
+    return x, fx, evaluations
+
+
+def find_root(function, x0, f0, step, lower, upper, tolerance,
+              max_evaluations=30):
+    """
+    Function which finds the root of a monotonically increasing function,
+    starting from x0 with known function value f0. A bracket is searched
+    first with bracket_root(), after which the root is refined with
+    secant_bisection(). It returns the root, its function value, the
+    number of evaluations and whether the tolerance was reached.
+    """
+    if abs(f0) <= tolerance:
+        return x0, f0, 0, True
+
+    bracket, evaluations = bracket_root(function, x0, f0, step, lower,
+                                        upper, max_evaluations)
+    if bracket is None:
+        return None, None, evaluations, False
+
+    a, fa, b, fb = bracket
+    x, fx, refinements = secant_bisection(function, a, fa, b, fb, tolerance,
+                                          max_evaluations - evaluations)
+    return x, fx, evaluations + refinements, abs(fx) <= tolerance
+
+
+def bisect_monotone(is_feasible, lower, upper_limit, tolerance,
+                    max_evaluations=60):
+    """
+    Function which finds the smallest value for which a monotone constraint
+    is satisfied: is_feasible returns False below and True above this value.
+    Starting from the lower value, the value is doubled until it is
+    feasible, limited by upper_limit. The interval between the last
+    infeasible and the first feasible value is then bisected until it is
+    smaller than the tolerance. It returns the smallest feasible value
+    found, or None if upper_limit is not feasible, and the number of
+    evaluations.
+    """
+    evaluations = 1
+    if is_feasible(lower):
+        return lower, evaluations
+
+    # Search for a feasible upper bound
+    upper = lower
+    while True:
+        lower, upper = upper, min(2. * upper, upper_limit)
+        evaluations += 1
+        if is_feasible(upper):
+            break
+        if upper >= upper_limit or evaluations >= max_evaluations:
+            return None, evaluations
+
+    # Bisect the interval between the infeasible and feasible bound
+    while upper - lower > tolerance and evaluations < max_evaluations:
+        middle = (lower + upper) / 2
+        evaluations += 1
+        if is_feasible(middle):
+            upper = middle
+        else:
+            lower = middle
+    return upper, evaluations
@@ -0,0 +1,120 @@
+import numpy as np
+
+###############################################################################
+# PANEL METHOD                                                                #
+# In this file, an inviscid 2D panel method with linearly varying vorticity   #
+# is defined, which gives the lift and moment coefficients of a section       #
+# without running XFOIL. The panel geometry only has to be solved once: the   #
+# vorticity for any angle of attack is a combination of the solutions for a   #
+# unit freestream in x and in y direction.                                    #
+###############################################################################
+
+
+def panel_geometry(coordinates):
+    """
+    Function which returns the panels of a closed section, given by its
+    (x, y) coordinates: the start points, lengths, unit tangents, outward
+    unit normals and midpoints of the panels.
+    """
+    points = np.asarray(coordinates, dtype=float)[:, :2]
+    vectors = np.diff(points, axis=0)
+    lengths = np.linalg.norm(vectors, axis=1)
+    tangents = vectors / lengths[:, None]
+    normals = np.stack((-tangents[:, 1], tangents[:, 0]), axis=1)
+    # The normals point outward if the points run clockwise
+    signed_area = 0.5 * np.sum(points[:-1, 0] * points[1:, 1]
+                               - points[1:, 0] * points[:-1, 1])
+    if signed_area > 0:
+        normals = -normals
+    return points[:-1], lengths, tangents, normals, \
+        points[:-1] + 0.5 * vectors
+
+
+def vortex_panel_influence(points, starts, lengths, tangents):
+    """
+    Function which calculates the velocity induced at each of the points by
+    each of the linear vortex panels, for a unit (clockwise) vorticity at
+    the start node and at the end node of the panel. It returns two arrays
+    shaped (points, panels, 2) with the x and y velocity components.
+    """
+    offsets = points[:, None, :] - starts[None, :, :]
+    normals = np.stack((-tangents[:, 1], tangents[:, 0]), axis=1)
+    # Coordinates of the points in the local axis system of each panel
+    x = np.sum(offsets * tangents[None, :, :], axis=2)
+    z = np.sum(offsets * normals[None, :, :], axis=2)
+    length = lengths[None, :]
+
+    theta = np.arctan2(z, x - length) - np.arctan2(z, x)
+    r1 = x ** 2 + z ** 2
+    r2 = (x - length) ** 2 + z ** 2
+    log_ratio = 0.5 * np.log(np.where(r1 > 0, r1, 1.)
+                             / np.where(r2 > 0, r2, 1.))
+
+    # Local velocity of a vorticity a + b * s along the panel
+    u_a, u_b = theta, x * theta - z * log_ratio
+    w_a, w_b = -log_ratio, length - z * theta - x * log_ratio
+    u_start, u_end = u_a - u_b / length, u_b / length
+    w_start, w_end = w_a - w_b / length, w_b / length
+
+    def to_global(u, w):
+        return (u[:, :, None] * tangents[None, :, :]
+                + w[:, :, None] * normals[None, :, :]) / (2 * np.pi)
+    return to_global(u_start, w_start), to_global(u_end, w_end)
+
+
+def panel_solution(coordinates):
+    """
+    Function which solves the panel method for a unit freestream in x and
+    in y direction. The coordinates run around the section from trailing
+    edge to trailing edge. The normal velocity is zero at the midpoint of
+    each panel, and the Kutta condition makes the vorticity at both
+    trailing edge nodes cancel. It returns the panel geometry and the node
+    vorticity for both unit freestreams, shaped (nodes, 2).
+    """
+    starts, lengths, tangents, normals, midpoints = panel_geometry(
+        coordinates)
+    n_panels = len(lengths)
+    start_velocity, end_velocity = vortex_panel_influence(
+        midpoints, starts, lengths, tangents)
+
+    influence = np.zeros((n_panels + 1, n_panels + 1))
+    influence[:n_panels, :n_panels] += np.einsum('ijk,ik->ij',
+                                                 start_velocity, normals)
+    influence[:n_panels, 1:] += np.einsum('ijk,ik->ij', end_velocity,
+                                          normals)
+    influence[n_panels, [0, n_panels]] = 1.
+
+    freestream = np.zeros((n_panels + 1, 2))
+    freestream[:n_panels] = -normals
+    vorticity = np.linalg.solve(influence, freestream)
+    return (starts, lengths, tangents, normals, midpoints), vorticity
+
+
+def panel_method(coordinates, alphas):
+    """
+    Function which returns the inviscid lift coefficient and the moment
+    coefficient about the quarter chord (positive nose up) of a section for
+    each of the angles of attack [deg]. The angle of attack is measured from
+    the x-axis and the coefficients are based on the chord along the
+    x-axis, the same as in XFOIL with normalisation. The panel method is
+    solved only once for all angles of attack.
+    """
+    coordinates = np.asarray(coordinates, dtype=float)[:, :2]
+    geometry, vorticity = panel_solution(coordinates)
+    starts, lengths, tangents, normals, midpoints = geometry
+
+    alphas = np.radians(np.atleast_1d(alphas))
+    gamma = vorticity.dot(np.stack((np.cos(alphas), np.sin(alphas))))
+    panel_gamma = 0.5 * (gamma[:-1] + gamma[1:])
+    chord = np.ptp(coordinates[:, 0])
+
+    # Lift from the total circulation, moment from the surface pressure
+    c_l = 2 * np.sum(panel_gamma * lengths[:, None], axis=0) / chord
+    c_p = 1 - panel_gamma ** 2
+    leading_edge = coordinates[np.argmin(coordinates[:, 0])]
+    trailing_edge = 0.5 * (coordinates[0] + coordinates[-1])
+    quarter_chord = leading_edge + 0.25 * (trailing_edge - leading_edge)
+    arm = midpoints - quarter_chord
+    moment_arm = arm[:, 0] * normals[:, 1] - arm[:, 1] * normals[:, 0]
+    c_m = np.sum(c_p * (moment_arm * lengths)[:, None], axis=0) / chord ** 2
+    return c_l, c_m
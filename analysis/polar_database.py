@@ -0,0 +1,125 @@
+from analysis.result_cache import ResultCache, content_hash
+
+import numpy as np
+
+###############################################################################
+# POLAR DATABASE CLASS                                                        #
+# In this file, a persistent database of XFOIL polars is defined. Polars are  #
+# stored per section shape, ncrit and Reynolds number, each in its own file,  #
+# such that a section that has been analysed before does not run XFOIL again. #
+# Between two stored Reynolds numbers that are close enough, the polar is     #
+# interpolated.                                                               #
+#                                                                             #
+# Inputs:                                                                     #
+# - Directory in which the polars are stored                                  #
+# - (OPTIONAL) Relative tolerance between two stored Reynolds numbers within  #
+#   which the polar is interpolated                                           #
+# - (OPTIONAL) Maximum size of the database in bytes                          #
+###############################################################################
+
+
+def shape_hash(coordinates, decimals=4):
+    """ This function returns a hash of the shape of a section. The
+    coordinates (x, y) are normalised in the same way as XFOIL does: the
+    leading edge (minimum x) is moved to the origin and the section is
+    scaled to unit chord. The rotation of the section is kept, since the
+    angle of attack is measured from the x-axis. """
+    coordinates = np.asarray(coordinates, dtype=float)[:, :2]
+    i_le = np.argmin(coordinates[:, 0])
+    chord = np.ptp(coordinates[:, 0])
+    normalised = (coordinates - coordinates[i_le]) / chord
+    return content_hash(np.round(normalised, decimals).tolist())
+
+
+class PolarDatabase(object):
+
+    def __init__(self, directory, reynolds_tolerance=0.1,
+                 max_size=256 * 1024 ** 2):
+        self.cache = ResultCache(directory, max_size)
+        self.reynolds_tolerance = reynolds_tolerance
+
+    @staticmethod
+    def key(shape, ncrit, reynolds_number=None):
+        """ Returns the key under which the polar of a shape at a Reynolds
+        number is stored. Every Reynolds number is stored in its own file,
+        such that processes that analyse the same shape at other Reynolds
+        numbers never overwrite each other's polars. Without a Reynolds
+        number, the prefix of the keys of the shape is returned. """
+        prefix = shape + '_' + str(ncrit) + '_'
+        if reynolds_number is None:
+            return prefix
+        return prefix + repr(float(reynolds_number))
+
+    def entries(self, shape, ncrit):
+        """ Returns the stored polars of a shape as a dictionary with the
+        Reynolds number as key. """
+        prefix = self.key(shape, ncrit)
+        entries = {}
+        for key in self.cache.keys(prefix):
+            entry = self.cache.get(key)
+            if entry is not None:
+                entries[float(key[len(prefix):])] = entry
+        return entries
+
+    @staticmethod
+    def alphas(alpha_range):
+        """ Returns the angles of attack of an XFOIL alpha range, given as
+        (start, end, step). """
+        start, end, step = alpha_range
+        return np.round(np.arange(start, end + step / 2., step), 6)
+
+    def covers(self, entry, alphas):
+        """ Returns whether all angles of attack were analysed for a stored
+        polar. Angles for which XFOIL did not converge are analysed too,
+        even though they are not in the polar. """
+        return set(alphas.tolist()) <= set(entry['alphas'])
+
+    def select(self, rows, alphas):
+        """ Returns the rows of a polar at the given angles of attack. """
+        wanted = set(alphas.tolist())
+        return [row for row in rows if round(row[0], 6) in wanted]
+
+    def get(self, shape, reynolds_number, ncrit, alpha_range):
+        """ Returns the polar of the shape at the given Reynolds number, or
+        None if it is not in the database. If the Reynolds number is between
+        two stored ones that differ less than the tolerance, the polar is
+        interpolated linearly in log(Re). Only the angles of attack that
+        converged at both Reynolds numbers are returned in that case. """
+        entries = self.entries(shape, ncrit)
+        alphas = self.alphas(alpha_range)
+        stored = sorted(re for re, entry in entries.items()
+                        if self.covers(entry, alphas))
+        for re in stored:
+            if abs(re / reynolds_number - 1.) < 1e-9:
+                return self.select(entries[re]['rows'], alphas)
+
+        lower = [re for re in stored if re < reynolds_number]
+        upper = [re for re in stored if re > reynolds_number]
+        if not lower or not upper or \
+                upper[0] / lower[-1] - 1. > self.reynolds_tolerance:
+            return None
+        weight = (np.log(reynolds_number / lower[-1])
+                  / np.log(upper[0] / lower[-1]))
+        upper_rows = {round(row[0], 6): row for row in
+                      self.select(entries[upper[0]]['rows'], alphas)}
+        polar = []
+        for row in self.select(entries[lower[-1]]['rows'], alphas):
+            if round(row[0], 6) in upper_rows:
+                other = upper_rows[round(row[0], 6)]
+                polar.append(tuple([row[0]] + [
+                    float((1 - weight) * a + weight * b)
+                    for a, b in zip(row[1:], other[1:])]))
+        return polar
+
+    def put(self, shape, reynolds_number, ncrit, alpha_range, polar):
+        """ Stores the polar of the shape at the given Reynolds number. The
+        analysed angles of attack are merged with the ones that are already
+        stored for this Reynolds number. """
+        key = self.key(shape, ncrit, reynolds_number)
+        entry = self.cache.get(key) or {'alphas': [], 'rows': []}
+        alphas = self.alphas(alpha_range).tolist()
+        rows = {round(row[0], 6): tuple(row) for row in entry['rows']}
+        rows.update((round(row[0], 6), tuple(row)) for row in polar)
+        self.cache.put(key, {
+            'alphas': sorted(set(entry['alphas']) | set(alphas)),
+            'rows': [rows[alpha] for alpha in sorted(rows)]})
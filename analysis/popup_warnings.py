@@ -0,0 +1,40 @@
+###############################################################################
+# POP-UP WARNINGS                                                             #
+# In this file, the warnings that are shown to the user are defined. In the   #
+# ParaPy GUI, a warning box pops up. In headless mode (see Batch.py), the     #
+# warnings are collected instead, such that they can be written to a report.  #
+###############################################################################
+
+headless = False
+collected_warnings = []
+
+
+def set_headless(enabled=True):
+    """ Switch headless mode on or off. In headless mode, no warning boxes
+    are shown and the warnings are collected instead. Switching the mode
+    clears the collected warnings. """
+    global headless
+    headless = enabled
+    del collected_warnings[:]
+
+
+def generate_warning(warning_header, msg):
+    """ Generate a warning box if a condition is violated. Inputs are the
+    warning box header and warning box message. In headless mode,
+    the warning is printed and collected instead. """
+    if headless:
+        print(warning_header + ": " + msg)
+        collected_warnings.append({'header': warning_header,
+                                   'message': msg})
+        return
+
+    from tkinter import Tk, messagebox
+
+    window = Tk()
+    window.withdraw()
+
+    messagebox.showwarning(warning_header, msg)
+
+    window.deiconify()
+    window.destroy()
+    window.quit()
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import pickle
+
+###############################################################################
+# RESULT CACHE CLASS                                                          #
+# In this file, an on-disk cache for the results of external solvers is       #
+# defined. Results are stored under a hash of the content that determines     #
+# them, such that an identical analysis costs a file read instead of a        #
+# solver run.                                                                 #
+#                                                                             #
+# Inputs:                                                                     #
+# - Directory in which the cached results are stored                          #
+# - Maximum size of the cache directory in bytes. If it is exceeded, the      #
+#   least recently used results are removed.                                  #
+###############################################################################
+
+
+def content_hash(*content):
+    """ This function returns a hash of the given content. The content is
+    written to a canonical text representation first, so equal content
+    always results in the same hash. """
+    text = json.dumps(content, sort_keys=True, default=repr)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class ResultCache(object):
+
+    extension = '.pkl'
+
+    def __init__(self, directory, max_size=256 * 1024 ** 2):
+        self.directory = directory
+        self.max_size = max_size
+
+    def path(self, key):
+        """ Returns the path of the file in which the result of the given
+        key is stored. """
+        return os.path.join(self.directory, key + self.extension)
+
+    def keys(self, prefix=""):
+        """ Returns the keys of all stored results that start with the
+        given prefix. """
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return [name[:-len(self.extension)] for name in names
+                if name.startswith(prefix) and name.endswith(self.extension)]
+
+    def get(self, key):
+        """ Returns the stored result of the given key, or None if the
+        result is not in the cache. The access time of the file is updated,
+        which is used for the least recently used eviction. """
+        filename = self.path(key)
+        try:
+            with open(filename, 'rb') as f:
+                result = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        # the file may have been evicted by another process in the meantime
+        try:
+            os.utime(filename)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key, result):
+        """ Stores the result under the given key. The file is written
+        under a temporary name first, such that other processes never read
+        a partially written result. """
+        os.makedirs(self.directory, exist_ok=True)
+        filename = self.path(key)
+        temporary = filename + '.' + str(os.getpid()) + '.tmp'
+        with open(temporary, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, filename)
+        self.evict()
+
+    def evict(self):
+        """ Removes the least recently used results until the total size of
+        the cache is below the maximum size. """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.extension):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total_size = sum(entry[1] for entry in entries)
+        for mtime, size, name in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total_size -= size
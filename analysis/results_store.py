@@ -0,0 +1,190 @@
+import json
+import os
+
+import numpy as np
+
+###############################################################################
+# RESULTS STORE CLASS                                                         #
+# In this file, a columnar store for the results of evaluated designs is      #
+# defined. Every column is kept in its own file, to which the rows are only   #
+# appended. Numerical columns are stored as fixed width binary arrays, such   #
+# that they can be read memory-mapped, and filtered and plotted without       #
+# re-running any of the analyses.                                             #
+#                                                                             #
+# Inputs:                                                                     #
+# - Directory in which the columns are stored                                 #
+###############################################################################
+
+
+class ResultsStore(object):
+
+    schema_name = 'schema.json'
+    text_type = 'json'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.schema = {}
+        schema_file = os.path.join(directory, self.schema_name)
+        if os.path.exists(schema_file):
+            with open(schema_file) as f:
+                self.schema = json.load(f)
+        self.repair()
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def columns(self):
+        """ Returns the names of the stored columns. """
+        return list(self.schema)
+
+    @property
+    def rows(self):
+        """ Returns the amount of complete rows in the store. A row that was
+        only partially written, for example due to a crash, is not counted.
+        """
+        counts = [self.column_rows(name) for name in self.schema]
+        return min(counts) if counts else 0
+
+    def path(self, name):
+        """ Returns the path of the file in which the given column is
+        stored. """
+        extension = '.jsonl' if self.is_text(name) else '.bin'
+        return os.path.join(self.directory, name + extension)
+
+    def is_text(self, name):
+        """ Returns whether the given column contains text instead of
+        numbers. """
+        return self.schema[name]['dtype'] == self.text_type
+
+    def row_size(self, name):
+        """ Returns the amount of bytes of a single row of a numerical
+        column. """
+        column = self.schema[name]
+        return (np.dtype(column['dtype']).itemsize
+                * int(np.prod(column['shape'], dtype=int)))
+
+    def column_rows(self, name):
+        """ Returns the amount of rows written to the given column. """
+        filename = self.path(name)
+        if not os.path.exists(filename):
+            return 0
+        if self.is_text(name):
+            with open(filename, 'rb') as f:
+                return sum(1 for line in f if line.endswith(b'\n'))
+        return os.path.getsize(filename) // self.row_size(name)
+
+    def repair(self):
+        """ Removes the rows that were only written to part of the columns,
+        such that all columns have the same amount of rows again. """
+        rows = self.rows
+        for name in self.schema:
+            filename = self.path(name)
+            if not os.path.exists(filename) or self.column_rows(name) == rows:
+                continue
+            if self.is_text(name):
+                with open(filename, 'rb') as f:
+                    lines = f.readlines()[:rows]
+                with open(filename, 'wb') as f:
+                    f.writelines(lines)
+            else:
+                os.truncate(filename, rows * self.row_size(name))
+
+    def add_column(self, name, value):
+        """ Adds a column to the schema, based on the first value that is
+        stored in it. Numbers, booleans and arrays of these are stored as
+        floats, with the shape of the first value as fixed width. Other
+        values, and empty lists, are stored as JSON text. Rows that were
+        appended before the column existed are filled with NaN (or null).
+        """
+        rows = self.rows
+        array = np.asarray(value)
+        if array.dtype.kind in 'biuf' and (array.size or not array.shape):
+            self.schema[name] = {'dtype': '<f8', 'shape': list(array.shape)}
+        else:
+            self.schema[name] = {'dtype': self.text_type, 'shape': []}
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path(name), 'ab') as f:
+            for _ in range(rows):
+                f.write(self.encode(name, None))
+
+        schema_file = os.path.join(self.directory, self.schema_name)
+        with open(schema_file + '.tmp', 'w') as f:
+            json.dump(self.schema, f, indent=4)
+        os.replace(schema_file + '.tmp', schema_file)
+
+    def encode(self, name, value):
+        """ Returns the bytes of a single row of the given column. Arrays
+        that are smaller than the width of the column are padded with NaN.
+        """
+        column = self.schema[name]
+        if self.is_text(name):
+            return (json.dumps(value) + '\n').encode('utf-8')
+
+        row = np.full(column['shape'], np.nan, dtype=column['dtype'])
+        if value is not None:
+            array = np.asarray(value, dtype=float)
+            if array.ndim != row.ndim or any(
+                    size > width for size, width in zip(array.shape,
+                                                        row.shape)):
+                raise ValueError("Value of shape " + str(array.shape)
+                                 + " does not fit in column '" + name
+                                 + "' of shape " + str(row.shape))
+            row[tuple(slice(0, size) for size in array.shape)] = array
+        return row.tobytes()
+
+    def append(self, row):
+        """ Appends a row to the store. The row is a dictionary with a value
+        per column; columns that are missing from the row are filled with
+        NaN (or null), and new columns are added to the schema. """
+        for name, value in row.items():
+            if name not in self.schema:
+                self.add_column(name, value)
+
+        encoded = {name: self.encode(name, row.get(name))
+                   for name in self.schema}
+        for name, data in encoded.items():
+            with open(self.path(name), 'ab') as f:
+                f.write(data)
+
+    def append_report(self, report, prefix=""):
+        """ Appends a (nested) report dictionary, as returned by Batch.py, to
+        the store. The column names are the keys joined with dots. """
+        self.append(flatten_report(report, prefix))
+
+    def column(self, name):
+        """ Returns the stored values of the given column. Numerical columns
+        are returned as a read-only memory-mapped array with the amount of
+        rows as first dimension. Text columns are returned as a list. """
+        rows = self.rows
+        if self.is_text(name):
+            with open(self.path(name)) as f:
+                return [json.loads(line) for line, _ in zip(f, range(rows))]
+
+        column = self.schema[name]
+        shape = tuple([rows] + column['shape'])
+        if rows == 0:
+            return np.empty(shape, dtype=column['dtype'])
+        return np.memmap(self.path(name), dtype=column['dtype'], mode='r',
+                         shape=shape)
+
+    def read(self, names=None):
+        """ Returns a dictionary with the stored values of the given columns,
+        or of all columns if no names are given. """
+        return {name: self.column(name)
+                for name in (self.columns if names is None else names)}
+
+
+def flatten_report(report, prefix=""):
+    """ This function flattens a nested report dictionary to a single row,
+    in which the column names are the keys joined with dots. Lists are kept,
+    such that spanwise distributions are stored as arrays. """
+    row = {}
+    for key, value in report.items():
+        name = prefix + str(key)
+        if isinstance(value, dict):
+            row.update(flatten_report(value, name + "."))
+        else:
+            row[name] = value
+    return row
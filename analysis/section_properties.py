@@ -1,7 +1,13 @@
 from analysis.spoiler_files.section import Section
+from analysis.spoiler_files.level_of_detail import mesh_deflection
+from analysis.structural_methods import thin_walled_section_properties, \
+    equispaced_polylines, plane_cuts
 from parapy.core import *
+from parapy.core.validate import OneOf
 from parapy.geom import *
-from math import atan, cos, sin, radians
+from math import radians
+
+import numpy as np
 
 
 ###############################################################################
@@ -22,6 +28,10 @@ from math import atan, cos, sin, radians
 #   cross sectional airfoil cutouts of the main plate. Optionally,            #
 #   n_discretise can be set higher in order to get a more accurate            #
 #   approximation of several of the sectional properties.                     #
+# - (OPTIONAL) cut_method: "intersection" intersects the lofted surface with #
+#   a plane per cutout. "parametric" samples the lofted surface on a (u, v)   #
+#   grid and cuts the sampled grid with the planes, without building any     #
+#   intersection curves.                                                      #
 ###############################################################################
 
 class SectionProperties(GeomBase):
@@ -37,6 +47,12 @@ class SectionProperties(GeomBase):
     # Inputs for the discretisation of the spoiler sections
     n_cuts = Input()
     n_discretise = Input(120)
+    cut_method = Input("intersection",
+                       validator=OneOf(["parametric", "intersection"]))
+    # Amount of samples along the surface per equidistant point, from which
+    # the equidistant points are interpolated for the parametric cut method
+    oversampling = Input(4)
+    level_of_detail = Input("analysis")
 
     @Part(in_tree=False)
     def sections(self):
@@ -72,7 +88,8 @@ class SectionProperties(GeomBase):
                               rotation_point=self.position.point,
                               vector=self.position.Vy,
                               angle=radians(-self.spoiler_angle),
-                              mesh_deflection=1e-4)
+                              mesh_deflection=mesh_deflection(
+                                  self.level_of_detail))
 
     @Attribute
     def cutout_curves(self):
@@ -106,49 +123,59 @@ class SectionProperties(GeomBase):
         return crv
 
     @Attribute
-    def amount_of_lines(self):
-        """ This attribute returns the amount of needed discretised straight
-        lines on each of the cutout curves. """
-        return self.n_discretise - 1
+    def surface_samples(self):
+        """ This attribute samples the lofted surface on a grid of its u
+        parameter (along the sections) and v parameter (along the span),
+        and returns the points as an array of shape (n_v, n_u, 3). The
+        surface is evaluated point by point, since OCC has no evaluation of
+        a whole grid at once. """
+        surface = self.surface_lofted
+        u_samples = np.linspace(surface.u1, surface.u2,
+                                self.oversampling * self.n_discretise)
+        v_samples = np.linspace(surface.v1, surface.v2,
+                                self.oversampling * self.n_cuts)
+        points = [surface.point(u, v) for v in v_samples for u in u_samples]
+        return np.array([[point.x, point.y, point.z] for point in points]
+                        ).reshape((len(v_samples), len(u_samples), 3))
 
     @Attribute
-    def lines_on_airfoil(self):
-        """ This attribute creates small linear lines between each of the
-        coordinate points of the cutout curves along the spoiler. """
-        line_segment_list = []
-        for i in range(self.n_cuts):
-            line_segment_list.append([])
-            for j in range(self.amount_of_lines):
-                line_segment_list[i].append(
-                    LineSegment(start=self.coordinates_sections_points[i][j],
-                                end=self.coordinates_sections_points[i][
-                                    j + 1]))
-        return line_segment_list
+    def parametric_coordinates(self):
+        """ This attribute cuts the sampled lofted surface with the same
+        planes as cutout_curves, see plane_cuts() in structural_methods.py,
+        and interpolates n_discretise equidistant points along each cutout.
+        Since every iso-u line is cut at the exact y-location of the plane,
+        the cutouts are also correct if the sections move in y along the
+        chord. It returns an array of shape (n_cuts, n_discretise, 3). """
+        y_cuts = self.position.point.y + np.linspace(
+            0., self.spoiler_span / 2, self.n_cuts)
+        return equispaced_polylines(plane_cuts(self.surface_samples, y_cuts),
+                                    self.n_discretise)
+
+    @Attribute
+    def section_coordinates(self):
+        """ This attribute returns the coordinates of the cutouts as an
+        array of shape (n_cuts, n_discretise, 3), such that the sectional
+        properties of all cutouts can be calculated at once. """
+        if self.cut_method == "parametric":
+            return self.parametric_coordinates
+        return np.array([[[point.x, point.y, point.z] for point in points]
+                         for points in self.coordinates_sections_points])
+
+    @Attribute
+    def thin_walled_properties(self):
+        """ This attribute calculates the area, centroid, moments of inertia
+        and enclosed area of each of the cutouts along the spoiler. The
+        cutouts are discretised by straight line segments between each of
+        the coordinate points, see thin_walled_section_properties() in
+        structural_methods.py. """
+        return thin_walled_section_properties(self.section_coordinates,
+                                              self.spoiler_skin_thickness)
 
     @Attribute
     def centroid_calculation(self):
-        """ This attribute calculates the centroid's position (x, y and z
+        """ This attribute returns the centroid's position (x, y and z
         coordinate) of each of the cutout curves along the spoiler. """
-        centroid_calculation_list = []
-        for i in range(self.n_cuts):
-            x = 0
-            y = self.lines_on_airfoil[i][0].position.y
-            z = 0
-            for j in range(self.amount_of_lines):
-                x = x + (self.lines_on_airfoil[i][j].midpoint.x
-                         * self.lines_on_airfoil[i][j].length
-                         * self.spoiler_skin_thickness) \
-                    / (self.amount_of_lines
-                       * self.lines_on_airfoil[i][j].length
-                       * self.spoiler_skin_thickness)
-                z = z + (self.lines_on_airfoil[i][j].midpoint.z
-                         * self.lines_on_airfoil[i][j].length
-                         * self.spoiler_skin_thickness) \
-                    / (self.amount_of_lines
-                       * self.lines_on_airfoil[i][j].length
-                       * self.spoiler_skin_thickness)
-            centroid_calculation_list.append([x, y, z])
-        return centroid_calculation_list
+        return self.thin_walled_properties[1].tolist()
 
     @Attribute
     def centroid(self):
@@ -163,92 +190,17 @@ class SectionProperties(GeomBase):
 
     @Attribute
     def area_along_spoiler(self):
-        """ This attribute calculates the total cross sectional area of each
+        """ This attribute returns the total cross sectional area of each
         of the cutouts along the spoiler. """
-        area_list = []
-        for i in range(self.n_cuts):
-            area_cut = []
-            for j in range(self.amount_of_lines):
-                area_cut.append(self.lines_on_airfoil[i][j].length
-                                * self.spoiler_skin_thickness)
-            area_list.append(sum(area_cut))
-        return area_list
-
-    @Attribute
-    def moment_inertia_displaced_area(self):
-        """ This attribute calculates the first part (due to displaced area
-        theorem) of the moment of inertia of each of the cutouts. It
-        calculates the area of each of the line segments on the cutouts and
-        multiplies it with the square of the distance between the line
-        segment and the centroid of that cutout. """
-        moment_inertia_displaced_area_list = []
-        for i in range(self.n_cuts):
-            ix_area = 0
-            iz_area = 0
-            ixz_area = 0
-            for j in range(self.amount_of_lines):
-                ix_area = ix_area + (self.lines_on_airfoil[i][j].length
-                                     * self.spoiler_skin_thickness) \
-                          * (self.lines_on_airfoil[i][j].midpoint.z
-                             - self.centroid_calculation[i][2]) ** 2
-                iz_area = iz_area + (self.lines_on_airfoil[i][j].length
-                                     * self.spoiler_skin_thickness) \
-                          * (self.lines_on_airfoil[i][j].midpoint.x
-                             - self.centroid_calculation[i][0]) ** 2
-                ixz_area = ixz_area + (self.lines_on_airfoil[i][j].length
-                                       * self.spoiler_skin_thickness) \
-                           * (self.lines_on_airfoil[i][j].midpoint.z
-                              - self.centroid_calculation[i][2]) \
-                           * (self.lines_on_airfoil[i][j].midpoint.x
-                              - self.centroid_calculation[i][0])
-            moment_inertia_displaced_area_list.append([ix_area,
-                                                       iz_area,
-                                                       ixz_area])
-        return moment_inertia_displaced_area_list
-
-    @Attribute
-    def moment_inertia_area_rectangle(self):
-        """ This attribute calculates the second part (due to geometric
-        properties) of the moment of inertia of each of the cutouts. It
-        calculates for each of the (angled) line segments along the cutout,
-        the moments of inertia of a rectangle. """
-        moment_inertia_area_rectangle_list = []
-        for i in range(self.n_cuts):
-            ix = 0
-            iz = 0
-            ixz = 0
-            for j in range(self.amount_of_lines):
-                iu = 1 / 12 * self.lines_on_airfoil[i][
-                    j].length * self.spoiler_skin_thickness ** 3
-                iw = 1 / 12 * self.spoiler_skin_thickness * \
-                     self.lines_on_airfoil[i][j].length ** 3
-                theta = radians(90) if abs(
-                    self.lines_on_airfoil[i][j].point1.x -
-                    self.lines_on_airfoil[i][j].point2.x) < (10 ** -10) \
-                    else atan((self.lines_on_airfoil[i][j].point1.z -
-                               self.lines_on_airfoil[i][j].point2.z)
-                              / (self.lines_on_airfoil[i][j].point1.x -
-                                 self.lines_on_airfoil[i][j].point2.x))
-                ix = ix + ((iu + iw) / 2 + (iu - iw) / 2 * cos(2 * theta))
-                iz = iz + ((iu + iw) / 2 - (iu - iw) / 2 * cos(2 * theta))
-                ixz = ixz + ((iu - iw) / 2 * sin(2 * theta))
-            moment_inertia_area_rectangle_list.append([ix, iz, ixz])
-        return moment_inertia_area_rectangle_list
+        return self.thin_walled_properties[0].tolist()
 
     @Attribute
     def moment_inertia_total(self):
-        """ This attribute calculates the total moments of inertia (Ixx,
-        Izz, Ixz) from the displaced area and geometric attributes above. """
-        moment_inertia_list = []
-        for i in range(self.n_cuts):
-            ix_total = self.moment_inertia_displaced_area[i][0] + \
-                       self.moment_inertia_area_rectangle[i][0]
-            iz_total = self.moment_inertia_displaced_area[i][1] + \
-                       self.moment_inertia_area_rectangle[i][1]
-            ixz_total = self.moment_inertia_displaced_area[i][2] + \
-                        self.moment_inertia_area_rectangle[i][2]
-            moment_inertia_list.append([ix_total, iz_total, ixz_total])
-        return moment_inertia_list
+        """ This attribute returns the total moments of inertia (Ixx, Izz,
+        Ixz) of each of the cutouts. These consist of a part due to the
+        displaced area of the line segments on the cutouts and a part due to
+        the geometric properties of each (angled) line segment. """
+        return self.thin_walled_properties[2].tolist()
 
     @Attribute
     def full_moment_of_inertia(self):
@@ -300,11 +252,13 @@ class SectionProperties(GeomBase):
 
     @Attribute
     def ribs_area(self):
-        """ This attribute calculates the cross sectional area of each of
-        the ribs. """
+        """ This attribute retrieves the cross sectional area of each of
+        the ribs, which is the area enclosed by the cutout at the rib
+        position. """
+        enclosed_area = self.thin_walled_properties[3]
         ribs_area_list = []
         for i in range(round((self.n_ribs + 2) / 2)):
-            ribs_area_list.append(Face(self.rib_curves[i]).area)
+            ribs_area_list.append(enclosed_area[self.position_ribs[i]])
         ribs_area_list = ribs_area_list[::-1] + ribs_area_list[1:]
         return ribs_area_list
 
@@ -1,7 +1,7 @@
 from .strut_airfoil import StrutAirfoil
 from .strut_plate import StrutPlate
 from .strut_assembly import Struts
-from .car_model import Car
+from .car_model import Car, CarProperties
 from .endplate import Endplate
 from .endplate_assembly import Endplates
 from .mainplate import MainPlate
@@ -0,0 +1,53 @@
+from parapy.geom import Point
+
+import numpy as np
+import os
+
+DIR = os.path.dirname(__file__)
+
+###############################################################################
+# AIRFOIL LIBRARY                                                             #
+# In this file, the airfoils of the library (the "airfoils" folder of the     #
+# application) are read. Every airfoil file is only read once per process;    #
+# the coordinates are kept as read-only arrays and the points as a tuple,     #
+# which are shared by all sections that use the airfoil.                      #
+###############################################################################
+
+AIRFOIL_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(DIR)),
+                                 'airfoils')
+
+# Coordinates and points of the airfoils that have been read, per name
+loaded_coordinates = {}
+loaded_points = {}
+
+
+def airfoil_file(name):
+    """ This function returns the path of the library file of the airfoil
+    with the given name. """
+    return os.path.join(AIRFOIL_DIRECTORY, name + '.dat')
+
+
+def airfoil_coordinates(name):
+    """ This function returns the (x, z) coordinates of the library airfoil
+    with the given name as a read-only array, or None if the airfoil is not
+    in the library. """
+    if name not in loaded_coordinates:
+        filename = airfoil_file(name)
+        if not os.path.isfile(filename):
+            return None
+        coordinates = np.loadtxt(filename, ndmin=2)[:, :2]
+        coordinates.setflags(write=False)
+        loaded_coordinates[name] = coordinates
+    return loaded_coordinates[name]
+
+
+def airfoil_points(name):
+    """ This function returns the points of the library airfoil with the
+    given name in the x-z plane, or None if the airfoil is not in the
+    library. """
+    if name not in loaded_points:
+        coordinates = airfoil_coordinates(name)
+        if coordinates is None:
+            return None
+        loaded_points[name] = tuple(Point(x, 0, z) for x, z in coordinates)
+    return loaded_points[name]
@@ -1,4 +1,8 @@
-from analysis.spoiler_files import MainPlate, Endplates, Struts, Car
+from analysis.spoiler_files import MainPlate, Endplates, Struts, Car, \
+    CarProperties
+from analysis.spoiler_files.level_of_detail import LEVELS_OF_DETAIL
+from analysis.spoiler_files.car_model import car_positions, car_heights, \
+    car_avl_angle
 from parapy.core import Input, Attribute, Part, child, DynamicType
 from parapy.core.validate import *
 from parapy.geom import *
@@ -46,6 +50,13 @@ class Spoiler(GeomBase):
     car_width = Input()
     car_maximum_height = Input()
     car_middle_to_back_ratio = Input()
+    # If False, the car geometry is not built, which is the case for spoilers
+    # that are only used in an analysis.
+    car_geometry = Input(True)
+
+    # Level of detail of the tessellation, see level_of_detail.py
+    level_of_detail = Input("analysis",
+                            validator=OneOf(list(LEVELS_OF_DETAIL)))
 
     @Attribute
     def reference_area(self):
@@ -66,6 +77,7 @@ class Spoiler(GeomBase):
                          chord=self.spoiler_chord,
                          angle=self.spoiler_angle,
                          tip_cant=self.endplate_cant,
+                         level_of_detail=self.level_of_detail,
                          # The position of the plates is determined by the
                          # input distance between the plates and the strut
                          # sweep angle.
@@ -97,15 +109,17 @@ class Spoiler(GeomBase):
                       strut_thickness=self.strut_thickness,
                       strut_sweep=self.strut_sweep,
                       strut_cant=self.strut_cant,
-                      main=self.main_plate)
+                      main=self.main_plate,
+                      level_of_detail=self.level_of_detail)
 
     @Attribute
     def endplate_height(self):
         """ This attribute calculates the vertical distance between the top
         and bottom of the plate(s). This is then defined as the endplate
-        height. """
-        z1 = self.main_plate[0].surface.edges[-1].bbox.bounds[2]
-        z2 = self.main_plate[-1].surface.edges[-1].bbox.bounds[5]
+        height. The bounds of the tips are calculated analytically, such that
+        the rotated main plates are not needed. """
+        z1 = self.main_plate[0].tip_bounds[2]
+        z2 = self.main_plate[-1].tip_bounds[5]
         return z2, (z2 - z1)
 
     @Attribute
@@ -113,8 +127,8 @@ class Spoiler(GeomBase):
         """"  This attribute calculates the horizontal distance between the top
         and bottom of the plate(s). This is then defined as the endplate
         chord. """
-        x1 = self.main_plate[0].surface.edges[-1].bbox.bounds[0]
-        x2 = self.main_plate[-1].surface.edges[-1].bbox.bounds[3]
+        x1 = self.main_plate[0].tip_bounds[0]
+        x2 = self.main_plate[-1].tip_bounds[3]
         return x2, (x2 - x1)
 
     @Part
@@ -134,21 +148,40 @@ class Spoiler(GeomBase):
                            hide=False if self.endplate_present else True,
                            hidden=False if self.endplate_present else True)
 
+    @Attribute
+    def car_avl_angle(self):
+        """ This attribute returns the angle of deflection for the AVL
+        analysis due to the car body. It is calculated from the car inputs
+        directly, so the car model is not needed. """
+        return car_avl_angle(self.car_length, self.car_maximum_height,
+                             self.car_middle_to_back_ratio)
+
+    @Attribute
+    def car_position(self):
+        """ This attribute returns the position of the car model, such that
+        the struts are mounted on the back of the car. """
+        return translate(self.position,
+                         "x", -car_positions(self.car_length)[0][6]
+                         + self.spoiler_chord / 2
+                         * (1 - self.strut_chord_fraction)
+                         + self.spoiler_chord / 2
+                         * self.strut_chord_fraction
+                         - self.strut_height
+                         * tan(radians(self.strut_sweep)),
+                         "y", -self.car_width/2,
+                         "z", -car_heights(self.car_maximum_height,
+                                           self.car_middle_to_back_ratio)[6]
+                         - self.strut_height + 38.)
+
     @Part
     def car_model(self):
-        """ This part returns the car model. """
-        return Car(length_car=self.car_length,
-                   width_car=self.car_width,
-                   max_height_car=self.car_maximum_height,
-                   middle_to_back_height_ratio=self.car_middle_to_back_ratio,
-                   position=translate(self.position,
-                                      "x", -self.car_model.positions[0][6]
-                                      + self.spoiler_chord / 2
-                                      * (1 - self.strut_chord_fraction)
-                                      + self.spoiler_chord / 2
-                                      * self.strut_chord_fraction
-                                      - self.strut_height
-                                      * tan(radians(self.strut_sweep)),
-                                      "y", -self.car_width/2,
-                                      "z", -self.car_model.heights[6]
-                                      - self.strut_height + 38.))
+        """ This part returns the car model. If the car geometry is not
+        needed, only the scalar properties of the car are returned. """
+        return DynamicType(type=Car if self.car_geometry else CarProperties,
+                           length_car=self.car_length,
+                           width_car=self.car_width,
+                           max_height_car=self.car_maximum_height,
+                           middle_to_back_height_ratio=
+                           self.car_middle_to_back_ratio,
+                           level_of_detail=self.level_of_detail,
+                           position=self.car_position)
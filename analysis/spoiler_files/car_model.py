@@ -1,5 +1,7 @@
 from parapy.core import Input, Attribute, Part, child
 from parapy.geom import *
+from analysis.spoiler_files.level_of_detail import mesh_deflection
+from analysis.spoiler_files.shape_cache import shape_cache, shape_key
 from math import radians, atan, pi
 
 import numpy as np
@@ -7,6 +9,9 @@ import numpy as np
 ###############################################################################
 # CAR MODEL CLASS                                                             #
 # In this file, a simple car model is defined                                 #
+# The scalar properties of the car (positions, heights and AVL angle) are     #
+# defined separately in CarProperties, which builds no geometry. It is used   #
+# instead of the Car for spoilers that are only used in an analysis.          #
 #                                                                             #
 # Inputs:                                                                     #
 # - Length of the car                                                         #
@@ -16,48 +21,70 @@ import numpy as np
 ###############################################################################
 
 
-class Car(GeomBase):
+def car_positions(length_car):
+    """ This function returns the x_positions of the curves for the lofted
+    car solid, as well as the x location of the wheels and spoiler position.
+    All positions are based on a generic high-performance LM GTE Pro car,
+    and are scaled with the inputted car length. """
+    x_curves = np.array([0, 0.0563, 0.1958, 0.2925, 0.5000, 0.5625, 0.9375,
+                         1.0000]) * length_car
+    x_wheels = np.array([0.1958, 0.8133]) * length_car
+    x_spoiler = 0.8688 * length_car
+    return x_curves, x_wheels, x_spoiler
+
+
+def car_heights(max_height_car, middle_to_back_height_ratio):
+    """ This function returns the height of the curves for the lofted car
+    solid. All values are based on a generic high-performance LM GTE Pro
+    car, and are scaled with the inputted maximum car height and middle to
+    back height ratio. """
+    height_curves = np.array(
+        [0.35574718, 0.49558236, 0.57875287, 0.66370742, 0.95573868,
+         1., 0.72742333, 0.69203976]) * max_height_car
+    height_curves[6] = height_curves[5] / middle_to_back_height_ratio
+    height_curves[7] = height_curves[6] / 1.05
+    return height_curves
+
+
+def car_avl_angle(length_car, max_height_car, middle_to_back_height_ratio):
+    """ This function calculates the angle of deflection for the AVL
+    analysis, due to the car body. It is assumed that the deflection angle
+    is dependent on the aft height change of the body. """
+    heights = car_heights(max_height_car, middle_to_back_height_ratio)
+    positions = car_positions(length_car)[0]
+    dif_height = (heights[5] - heights[7])
+    dif_position = (positions[7] - positions[5])
+    return atan(dif_height / dif_position) / 1.5 * 180 / pi
+
+
+class CarProperties(GeomBase):
 
     length_car = Input()
     width_car = Input()
     max_height_car = Input()
     middle_to_back_height_ratio = Input()
+    level_of_detail = Input("analysis")
 
     @Attribute
     def positions(self):
         """ This attribute returns the x_positions of the curves for the
         lofted car solid, as well as the x location of the wheels and
-        spoiler position. All positions are based on a generic
-        high-performance LM GTE Pro car, and are scaled with the inputted
-        car length. """
-        x_curves = np.array([0, 0.0563, 0.1958, 0.2925, 0.5000, 0.5625, 0.9375,
-                             1.0000]) * self.length_car
-        x_wheels = np.array([0.1958, 0.8133]) * self.length_car
-        x_spoiler = 0.8688 * self.length_car
-        return x_curves, x_wheels, x_spoiler
+        spoiler position. """
+        return car_positions(self.length_car)
 
     @Attribute
     def heights(self):
         """ This attribute returns the height of the curves for the lofted
-        car solid. All values are based on a generic high-performance LM GTE
-        Pro car, and are scaled with the inputted maximum car height and
-        middle to back height ratio. """
-        height_curves = np.array(
-            [0.35574718, 0.49558236, 0.57875287, 0.66370742, 0.95573868,
-             1., 0.72742333, 0.69203976]) * self.max_height_car
-        height_curves[6] = height_curves[5] / self.middle_to_back_height_ratio
-        height_curves[7] = height_curves[6] / 1.05
-        return height_curves
+        car solid. """
+        return car_heights(self.max_height_car,
+                           self.middle_to_back_height_ratio)
 
     @Attribute
     def avl_angle(self):
         """ This attribute calculates the angle of deflection for the AVL
-        analysis, due to the car body. It is assumed that the deflection
-        angle is dependent on the aft height change of the body. """
-        dif_height = (self.heights[5] - self.heights[7])
-        dif_position = (self.positions[0][7] - self.positions[0][5])
-        angle = atan(dif_height / dif_position) / 1.5 * 180 / pi
-        return angle
+        analysis, due to the car body. """
+        return car_avl_angle(self.length_car, self.max_height_car,
+                             self.middle_to_back_height_ratio)
 
     @Attribute
     def wheels_properties(self):
@@ -67,6 +94,9 @@ class Car(GeomBase):
         width_wheels = 80.
         return height_wheels, radius_wheels, width_wheels
 
+
+class Car(CarProperties):
+
     @Part(in_tree=False)
     def curves(self):
         """ This part returns several rectangular curves, which are
@@ -125,7 +155,8 @@ class Car(GeomBase):
         """ This part created the lofted car solid from the chamfered
         curves. """
         return LoftedSolid(profiles=self.chamfered_curve,
-                           mesh_deflection=1e-4)
+                           mesh_deflection=mesh_deflection(
+                               self.level_of_detail))
 
     @Attribute
     def edges(self):
@@ -150,12 +181,29 @@ class Car(GeomBase):
         solid. """
         return FilletedSolid(built_from=self.lofted_car,
                              edge_table=self.edges,
-                             mesh_deflection=1e-5)
+                             mesh_deflection=mesh_deflection(
+                                 self.level_of_detail, fine=True))
+
+    @Attribute
+    def shape_inputs(self):
+        """ This attribute returns the inputs that define the shapes of the
+        car, which are used for the keys in the shape cache. """
+        return [self.length_car, self.width_car, self.max_height_car,
+                self.middle_to_back_height_ratio, self.position]
 
     @Part(in_tree=False)
     def wheel(self):
         """ This attribute creates a single wheel instance, by rotating and
-        translating a Cylinder solid, and later filleting it. """
+        translating a Cylinder solid, and later filleting it. The wheel is
+        taken from the shape cache if it has been built before. """
+        return Solid(built_from=shape_cache.get(
+            shape_key("car_wheel", self.shape_inputs),
+            lambda: self.filleted_wheel))
+
+    @Attribute
+    def filleted_wheel(self):
+        """ This attribute creates the filleted wheel solid, which is only
+        evaluated if the wheel is not in the shape cache. """
         return FilletedSolid(
             built_from=
             TranslatedShape(shape_in=
@@ -247,10 +295,15 @@ class Car(GeomBase):
     @Part(in_tree=False)
     def subtracted_car(self):
         """ This part creates a subtracted solid from the filleted car and
-        the tools, to create a car with wheel bays. """
-        return SubtractedSolid(shape_in=self.filleted_car,
-                               tool=self.tools,
-                               mesh_deflection=1e-4)
+        the tools, to create a car with wheel bays. The filleting and
+        subtraction are the most expensive operations of the car, so the
+        result is taken from the shape cache if the same car has been built
+        before. """
+        return Solid(built_from=shape_cache.get(
+            shape_key("car_body", self.shape_inputs),
+            lambda: SubtractedSolid(shape_in=self.filleted_car,
+                                    tool=self.tools)),
+            mesh_deflection=mesh_deflection(self.level_of_detail))
 
     @Part
     def car_model(self):
@@ -260,4 +313,5 @@ class Car(GeomBase):
                             rotation_point=self.position,
                             vector=Vector(0, 1, 0),
                             angle=radians(-90),
-                            mesh_deflection=1e-5)
+                            mesh_deflection=mesh_deflection(
+                                self.level_of_detail, fine=True))
@@ -1,5 +1,6 @@
 from parapy.core import *
 from parapy.geom import *
+from analysis.spoiler_files.shape_cache import shape_cache, shape_key
 
 from math import sin, radians
 
@@ -55,7 +56,12 @@ class Endplate(GeomBase):
     @Part
     def solid(self):
         """ This part is the resulting solid based on the upper and the lower
-        curve. This is the end product of the endplate class. """
-        return FilletedSolid(built_from=RuledSolid(profile1=self.upper_curve,
-                                                   profile2=self.lower_curve),
-                             radius=self.thickness/3)
+        curve. This is the end product of the endplate class. The filleted
+        solid is taken from the shape cache if an endplate with the same
+        inputs has been built before. """
+        return Solid(built_from=shape_cache.get(
+            shape_key("endplate", self.chord, self.height, self.thickness,
+                      self.sweep, self.position),
+            lambda: FilletedSolid(built_from=RuledSolid(
+                profile1=self.upper_curve, profile2=self.lower_curve),
+                radius=self.thickness/3)))
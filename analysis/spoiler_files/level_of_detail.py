@@ -0,0 +1,25 @@
+###############################################################################
+# LEVEL OF DETAIL                                                             #
+# In this file, the tessellation tolerances of the geometry are defined per   #
+# level of detail. Every part takes the level of detail as input, and looks   #
+# up its mesh deflection here, such that a single setting on the Main or      #
+# Spoiler class controls the tessellation of the whole assembly.              #
+#                                                                             #
+# Levels of detail:                                                           #
+# - draft: coarse tessellation for interactive use and sweeps                 #
+# - analysis: default tessellation, the same as before the levels of detail  #
+# - export: finest tessellation, used for STEP export                         #
+###############################################################################
+
+# Mesh deflection of the plain parts and of the parts with a fine tessellation
+# (airfoil curves, filleted car, thick shells) per level of detail.
+LEVELS_OF_DETAIL = {"draft": {"plain": 1e-3, "fine": 1e-3},
+                    "analysis": {"plain": 1e-4, "fine": 1e-5},
+                    "export": {"plain": 1e-5, "fine": 1e-6}}
+
+
+def mesh_deflection(level_of_detail, fine=False):
+    """ This function returns the mesh deflection of a part for the given
+    level of detail. Parts with a fine tessellation get the fine mesh
+    deflection of the level. """
+    return LEVELS_OF_DETAIL[level_of_detail]["fine" if fine else "plain"]
@@ -2,8 +2,12 @@ from parapy.core import *
 from parapy.geom import *
 
 from analysis.spoiler_files.section import Section
+from analysis.spoiler_files.level_of_detail import mesh_deflection
+from analysis.spoiler_files.shape_cache import shape_cache, shape_key
 from math import radians
 
+import numpy as np
+
 ###############################################################################
 # MAIN PLATE CLASS                                                            #
 # In this file, the spoiler main plate is defined                             #
@@ -15,6 +19,8 @@ from math import radians
 # - Chord of the main plate                                                   #
 # - Angle of the main plate, positive defined upwards                         #
 # - Cant angle of the tip, positive defined inwards                           #
+# - (OPTIONAL) Amount of points on the tip section, from which the bounds of  #
+#   the rotated tip are calculated                                            #
 ###############################################################################
 
 
@@ -29,12 +35,17 @@ class MainPlate(GeomBase):
     chord = Input()
     angle = Input()
     tip_cant = Input()
+    level_of_detail = Input("analysis")
+    # Amount of points on the tip section from which the bounds of the
+    # rotated tip are calculated
+    n_tip_points = Input(200)
 
     @Attribute
     def wetted_area(self):
         """ This attribute retrieves the area of the main plate solid. This is
-        used as wetted area for the friction drag calculation. """
-        return 2 * self.surface.solids[0].area
+        used as wetted area for the friction drag calculation. The area does
+        not change with the rotation, so the unrotated solid is used. """
+        return 2 * self.lofted_solid.solids[0].area
 
     @Part(in_tree=False)
     def sections(self):
@@ -45,6 +56,7 @@ class MainPlate(GeomBase):
         return Section(quantify=len(self.airfoils),
                        airfoil_name=self.airfoils[child.index],
                        chord=self.chord,
+                       level_of_detail=self.level_of_detail,
                        position=self.position if child.index == 0
                        # Position the mid section at the mid of the main plate
                        else translate(child.previous.position,
@@ -61,19 +73,101 @@ class MainPlate(GeomBase):
                        # For the last section, also account for the tip cant
                        )
 
+    @Attribute
+    def loft_key(self):
+        """ This attribute returns the key of the lofted main plate solid in
+        the shape cache. The loft only depends on the sections, so the angle
+        of the main plate is not part of the key. """
+        return shape_key("main_plate_loft", self.airfoils, self.span,
+                         self.chord, self.tip_cant, self.position)
+
+    @Part(in_tree=False)
+    def lofted_solid(self):
+        """ Create a solid from the sections defined in the sections part.
+        The loft is taken from the shape cache if a main plate with the same
+        sections has been built before, for example in a previous iteration.
+        """
+        return Solid(built_from=shape_cache.get(
+            self.loft_key,
+            lambda: LoftedSolid(profiles=[section.curve
+                                          for section in self.sections])))
+
+    @Attribute
+    def section_points(self):
+        """ This attribute returns points on each of the sections of the
+        unrotated main plate, relative to the rotation point. They do not
+        depend on the angle of the main plate. """
+        origin = self.position.point
+        return [np.array([[point.x - origin.x, point.y - origin.y,
+                           point.z - origin.z]
+                          for point in
+                          section.curve.equispaced_points(self.n_tip_points)])
+                for section in self.sections]
+
+    @Attribute
+    def tip_points(self):
+        """ This attribute returns points on the tip section of the
+        unrotated main plate, relative to the rotation point. """
+        return self.section_points[-1]
+
+    @Attribute
+    def rotated_section_points(self):
+        """ This attribute returns the points on each of the sections of the
+        rotated main plate, relative to the rotation point. The points are
+        rotated analytically, in the same way as the surface, such that a
+        change of the angle does not require the rotated surface. """
+        axis = np.array([self.position.Vy.x, self.position.Vy.y,
+                         self.position.Vy.z])
+        axis /= np.linalg.norm(axis)
+        angle = radians(-self.angle)
+        # Rotation of the points about the axis (Rodrigues' formula)
+        return [points * np.cos(angle)
+                + np.cross(axis, points) * np.sin(angle)
+                + np.outer(points.dot(axis), axis) * (1 - np.cos(angle))
+                for points in self.section_points]
+
+    @Attribute
+    def tip_bounds(self):
+        """ This attribute returns the bounds (xmin, ymin, zmin, xmax, ymax,
+        zmax) of the tip section of the rotated main plate. """
+        origin = self.position.point
+        rotated = self.rotated_section_points[-1] \
+            + np.array([origin.x, origin.y, origin.z])
+        return np.concatenate((rotated.min(axis=0), rotated.max(axis=0)))
+
+    @Attribute
+    def lower_side(self):
+        """ This attribute returns the lower side of each of the sections of
+        the rotated main plate, relative to the rotation point. For each
+        section, it returns the mean y-location and the x- and z-coordinates
+        of the lower side, sorted from leading to trailing edge. """
+        sides = []
+        for points in self.rotated_section_points:
+            # Split the closed section at the leading and trailing edge
+            points = np.roll(points, -np.argmin(points[:, 0]), axis=0)
+            trailing_edge = np.argmax(points[:, 0])
+            branches = [points[:trailing_edge + 1],
+                        np.concatenate((points[trailing_edge:],
+                                        points[:1]))]
+            x = np.sort(points[:, 0])
+            z = np.min([np.interp(x, branch[np.argsort(branch[:, 0]), 0],
+                                  branch[np.argsort(branch[:, 0]), 2])
+                        for branch in branches], axis=0)
+            sides.append((np.mean(points[:, 1]), x, z))
+        return sides
+
     @Part
     def surface(self):
         """ Create the main plate based on the sections defined in the
         sections part. The main plate is then rotated based on the spoiler
         angle given as input. """
-        return RotatedShape(shape_in=LoftedSolid(profiles=[section.curve
-                                                 for section in self.sections],
-                                                 ),
+        return RotatedShape(shape_in=self.lofted_solid,
                             # Firstly, create a solid from the sections
                             rotation_point=self.position.point,
                             vector=self.position.Vy,
                             angle=radians(-self.angle),
-                            mesh_deflection=1e-4,
+                            mesh_deflection=mesh_deflection(
+                                self.level_of_detail),
                             # Rotate the solid to the desired spoiler angle
                             label="right_side"
                             )
@@ -83,14 +177,17 @@ class MainPlate(GeomBase):
         """ Create a lofted shell of the main plate based on the sections
         defined in the sections part. This instance is later used in the
         structural analysis of the spoiler. """
-        return RotatedShape(shape_in=LoftedShell(profiles=[section.curve
-                                                 for section in self.sections],
-                                                 ),
-                            # Firstly, create a shell from the sections
+        return RotatedShape(shape_in=Shell(built_from=shape_cache.get(
+            shape_key("main_plate_shell", self.loft_key),
+            lambda: LoftedShell(profiles=[section.curve
+                                          for section in self.sections]))),
+                            # Firstly, create a shell from the sections, which
+                            # is taken from the shape cache like the solid
                             rotation_point=self.position.point,
                             vector=self.position.Vy,
                             angle=radians(-self.angle),
-                            mesh_deflection=1e-4,
+                            mesh_deflection=mesh_deflection(
+                                self.level_of_detail),
                             # Rotate the shell to the desired spoiler angle
                             )
 
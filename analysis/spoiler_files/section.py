@@ -1,12 +1,11 @@
 from parapy.core import *
 from parapy.geom import *
 
+from analysis.spoiler_files.airfoil_library import airfoil_points
+from analysis.spoiler_files.level_of_detail import mesh_deflection
 from kbeutils.geom.curve import Naca4AirfoilCurve, Naca5AirfoilCurve
 from math import radians
 
-import sys
-import os
-
 ###############################################################################
 # SECTION CLASS                                                               #
 # In this file, a section profile is defined.                                 #
@@ -25,28 +24,21 @@ class Section(GeomBase):
     airfoil_name = Input()
 
     chord = Input()
+    level_of_detail = Input("analysis")
 
     @Attribute
     def airfoil_points(self):
         """ This attribute retrieves the coordinates from the data file in the
         library if an airfoil from the library is chosen. It returns a list
         with points, from which the airfoil curve is created. If a NACA
-        airfoil is chosen, then this attribute will return nothing. """
-
-        # Create the path for the airfoil file in the library.
-        filename = sys.path[1] + '\\airfoils\\' + self.airfoil_name + '.dat'
+        airfoil is chosen, then this attribute will return nothing. The
+        library file is only read once, see airfoil_library.py. """
+        points = airfoil_points(self.airfoil_name)
 
         # Return nothing if the chosen file is not in the library.
-        if not os.path.isfile(filename):
+        if points is None:
             return "A NACA airfoil is selected"
-
-        # Open the file, read the coordinates and return them in a list.
-        with open(filename, 'r') as f:
-            points = []
-            for line in f:
-                x, y = line.split(' ', 1)
-                points.append(Point(float(x), 0, float(y)))
-        return points
+        return list(points)
 
     @Part(in_tree=False)
     def airfoil(self):
@@ -65,7 +57,8 @@ class Section(GeomBase):
                            else FittedCurve,
                            points=self.airfoil_points,
                            designation=self.airfoil_name[4:],
-                           mesh_deflection=1e-5,
+                           mesh_deflection=mesh_deflection(
+                               self.level_of_detail, fine=True),
                            tolerance=1e-5,
                            position=XOY
                            )
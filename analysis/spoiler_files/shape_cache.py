@@ -0,0 +1,69 @@
+from analysis.result_cache import content_hash
+from collections import OrderedDict
+
+import numpy as np
+
+###############################################################################
+# SHAPE CACHE                                                                 #
+# In this file, a process-wide cache for the OCC shapes of the spoiler parts  #
+# is defined. The expensive shapes (lofts, fillets and boolean operations)    #
+# are stored under a hash of the inputs that define them, such that a part    #
+# of which the inputs did not change is not built again, for example in a     #
+# new Spoiler instance of an iterator. Only the OCC shape is stored, so the   #
+# cache does not keep old ParaPy objects alive.                               #
+###############################################################################
+
+
+def canonical(value, decimals=9):
+    """ This function converts an input value to a canonical form, which is
+    used to create the key of a shape. Numbers are rounded, points and
+    vectors are converted to their coordinates and positions to their point
+    and axes. """
+    if isinstance(value, (list, tuple)):
+        return [canonical(item, decimals) for item in value]
+    if isinstance(value, (bool, np.bool_, str)) or value is None:
+        return value
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return round(float(value), decimals)
+    if hasattr(value, 'point') and hasattr(value, 'Vx'):
+        return canonical([value.point, value.Vx, value.Vy, value.Vz],
+                         decimals)
+    if hasattr(value, 'x') and hasattr(value, 'y') and hasattr(value, 'z'):
+        return canonical([value.x, value.y, value.z], decimals)
+    return repr(value)
+
+
+def shape_key(name, *inputs):
+    """ This function returns the key of a shape, from the name of the shape
+    and the inputs that define it. """
+    return content_hash(name, canonical(list(inputs)))
+
+
+class ShapeCache(object):
+    """ Least recently used cache of OCC shapes. The memory of an OCC shape
+    cannot be measured from Python, so the cache is bounded by the amount of
+    shapes. """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.shapes = OrderedDict()
+
+    def get(self, key, build):
+        """ Returns the shape of the given key. If it is not in the cache,
+        the shape is created with the build function, which returns the
+        ParaPy shape of which the OCC shape is stored. """
+        if key in self.shapes:
+            self.shapes.move_to_end(key)
+            return self.shapes[key]
+        shape = build().TopoDS_Shape
+        self.shapes[key] = shape
+        while len(self.shapes) > self.max_entries:
+            self.shapes.popitem(last=False)
+        return shape
+
+    def clear(self):
+        """ Removes all shapes from the cache. """
+        self.shapes.clear()
+
+
+shape_cache = ShapeCache()
@@ -2,6 +2,7 @@ from math import radians, sin, cos, tan
 from parapy.core import Input, Attribute, Part
 from parapy.geom import *
 from kbeutils.geom.curve import Naca4AirfoilCurve
+from analysis.spoiler_files.level_of_detail import mesh_deflection
 import kbeutils.avl as avl
 
 ###############################################################################
@@ -28,6 +29,7 @@ class StrutAirfoil(GeomBase):
     strut_sweepback_angle = Input()
     strut_cant_angle = Input()
     main = Input()
+    level_of_detail = Input("analysis")
 
     @Attribute
     def strut_chord(self):
@@ -68,6 +70,13 @@ class StrutAirfoil(GeomBase):
         return 2 * self.strut_chord * self.strut_height * \
                (0.5*self.thickness_to_chord/100 + 1.98)
 
+    @Attribute
+    def section_area(self):
+        """ This attribute calculates the cross sectional area of the strut.
+        The area of a symmetric NACA 4-digit airfoil is 0.685 times the
+        thickness times the chord. """
+        return 0.685 * self.thickness_to_chord / 100 * self.strut_chord ** 2
+
     @Part(in_tree=False)
     def airfoil(self):
         """ Create the unscaled symmetric airfoil profile curve, based on
@@ -124,4 +133,5 @@ class StrutAirfoil(GeomBase):
         """
         return RuledSolid(profile1=self.extended_airfoil,
                           profile2=self.lower_curve_airfoil,
-                          mesh_deflection=1e-5)
+                          mesh_deflection=mesh_deflection(
+                              self.level_of_detail, fine=True))
@@ -1,7 +1,11 @@
 from analysis.spoiler_files import StrutAirfoil, StrutPlate
+from analysis.spoiler_files.level_of_detail import mesh_deflection
+from analysis.spoiler_files.shape_cache import shape_cache, shape_key
 from parapy.core import Input, Attribute, Part, child, DynamicType
 from parapy.geom import *
-from math import sin, cos, radians, floor
+from math import sin, cos, tan, radians, floor
+
+import numpy as np
 
 
 ###############################################################################
@@ -34,6 +38,7 @@ class Struts(GeomBase):
     strut_sweep = Input()
     strut_cant = Input()
     main = Input()
+    level_of_detail = Input("analysis")
 
     @Attribute
     def strut_y_position(self):
@@ -62,6 +67,52 @@ class Struts(GeomBase):
                                          / (self.strut_amount - 1) * i)
         return y_translation
 
+    @Attribute
+    def strut_x_position(self):
+        """ This attribute calculates the x-location of the leading edge of
+        the struts, such that they are centered below the chord of the main
+        plate (projected in x-direction). """
+        return (self.main[-1].chord * cos(radians(self.main[-1].angle))
+                - self.strut_chord_fraction * self.main[-1].chord
+                * cos(radians(self.main[-1].angle))) / 2
+
+    @Attribute
+    def strut_lengths(self):
+        """ This attribute calculates the vertical length of each of the
+        struts over one half of the span, from the bottom of the strut up to
+        the lower side of the main plate at which the strut is cut off. The
+        lower side is interpolated between the sections of the main plate
+        and averaged over the chord of the strut. """
+        main = self.main[-1]
+        origin = self.position.point
+        plate = main.position.point
+        height = plate.z - origin.z
+        sides = main.lower_side
+        lengths = []
+        for index, y in enumerate(self.strut_y_position):
+            cant = 0. if self.strut_amount % 2 != 0 and index == 0 \
+                else self.strut_cant
+            # The swept and canted strut is shifted at the height of the plate
+            x = self.strut_x_position + origin.x - plate.x \
+                + height * tan(radians(self.strut_sweep)) \
+                + np.linspace(0., self.struts.strut_chord, 21)
+            y = y + origin.y - plate.y + height * tan(radians(cant))
+            lower = [np.interp(x, side_x, side_z)
+                     for side_y, side_x, side_z in sides]
+            z = [np.interp(y, [side[0] for side in sides], section_z)
+                 for section_z in np.transpose(lower)]
+            lengths.append(self.strut_height + height + np.mean(z))
+        return lengths
+
+    @Attribute
+    def mean_strut_length(self):
+        """ This attribute calculates the mean length of all struts over the
+        full span. A strut at the mid of the spoiler is counted once, the
+        other struts are mirrored and counted twice. """
+        weights = [1 if self.strut_amount % 2 != 0 and index == 0 else 2
+                   for index in range(len(self.strut_lengths))]
+        return np.average(self.strut_lengths, weights=weights)
+
     @Part(in_tree=False)
     def struts(self):
         """ Create the struts. Depending on the input of
@@ -76,7 +127,9 @@ class Struts(GeomBase):
                            strut_sweepback_angle=self.strut_sweep,
                            strut_cant_angle=self.strut_cant,
                            main=self.main,
-                           mesh_deflection=1e-4)
+                           level_of_detail=self.level_of_detail,
+                           mesh_deflection=mesh_deflection(
+                               self.level_of_detail))
 
     @Part(in_tree=False)
     def struts_no_cant(self):
@@ -94,7 +147,9 @@ class Struts(GeomBase):
                            strut_sweepback_angle=self.strut_sweep,
                            strut_cant_angle=0.,
                            main=self.main,
-                           mesh_deflection=1e-4)
+                           level_of_detail=self.level_of_detail,
+                           mesh_deflection=mesh_deflection(
+                               self.level_of_detail))
 
     @Part(in_tree=False)
     def translated_strut(self):
@@ -110,11 +165,7 @@ class Struts(GeomBase):
                                and child.index == 0
                                else self.struts.strut,
                                displacement=
-                               Vector(x=(self.main[-1].chord
-                                         * cos(radians(self.main[-1].angle))
-                                         - self.strut_chord_fraction
-                                         * self.main[-1].chord
-                                         * cos(radians(self.main[-1].angle))) / 2,
+                               Vector(x=self.strut_x_position,
                                       y=self.strut_y_position[child.index]))
 
     @Part(in_tree=False)
@@ -127,7 +178,27 @@ class Struts(GeomBase):
                                 solid_in=self.main[-1].surface,
                                 tool=self.translated_strut[child.index],
                                 keep_tool=True,
-                                mesh_deflection=1e-4)
+                                mesh_deflection=mesh_deflection(
+                                    self.level_of_detail))
+
+    @Attribute
+    def cut_struts(self):
+        """ This attribute returns the cut-off strut shapes from the
+        partitioned solids. The partitioning is the most expensive operation
+        of the struts, so the cut-off struts are taken from the shape cache
+        if struts with the same inputs have been built before on the same
+        main plate. """
+        main = self.main[-1]
+        inputs = [self.strut_amount, self.strut_airfoil_shape,
+                  self.strut_lat_location, self.strut_height,
+                  self.strut_chord_fraction, self.strut_thickness,
+                  self.strut_sweep, self.strut_cant, main.loft_key,
+                  main.angle, self.main[0].span, self.position]
+        return [shape_cache.get(shape_key("strut", inputs, index),
+                                lambda: self.partitioned_solid[index]
+                                .solids[3])
+                for index in range(self.strut_amount
+                                   - floor(self.strut_amount / 2))]
 
     @Part
     def struts_right(self):
@@ -136,9 +207,8 @@ class Struts(GeomBase):
         return Solid(quantify=self.strut_amount - floor(self.strut_amount / 2)
                               - self.strut_amount % 2,
                      built_from=
-                     self.partitioned_solid[child.index
-                                            + self.strut_amount % 2].solids[3],
-                     mesh_deflection=1e-4)
+                     self.cut_struts[child.index + self.strut_amount % 2],
+                     mesh_deflection=mesh_deflection(self.level_of_detail))
 
     @Part
     def struts_left(self):
@@ -152,7 +222,8 @@ class Struts(GeomBase):
                              reference_point=Point(0., 0., 0.),
                              vector1=Vector(1., 0., 0.),
                              vector2=Vector(0., 0., 1.),
-                             mesh_deflection=1e-4)
+                             mesh_deflection=mesh_deflection(
+                                 self.level_of_detail))
 
     @Part
     def strut_mid(self):
@@ -160,7 +231,7 @@ class Struts(GeomBase):
         mid-section of the spoiler is defined here. It returns a single
         strut part which is located at the mid-section and has no cant
         angle. """
-        return TranslatedShape(shape_in=self.partitioned_solid[0].solids[3],
+        return TranslatedShape(shape_in=Solid(built_from=self.cut_struts[0]),
                                displacement=
                                Vector(0., -self.strut_thickness, 0.),
                                hidden=True if self.strut_amount % 2 == 0
@@ -30,6 +30,7 @@ class StrutPlate(GeomBase):
     strut_sweepback_angle = Input()
     strut_cant_angle = Input()
     main = Input()
+    level_of_detail = Input("analysis")
 
     @Attribute
     def strut_chord(self):
@@ -49,6 +50,12 @@ class StrutPlate(GeomBase):
                     2 * self.strut_height * self.strut_thickness +
                     2 * self.strut_chord * self.strut_thickness)
 
+    @Attribute
+    def section_area(self):
+        """ This attribute calculates the cross sectional area of the strut,
+        neglecting the fillets of the edges. """
+        return self.strut_chord * self.strut_thickness
+
     @Part(in_tree=False)
     def upper_curve_rectangle(self):
         """ Create the upper rectangular curve, based on the strut chord and
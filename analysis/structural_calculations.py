@@ -1,9 +1,12 @@
 from analysis.structural_methods import mainplate_bending_xz, bending_stress, \
-    normal_stress_due_to_strut, max_shear_stress, buckling_modes, failure_modes
+    normal_stress_due_to_strut, max_shear_stress, buckling_modes, \
+    failure_modes, mainplate_bending_fe
 from analysis.spoiler_files.assembly import Spoiler
 from analysis.section_properties import SectionProperties
 from analysis.weight_estimation import WeightEstimation
+from analysis.spoiler_files.level_of_detail import mesh_deflection
 from analysis.AVL_main import AvlAnalysis
+from analysis.popup_warnings import generate_warning
 from parapy.geom import *
 from parapy.core import *
 from math import tan, radians
@@ -12,18 +15,6 @@ from matplotlib import pyplot as plt
 import numpy as np
 
 
-# Import and define the pop-up warnings
-def generate_warning(warning_header, msg):
-    from tkinter import Tk, mainloop, X, messagebox
-
-    # initialization
-    window = Tk()
-    window.withdraw()
-
-    # generates message box
-    messagebox.showwarning(warning_header, msg)
-
-
 ###############################################################################
 # STRUCTURAL ANALYSIS CLASS                                                   #
 # In this file, the structural analysis for the spoiler is performed          #
@@ -38,11 +29,15 @@ def generate_warning(warning_header, msg):
 # - The maximum velocity of the car, to simulate the worst case scenario      #
 #   that the spoiler has to withstand.                                        #
 # - The air density at the moment of the aerodynamic analysis.                #
+# - (OPTIONAL) The aerodynamic backend, see AVL_main.py.                      #
 # - Young's modulus of the used material.                                     #
 # - Yield strength of the used material.                                      #
 # - Shear strength of the used material.                                      #
 # - Density of the used material.                                             #
 # - Poisson ratio of the used material.                                       #
+# - (OPTIONAL) The main plates that are analysed: "critical" analyses the     #
+#   first main plate, "all" analyses every main plate with its own span and   #
+#   lift, and the spoiler fails if any of them fails.                         #
 ###############################################################################
 
 
@@ -82,11 +77,26 @@ class StructuralAnalysis(GeomBase):
     n_ribs = Input(0)
     maximum_velocity = Input()
     air_density = Input()
+    aerodynamic_backend = Input("avl")
     youngs_modulus = Input()
     yield_strength = Input()
     shear_strength = Input()
     material_density = Input()
     poisson_ratio = Input()
+    volume_method = Input("analytic")
+    # "finite_element" solves the bending of the whole main plate with a beam
+    # finite element model, "integration" integrates the curvature of one
+    # half, see structural_methods.py. Both share the strut loads
+    # differently for more than two struts.
+    beam_method = Input("integration")
+    strut_stiffness = Input(None)  # [N/m], None for rigid struts
+    # [deg], a sideslip gives asymmetric loads, which are always solved with
+    # the finite element model
+    sideslip_angle = Input(0.)
+    # "critical" analyses only the plate with the highest lift, "all"
+    # analyses every main plate with its own loads and span
+    plate_mode = Input("critical")
+    level_of_detail = Input("analysis")
 
     @Part(in_tree=False)
     def spoiler_in_mm(self):
@@ -115,7 +125,9 @@ class StructuralAnalysis(GeomBase):
                        car_length=self.car_length * 1000,
                        car_width=self.car_width * 1000,
                        car_maximum_height=self.car_maximum_height * 1000,
-                       car_middle_to_back_ratio=self.car_middle_to_back_ratio)
+                       car_middle_to_back_ratio=self.car_middle_to_back_ratio,
+                       car_geometry=False,
+                       level_of_detail=self.level_of_detail)
 
     @Part
     def weight_estimation(self):
@@ -127,7 +139,12 @@ class StructuralAnalysis(GeomBase):
                                 self.spoiler_skin_thickness * 1000,
                                 ribs_area=self.area_of_ribs,
                                 spoiler_geometry=self.spoiler_in_mm,
-                                strut_amount=self.strut_amount)
+                                strut_amount=self.strut_amount,
+                                section_areas=self.sectional_properties
+                                .area_along_spoiler,
+                                volume_method=self.volume_method,
+                                plate_mode=self.plate_mode,
+                                level_of_detail=self.level_of_detail)
 
     @Attribute
     def weights(self):
@@ -138,45 +155,95 @@ class StructuralAnalysis(GeomBase):
                weight.weight_strut, weight.weight_ribs, weight.total_weight
 
     @Attribute
-    def get_distributed_forces(self):
-        """ This attribute calculates the lift and drag distributions from
-        AvlAnalysis, for the inputted maximum velocity that the spoiler has
-        to withstand. It also outputs distribution of y locations at which
-        these forces are applied. Note that it also uses a slight safety
-        factor of 1.25 on this maximum velocity. """
+    def force_analysis(self):
+        """ This attribute returns the aerodynamic analysis for the inputted
+        maximum velocity that the spoiler has to withstand. Note that it also
+        uses a slight safety factor of 1.25 on this maximum velocity. The
+        forces do not depend on the skin thickness and the amount of ribs, so
+        changing these inputs does not re-run the aerodynamic analysis. """
         # Define the safety factor and the case for the AVL analysis
         safety_factor = 1.25
-        case = [('AoA input',
-                 {'alpha': self.spoiler_in_mm.car_model.avl_angle})]
+        settings = {'alpha': self.spoiler_in_mm.car_avl_angle}
+        if self.asymmetric:
+            settings['beta'] = self.sideslip_angle
+        case = [('AoA input', settings)]
         # Perform the aerodynamic analysis
-        analysis = AvlAnalysis(spoiler_input=self.spoiler_in_mm,
-                               case_settings=case,
-                               velocity=self.maximum_velocity * safety_factor,
-                               density=self.air_density)
+        return AvlAnalysis(spoiler_input=self.spoiler_in_mm,
+                           case_settings=case,
+                           velocity=self.maximum_velocity * safety_factor,
+                           density=self.air_density,
+                           backend=self.aerodynamic_backend)
+
+    @Attribute
+    def asymmetric(self):
+        """ This attribute returns whether the loads on the spoiler are
+        asymmetric, which is the case in sideslip. """
+        return self.sideslip_angle != 0.
+
+    def plate_forces(self, plate, span):
+        """ This method returns the lift and drag distributions of the given
+        main plate, with the given span, from the aerodynamic analysis. It
+        also outputs distribution of y locations at which these forces are
+        applied. For symmetric loads, the strips of one half are mirrored;
+        for asymmetric loads, the strips of both halves are used. """
+        analysis = self.force_analysis
+        if self.asymmetric:
+            spacing = span / len(analysis.lift_distribution[0])
+            y_distribution = np.array(analysis.lift_distribution[0])[:, plate]
+            order = np.argsort(y_distribution, kind='stable')
+            lift_distribution = -np.array(analysis.lift_distribution[1])[
+                order, plate] * analysis.dyn_pressure * spacing
+            drag_distribution = np.array(analysis.drag_distribution[1])[
+                order, plate] * analysis.dyn_pressure * spacing
+            return lift_distribution.tolist(), drag_distribution.tolist(), \
+                y_distribution[order].tolist()
 
         # The outputted data is defined in a slightly off format. This
         # section places the lift, drag and y-distribution in a format to
         # comply with the rest of the class.
-        spacing = self.spoiler_span / len(
-            analysis.lift_distribution[0])
+        spacing = span / len(analysis.lift_distribution[0])
         lift_distribution = []
         drag_distribution = []
         y_distribution = []
-        i_crit = np.argmax(analysis.lift_distribution[1][0])
         for i in range(int(len(analysis.lift_distribution[0]) / 2)):
-            lift_distribution.append(-analysis.lift_distribution[1][i][i_crit]
+            lift_distribution.append(-analysis.lift_distribution[1][i][plate]
                                      * analysis.dyn_pressure
                                      * spacing)
-            drag_distribution.append(analysis.drag_distribution[1][i][i_crit]
+            drag_distribution.append(analysis.drag_distribution[1][i][plate]
                                      * analysis.dyn_pressure
                                      * spacing)
         for i in range(len(analysis.lift_distribution[0])):
-            y_distribution.append(analysis.lift_distribution[0][i][i_crit])
+            y_distribution.append(analysis.lift_distribution[0][i][plate])
         lift_distribution = lift_distribution[::-1] + lift_distribution
         drag_distribution = drag_distribution[::-1] + drag_distribution
         y_distribution = sorted(y_distribution)
         return lift_distribution, drag_distribution, y_distribution
 
+    @Attribute
+    def get_distributed_forces(self):
+        """ This attribute calculates the lift and drag distributions of the
+        critical main plate, which is the plate with the highest lift. It
+        also outputs distribution of y locations at which these forces are
+        applied. """
+        i_crit = np.argmax(self.force_analysis.lift_distribution[1][0])
+        return self.plate_forces(i_crit, self.spoiler_span)
+
+    @Attribute
+    def plate_spans(self):
+        """ This attribute returns the span of each of the main plates in m.
+        The spans differ due to the endplate cant. """
+        return [plate.span / 1000 for plate in self.spoiler_in_mm.main_plate]
+
+    @Attribute
+    def plate_distributed_forces(self):
+        """ This attribute returns the lift and drag distributions of every
+        main plate, as arrays of shape (plates, strips), and the y
+        locations of the forces of each plate. """
+        forces = [self.plate_forces(plate, span)
+                  for plate, span in enumerate(self.plate_spans)]
+        return [np.array([plate_forces[i] for plate_forces in forces])
+                for i in range(3)]
+
     @Attribute
     def force_y_location(self):
         """ This attribute renames the y_distribution from
@@ -211,7 +278,8 @@ class StructuralAnalysis(GeomBase):
                                  spoiler_skin_thickness=
                                  self.spoiler_skin_thickness,
                                  n_cuts=self.number_of_lateral_cuts,
-                                 n_ribs=self.n_ribs)
+                                 n_ribs=self.n_ribs,
+                                 level_of_detail=self.level_of_detail)
 
     @Attribute
     def area_of_ribs(self):
@@ -243,21 +311,18 @@ class StructuralAnalysis(GeomBase):
     @Attribute
     def centroid_coordinates(self):
         """ This attribute retrieves the centroid's location along the
-        spoiler, for the discretisation defined in number_of_lateral_cuts. """
-        half_centroid_list = self.sectional_properties.centroid
-        full_centroid_list = half_centroid_list[
-                             ::-1] + half_centroid_list[1:]
-        return full_centroid_list
+        spoiler, for the discretisation defined in number_of_lateral_cuts,
+        as an array of shape (n_cuts, 3). """
+        half_centroids = self.sectional_properties.thin_walled_properties[1]
+        return np.concatenate((half_centroids[::-1], half_centroids[1:]))
 
     @Attribute
     def cutout_coordinates(self):
         """ This attribute retrieves the coordinates of the cutouts along the
-        spoiler, for the discretisation defined in number_of_lateral_cuts. """
-        half_spoiler_coordinates = \
-            self.sectional_properties.coordinates_sections_points
-        full_spoiler_coordinates = half_spoiler_coordinates[
-                                   ::-1] + half_spoiler_coordinates[1:]
-        return full_spoiler_coordinates
+        spoiler, for the discretisation defined in number_of_lateral_cuts,
+        as an array of shape (n_cuts, n_discretise, 3). """
+        half_coordinates = self.sectional_properties.section_coordinates
+        return np.concatenate((half_coordinates[::-1], half_coordinates[1:]))
 
     @Attribute
     def bending_xz(self):
@@ -266,18 +331,23 @@ class StructuralAnalysis(GeomBase):
         the bending deflection angle and the bending moment along the
         spoiler (in x and z). It also returns the x and z forces on the
         struts. """
-        theta_x_i, theta_z_i, w_i, u_i, y_i, moment_x_i, moment_z_i, \
-        f_strut_z, f_strut_x = mainplate_bending_xz(
-            self.force_z, self.force_x,
-            self.youngs_modulus,
-            self.moment_of_inertia[0],
-            self.moment_of_inertia[1],
-            self.moment_of_inertia[2],
-            self.weights[0],
-            self.weights[1],
-            self.spoiler_span, self.spoiler_chord,
-            self.strut_lat_location,
-            self.strut_amount)
+        arguments = (self.force_z, self.force_x,
+                     self.youngs_modulus,
+                     self.moment_of_inertia[0],
+                     self.moment_of_inertia[1],
+                     self.moment_of_inertia[2],
+                     self.weights[0],
+                     self.weights[1],
+                     self.spoiler_span, self.spoiler_chord,
+                     self.strut_lat_location,
+                     self.strut_amount)
+        if self.beam_method == "finite_element" or self.asymmetric:
+            theta_x_i, theta_z_i, w_i, u_i, y_i, moment_x_i, moment_z_i, \
+            f_strut_z, f_strut_x = mainplate_bending_fe(
+                *arguments, strut_stiffness=self.strut_stiffness)
+        else:
+            theta_x_i, theta_z_i, w_i, u_i, y_i, moment_x_i, moment_z_i, \
+            f_strut_z, f_strut_x = mainplate_bending_xz(*arguments)
         return theta_x_i, theta_z_i, w_i, u_i, y_i, moment_x_i, moment_z_i, \
                f_strut_z, f_strut_x
 
@@ -324,15 +394,12 @@ class StructuralAnalysis(GeomBase):
         """ This attribute calculates the total maximum tensile and
         compressive stress along the spoiler, and it returns these values in
         MPa. """
-        max_normal_stress_tensile = []
-        max_normal_stress_compressive = []
-        for i in range(len(self.normal_bending_stress[0])):
-            max_normal_stress_tensile.append((self.normal_stress[i]
-                                              + max(
-                        self.normal_bending_stress[0][i])) / 10 ** 6)
-            max_normal_stress_compressive.append((self.normal_stress[i]
-                                                  + min(
-                        self.normal_bending_stress[0][i])) / 10 ** 6)
+        sigma_y = self.normal_bending_stress[0]
+        normal_stress = np.asarray(self.normal_stress[:len(sigma_y)])
+        max_normal_stress_tensile = (normal_stress
+                                     + np.max(sigma_y, axis=1)) / 10 ** 6
+        max_normal_stress_compressive = (normal_stress
+                                         + np.min(sigma_y, axis=1)) / 10 ** 6
         return max_normal_stress_tensile, max_normal_stress_compressive
 
     @Attribute
@@ -353,9 +420,7 @@ class StructuralAnalysis(GeomBase):
                                moi_xx, moi_zz, moi_xz, cutout_coordinates,
                                centroid_coordinates)
         # Convert to MPa
-        for i in range(len(tau)):
-            tau[i] = tau[i] / 10 ** 6
-        return tau
+        return tau / 10 ** 6
 
     @Attribute
     def critical_buckling_values(self):
@@ -381,26 +446,175 @@ class StructuralAnalysis(GeomBase):
     def failure(self):
         """ This attribute determines whether the spoiler can withstand the
         forces and stresses, or it fails. It returns several lists of bools,
-        determining due to which failure mode the spoiler will fail. """
-        occurred_failure = failure_modes(max(self.maximum_normal_stress[0]),
-                                         abs(min(
-                                             self.maximum_normal_stress[1])),
-                                         max([max(self.maximum_shear_stress),
-                                              abs(min(
-                                                  self.maximum_shear_stress))]),
-                                         max([max(self.bending_xz[2]),
-                                              abs(min(self.bending_xz[2]))]),
-                                         self.critical_buckling_values[0],
-                                         self.critical_buckling_values[1],
-                                         self.critical_buckling_values[2],
-                                         self.spoiler_span,
-                                         self.yield_strength,
-                                         self.shear_strength)
-        due_to_other_modes = occurred_failure[0]
-        due_to_ribs = occurred_failure[1]
-        due_to_which_mode = occurred_failure[2]
+        determining due to which failure mode the spoiler will fail. If all
+        plates are analysed, the spoiler fails if any of the plates fails;
+        the failure of each plate is given by plate_failure. """
+        if self.plate_mode == "all":
+            # The spoiler fails if any of the plates fails
+            plate_failure = self.plate_failure
+            due_to_other_modes = any(failure[0] for failure in plate_failure)
+            due_to_ribs = not due_to_other_modes and any(
+                failure[1] for failure in plate_failure)
+            due_to_which_mode = [any(modes) for modes in
+                                 zip(*[failure[2]
+                                       for failure in plate_failure])]
+        else:
+            occurred_failure = failure_modes(
+                max(self.maximum_normal_stress[0]),
+                abs(min(self.maximum_normal_stress[1])),
+                max([max(self.maximum_shear_stress),
+                     abs(min(self.maximum_shear_stress))]),
+                max([max(self.bending_xz[2]), abs(min(self.bending_xz[2]))]),
+                self.critical_buckling_values[0],
+                self.critical_buckling_values[1],
+                self.critical_buckling_values[2],
+                self.spoiler_span,
+                self.yield_strength,
+                self.shear_strength)
+            due_to_other_modes = occurred_failure[0]
+            due_to_ribs = occurred_failure[1]
+            due_to_which_mode = occurred_failure[2]
         return due_to_other_modes, due_to_ribs, due_to_which_mode
 
+    @Part
+    def plate_sectional_properties(self):
+        """ This part instance creates the SectionProperties of every main
+        plate, with the span of that plate. The plates have the same
+        airfoils and chord, but their spans differ due to the endplate
+        cant, so the cutouts are taken at other y-locations. """
+        return SectionProperties(quantify=len(self.plate_spans),
+                                 airfoils=self.spoiler_airfoils,
+                                 spoiler_span=self.plate_spans[child.index],
+                                 spoiler_chord=self.spoiler_chord,
+                                 spoiler_angle=self.spoiler_angle,
+                                 spoiler_skin_thickness=
+                                 self.spoiler_skin_thickness,
+                                 n_cuts=self.number_of_lateral_cuts,
+                                 n_ribs=self.n_ribs,
+                                 level_of_detail=self.level_of_detail)
+
+    @Attribute
+    def plate_moment_of_inertia(self):
+        """ This attribute retrieves the moments of inertia (Ixx, Izz and
+        Ixz) along every main plate, as arrays of shape (plates, cuts). """
+        moment_of_inertia = np.array([
+            properties.full_moment_of_inertia
+            for properties in self.plate_sectional_properties])
+        return moment_of_inertia[:, :, 0], moment_of_inertia[:, :, 1], \
+            moment_of_inertia[:, :, 2]
+
+    @Attribute
+    def plate_area_along_spoiler(self):
+        """ This attribute retrieves the cross sectional area along the
+        half-span of every main plate, as an array of shape (plates,
+        n_cuts). """
+        return np.array([properties.area_along_spoiler
+                         for properties in self.plate_sectional_properties])
+
+    @Attribute
+    def plate_cutout_coordinates(self):
+        """ This attribute retrieves the coordinates of the cutouts along
+        every main plate, as an array of shape (plates, cuts, n_discretise,
+        3), in the same way as cutout_coordinates. """
+        return np.array([np.concatenate((properties.section_coordinates[::-1],
+                                         properties.section_coordinates[1:]))
+                         for properties in self.plate_sectional_properties])
+
+    @Attribute
+    def plate_centroid_coordinates(self):
+        """ This attribute retrieves the centroids of the cutouts along
+        every main plate, as an array of shape (plates, cuts, 3). """
+        return np.array([np.concatenate(
+            (properties.thin_walled_properties[1][::-1],
+             properties.thin_walled_properties[1][1:]))
+            for properties in self.plate_sectional_properties])
+
+    @Attribute
+    def plate_bending_xz(self):
+        """ This attribute calculates the bending of every main plate with
+        its own loads, span and sectional properties, in the same way as
+        bending_xz. The weight of each plate is scaled with its span. """
+        lift, drag = self.plate_distributed_forces[:2]
+        if self.beam_method == "finite_element" or self.asymmetric:
+            bending = mainplate_bending_fe
+            options = {'strut_stiffness': self.strut_stiffness}
+        else:
+            bending = mainplate_bending_xz
+            options = {}
+        moi_xx, moi_zz, moi_xz = self.plate_moment_of_inertia
+        return [bending(lift[plate], drag[plate], self.youngs_modulus,
+                        moi_xx[plate], moi_zz[plate], moi_xz[plate],
+                        self.weights[0] * span / self.plate_spans[0],
+                        self.weights[1], span, self.spoiler_chord,
+                        self.strut_lat_location, self.strut_amount,
+                        **options)
+                for plate, span in enumerate(self.plate_spans)]
+
+    @Attribute
+    def plate_maximum_normal_stress(self):
+        """ This attribute calculates the maximum tensile and compressive
+        stress along every main plate in MPa, as arrays of shape (plates,
+        cuts). The bending stresses of all plates are calculated at once, by
+        stacking the cutouts of all plates. """
+        n_plates = len(self.plate_spans)
+        bending = self.plate_bending_xz
+        cutouts = self.plate_cutout_coordinates
+        sigma_y = bending_stress(
+            np.concatenate([plate[5] for plate in bending]),
+            np.concatenate([plate[6] for plate in bending]),
+            *[moi.ravel() for moi in self.plate_moment_of_inertia],
+            cutouts.reshape((-1,) + cutouts.shape[2:]),
+            self.plate_centroid_coordinates.reshape((-1, 3)))[0]
+        sigma_y = sigma_y.reshape((n_plates, -1, sigma_y.shape[1]))
+
+        normal_stress = np.array([
+            normal_stress_due_to_strut(
+                plate[7] * tan(radians(self.strut_cant)), plate[4],
+                np.concatenate((area[::-1], area[1:])),
+                self.strut_lat_location, span,
+                self.strut_amount)[:sigma_y.shape[1]]
+            for plate, span, area in zip(bending, self.plate_spans,
+                                         self.plate_area_along_spoiler)])
+        return (normal_stress + np.max(sigma_y, axis=2)) / 10 ** 6, \
+            (normal_stress + np.min(sigma_y, axis=2)) / 10 ** 6
+
+    @Attribute
+    def plate_maximum_shear_stress(self):
+        """ This attribute calculates the maximum shear stress along every
+        main plate in MPa, as an array of shape (plates, cuts). All plates
+        are calculated at once. """
+        lift, drag = self.plate_distributed_forces[:2]
+        return max_shear_stress(lift, drag, self.spoiler_skin_thickness,
+                                *self.plate_moment_of_inertia,
+                                self.plate_cutout_coordinates,
+                                self.plate_centroid_coordinates) / 10 ** 6
+
+    @Attribute
+    def plate_failure(self):
+        """ This attribute determines for every main plate whether it can
+        withstand the forces and stresses, with the sectional properties
+        and span of that plate. It returns the result of failure_modes() of
+        each plate, see the failure attribute. """
+        tensile, compressive = self.plate_maximum_normal_stress
+        moi_xx, moi_zz = self.plate_moment_of_inertia[:2]
+        failure = []
+        for plate, span in enumerate(self.plate_spans):
+            buckling_values = buckling_modes(self.n_ribs, span,
+                                             self.spoiler_chord,
+                                             self.spoiler_skin_thickness,
+                                             moi_xx[plate], moi_zz[plate],
+                                             self.plate_area_along_spoiler[
+                                                 plate],
+                                             self.youngs_modulus,
+                                             self.poisson_ratio)
+            failure.append(failure_modes(
+                np.max(tensile[plate]), abs(np.min(compressive[plate])),
+                np.max(np.abs(self.plate_maximum_shear_stress[plate])),
+                np.max(np.abs(self.plate_bending_xz[plate][2])),
+                *buckling_values, span, self.yield_strength,
+                self.shear_strength))
+        return failure
+
     @Part
     def structural_mainplate(self):
         """ This part returns a thick main plate instance, representing the
@@ -409,7 +623,8 @@ class StructuralAnalysis(GeomBase):
                          built_from=self.weight_estimation.thick_mainplate
                          if child.index == 0
                          else self.weight_estimation.thick_mainplate_mirror,
-                         mesh_deflection=1e-5)
+                         mesh_deflection=mesh_deflection(
+                             self.level_of_detail, fine=True))
 
     @Part
     def structural_ribs(self):
@@ -425,8 +640,11 @@ class StructuralAnalysis(GeomBase):
                              spoiler_skin_thickness=
                              self.spoiler_skin_thickness * 1000,
                              n_cuts=self.number_of_lateral_cuts,
-                             n_ribs=self.n_ribs).ribs_total[child.index],
-                         mesh_deflection=1e-5)
+                             n_ribs=self.n_ribs,
+                             level_of_detail=self.level_of_detail
+                         ).ribs_total[child.index],
+                         mesh_deflection=mesh_deflection(
+                             self.level_of_detail, fine=True))
 
     @action(label="Plot the normal stress along the spoiler")
     def plot_normal_stress(self):
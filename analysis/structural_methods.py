@@ -1,41 +1,17 @@
 import numpy as np
 from math import floor
+from scipy.linalg import solveh_banded
 
 g = 9.80665
 
 
-def distributed_force_moment(force_list, y_i, y_current):
-    """
-    This function is used in the calculation of the moment due to the
-    distributed lift/weight/drag force of the spoiler as used in
-    mainplate_bending_xz below. It uses a distributed
-    force (force_list), the y-positions of that distributed force (y_i) and
-    a current y location (y_current)
-    """
-
-    moment_list = []
-    for i in range(len(force_list)):
-        if y_i[i] < y_current:
-            outcome = force_list[i] * (y_current - y_i[i])
-        else:
-            outcome = 0
-        moment_list.append(outcome)
-    return sum(moment_list)
-
-
-def mainplate_bending_xz(lift, drag, E, Ixx, Izz, Ixz, spoiler_weight,
-                         endplate_weight, spoiler_span, spoiler_chord,
-                         strut_lat_location, strut_amount):
+def strut_positions(spoiler_span, strut_lat_location, strut_amount):
     """
-    This function calculates the bending moment along the spoiler in x and
-    z, as well as the bending displacement in x and z. It uses as inputs the
-    aerodynamic forces on the spoiler, the material and sectional properties
-    of the spoiler and the geometric properties of the spoiler.
+    Function which returns the sorted y-locations of the struts along the
+    spoiler span, measured from the left tip of the main plate. The most
+    outboard struts are placed at strut_lat_location times the half-span
+    from the mid of the spoiler, the others are distributed equidistantly.
     """
-
-    # retrieve y-location of the struts
-    strut_location_1 = spoiler_span / 2 * (1 - strut_lat_location)
-    strut_location_2 = spoiler_span / 2 * (1 + strut_lat_location)
     strut_locations = []
     amount = strut_amount - floor(strut_amount / 2)
     if strut_amount % 2 == 0:
@@ -46,7 +22,6 @@ def mainplate_bending_xz(lift, drag, E, Ixx, Izz, Ixz, spoiler_weight,
             strut_locations.append(-strut_lat_location * spoiler_span
                                    / (strut_amount - 1) / 2 * (2 * i + 1)
                                    + spoiler_span / 2)
-        strut_locations = sorted(strut_locations)
     else:
         for i in range(amount):
             if i == 0:
@@ -58,129 +33,347 @@ def mainplate_bending_xz(lift, drag, E, Ixx, Izz, Ixz, spoiler_weight,
                 strut_locations.append(-strut_lat_location * spoiler_span
                                        / (strut_amount - 1) * i
                                        + spoiler_span / 2)
-        strut_locations = sorted(strut_locations)
+    return sorted(strut_locations)
+
+
+def distributed_force_moment(force_list, y_i, y_current):
+    """
+    This function is used in the calculation of the moment due to the
+    distributed lift/weight/drag force of the spoiler as used in
+    mainplate_bending_xz below. It uses a distributed
+    force (force_list), the y-positions of that distributed force (y_i) and
+    one or more current y locations (y_current). Only the forces inboard of
+    y_current contribute, which is evaluated with cumulative sums over the
+    sorted force positions.
+    """
+    force_list = np.asarray(force_list, dtype=float)
+    y_i = np.asarray(y_i, dtype=float)
+    order = np.argsort(y_i, kind='stable')
+    y_sorted = y_i[order]
+    force_sorted = force_list[order]
 
-    total_strut_locations = strut_locations
-    total_strut_locations.append(0.)
-    total_strut_locations.append(spoiler_span)
-    total_strut_locations = sorted(total_strut_locations)
+    # cumulative force and cumulative first moment of the force about y = 0
+    cumulative_force = np.concatenate(([0.], np.cumsum(force_sorted)))
+    cumulative_moment = np.concatenate(([0.], np.cumsum(force_sorted
+                                                        * y_sorted)))
+
+    # number of forces strictly inboard of each current y location
+    n_inboard = np.searchsorted(y_sorted, y_current, side='left')
+    return (np.asarray(y_current) * cumulative_force[n_inboard]
+            - cumulative_moment[n_inboard])
+
+
+def mainplate_bending_xz(lift, drag, E, Ixx, Izz, Ixz, spoiler_weight,
+                         endplate_weight, spoiler_span, spoiler_chord,
+                         strut_lat_location, strut_amount):
+    """
+    This function calculates the bending moment along the spoiler in x and
+    z, as well as the bending displacement in x and z. It uses as inputs the
+    aerodynamic forces on the spoiler, the material and sectional properties
+    of the spoiler and the geometric properties of the spoiler. All
+    spanwise quantities are evaluated on arrays at once, such that the
+    computational cost scales linearly with the amount of span-wise strips.
+    """
+    lift = np.asarray(lift, dtype=float)
+    drag = np.asarray(drag, dtype=float)
+    Ixx = np.asarray(Ixx, dtype=float)
+    Izz = np.asarray(Izz, dtype=float)
+    Ixz = np.asarray(Ixz, dtype=float)
+    n = len(lift)
+
+    # retrieve y-location of the struts
+    strut_location_2 = spoiler_span / 2 * (1 + strut_lat_location)
+    strut_locations = np.array(strut_positions(spoiler_span,
+                                               strut_lat_location,
+                                               strut_amount))
 
     # calculating y-coordinate, area and weight at each increment i. the
     # weight distribution is approximated by separate weight forces along
     # the spoiler, which are appropriate to the area of the spoiler at each i.
-    y_i = np.zeros(len(lift) + 1)
-    y_ii = np.zeros(len(lift))
-    area_i = np.zeros(len(lift))
-    weight_i = np.zeros(len(lift))
-    di = spoiler_span / len(lift)
-
-    for i in range(len(lift) + 1):
-        y_i[i] = round(i * di, 3)
-
-    for i in range(len(lift)):
-        y_ii[i] = y_i[i] + (y_i[i + 1] - y_i[i]) / 2
-        area_i[i] = spoiler_chord * di
-        weight_i[i] = -spoiler_weight * g / (spoiler_chord * spoiler_span) \
-            * area_i[i]
+    di = spoiler_span / n
+    y_i = np.array([round(i * di, 3) for i in range(n + 1)])
+    y_ii = y_i[:-1] + (y_i[1:] - y_i[:-1]) / 2
+    area_i = np.full(n, spoiler_chord * di)
+    weight_i = -spoiler_weight * g / (spoiler_chord * spoiler_span) * area_i
 
     # adding the weight of the endplate to the first and last weight_i
     weight_i[0] += endplate_weight * g
     weight_i[-1] += endplate_weight * g
 
     # calculate the z-force on the strut by sum of forces in z
-    f_strut_z = -(sum(lift) + sum(weight_i)) / strut_amount
+    f_strut_z = -(np.sum(lift) + np.sum(weight_i)) / strut_amount
     # calculate the z-force on the strut by sum of forces in x
-    f_strut_x = -sum(drag) / strut_amount
+    f_strut_x = -np.sum(drag) / strut_amount
 
     # calculate the influence of the lift and weight on the bending moment
     # for each increment i
-    moment_lift_i = []
-    moment_weight_i = []
-    moment_drag_i = []
-    for i in range(len(lift) + 1):
-        y_set = y_i[i]
-        moment_lift = distributed_force_moment(lift, y_ii, y_set)
-        moment_weight = distributed_force_moment(weight_i, y_ii, y_set)
-        moment_drag = distributed_force_moment(drag, y_ii, y_set)
-        moment_lift_i.append(moment_lift)
-        moment_weight_i.append(moment_weight)
-        moment_drag_i.append(moment_drag)
-
-    # calculating the moment in x along the spoiler
-    moment_x_i = []
-    tsl = total_strut_locations
-    for j in range(strut_amount + 1):
-        for i in range(len(lift) + 1):
-            y_set = y_i[i]
-            strut_moment = [f_strut_z * (y_set - x) for x in strut_locations]
-            if tsl[j] <= y_set < tsl[j + 1]:
-                mom_i = sum(strut_moment[0:j]) + moment_lift_i[i] + \
-                        moment_weight_i[i]
-                moment_x_i.append(mom_i)
-    moment_x_i.append(0.)
-
-    # calculating the moment in x along the spoiler
-    moment_z_i = []
-    tsl = total_strut_locations
-    for j in range(strut_amount + 1):
-        for i in range(len(drag) + 1):
-            y_set = y_i[i]
-            strut_moment = [f_strut_x * (y_set - x) for x in strut_locations]
-            if tsl[j] <= y_set < tsl[j + 1]:
-                mom_i = sum(strut_moment[0:j]) + moment_drag_i[i]
-                moment_z_i.append(mom_i)
-    moment_z_i.append(0.)
+    moment_lift_i = distributed_force_moment(lift, y_ii, y_i)
+    moment_weight_i = distributed_force_moment(weight_i, y_ii, y_i)
+    moment_drag_i = distributed_force_moment(drag, y_ii, y_i)
+
+    # the struts inboard of each increment i add a point force moment. The
+    # tip of the main plate itself is free, so the moment is zero there.
+    inboard_struts = strut_locations[np.newaxis, :] <= y_i[:, np.newaxis]
+    strut_arm = np.sum(np.where(inboard_struts,
+                                y_i[:, np.newaxis]
+                                - strut_locations[np.newaxis, :], 0.),
+                       axis=1)
+    on_spoiler = (y_i >= 0.) & (y_i < spoiler_span)
+
+    # calculating the moment in x and z along the spoiler
+    moment_x_i = np.where(on_spoiler, f_strut_z * strut_arm + moment_lift_i
+                          + moment_weight_i, 0.)
+    moment_z_i = np.where(on_spoiler, f_strut_x * strut_arm + moment_drag_i,
+                          0.)
 
     # Calculate deflection angles and displacement using Euler-Bernoulli
     # beam theory in unsymmetrical bending. The deflection angle (theta) in the
     # centerline of the spoiler is 0. The deflections at the struts are
     # considered equal to 0. Deflections in z are described by w,
     # and deflections in x are described by u.
-    w_double_prime = np.zeros(len(lift) + 1)
-    u_double_prime = np.zeros(len(drag) + 1)
-    theta_x_i = np.zeros(len(lift) + 1)
-    theta_z_i = np.zeros(len(drag) + 1)
-    for i in range(len(lift) + 1):
-        w_double_prime[i] = (moment_z_i[i] * Ixz[i] / (E * Ixx[i] * Izz[i])
-                             - moment_x_i[i] / (E * Ixx[i])) \
-                            / (1 - Ixz[i] ** 2 / (Ixx[i] * Izz[i]))
-        u_double_prime[i] = (moment_x_i[i] * Ixz[i] / (E * Ixx[i] * Izz[i])
-                             - moment_z_i[i] / (E * Izz[i])) \
-                            / (1 - Ixz[i] ** 2 / (Ixx[i] * Izz[i]))
-
-    for i in range(int(len(lift) / 2) + 1, len(lift) + 1):
-        theta_x_i[i] = theta_x_i[i - 1] + 0.5 * (
-                -w_double_prime[i] - w_double_prime[i - 1]) * (
-                               y_i[i] - y_i[i - 1])
-        theta_z_i[i] = theta_z_i[i - 1] + 0.5 * (
-                -u_double_prime[i] - u_double_prime[i - 1]) * (
-                               y_i[i] - y_i[i - 1])
-
+    w_double_prime = (moment_z_i * Ixz / (E * Ixx * Izz)
+                      - moment_x_i / (E * Ixx)) \
+        / (1 - Ixz ** 2 / (Ixx * Izz))
+    u_double_prime = (moment_x_i * Ixz / (E * Ixx * Izz)
+                      - moment_z_i / (E * Izz)) \
+        / (1 - Ixz ** 2 / (Ixx * Izz))
+
+    # integrate the curvature with the trapezoidal rule from the centerline
+    # towards the tip of the spoiler
+    half = int(n / 2)
+    dy = np.diff(y_i[half:])
+    theta_x_i = np.zeros(n + 1)
+    theta_z_i = np.zeros(n + 1)
+    theta_x_i[half + 1:] = np.cumsum(0.5 * (-w_double_prime[half + 1:]
+                                            - w_double_prime[half:-1]) * dy)
+    theta_z_i[half + 1:] = np.cumsum(0.5 * (-u_double_prime[half + 1:]
+                                            - u_double_prime[half:-1]) * dy)
+
+    # integrate the deflection angles in the same way, after which the
+    # deflection is shifted to be zero just inboard of the outer strut
     index_strut = np.where(y_i >= strut_location_2)[0][0]
-    w_i = np.zeros(len(lift) + 1)
-    u_i = np.zeros(len(lift) + 1)
-    for i in range(index_strut, len(lift) + 1):
-        w_i[i] = w_i[i - 1] + 0.5 * (theta_x_i[i] + theta_x_i[i - 1]) * (
-                y_i[i] - y_i[i - 1])
-        u_i[i] = u_i[i - 1] + 0.5 * (theta_z_i[i] + theta_z_i[i - 1]) * (
-                y_i[i] - y_i[i - 1])
-
-    for i in range(index_strut + 1, int(len(lift) / 2), -1):
-        w_i[i - 1] = w_i[i] - 0.5 * (theta_x_i[i] + theta_x_i[i - 1]) * (
-                y_i[i] - y_i[i - 1])
-        u_i[i - 1] = u_i[i] - 0.5 * (theta_z_i[i] + theta_z_i[i - 1]) * (
-                y_i[i] - y_i[i - 1])
-
-    for i in range(int(len(lift) / 2)):
-        theta_x_i[i] = theta_x_i[len(lift) - i]
-        theta_z_i[i] = theta_z_i[len(lift) - i]
-        w_i[i] = w_i[len(lift) - i]
-        u_i[i] = u_i[len(lift) - i]
+    w_i = np.zeros(n + 1)
+    u_i = np.zeros(n + 1)
+    w_i[half + 1:] = np.cumsum(0.5 * (theta_x_i[half + 1:]
+                                      + theta_x_i[half:-1]) * dy)
+    u_i[half + 1:] = np.cumsum(0.5 * (theta_z_i[half + 1:]
+                                      + theta_z_i[half:-1]) * dy)
+    w_i[half:] -= w_i[index_strut - 1]
+    u_i[half:] -= u_i[index_strut - 1]
+
+    # mirror the results to the other half of the spoiler
+    mirror = np.arange(n, n - half, -1)
+    theta_x_i[:half] = theta_x_i[mirror]
+    theta_z_i[:half] = theta_z_i[mirror]
+    w_i[:half] = w_i[mirror]
+    u_i[:half] = u_i[mirror]
 
     return theta_x_i, theta_z_i, w_i, u_i, y_i, moment_x_i, moment_z_i, \
         f_strut_z, f_strut_x
 
 
+def mainplate_bending_fe(lift, drag, E, Ixx, Izz, Ixz, spoiler_weight,
+                         endplate_weight, spoiler_span, spoiler_chord,
+                         strut_lat_location, strut_amount,
+                         strut_stiffness=None):
+    """
+    This function calculates the same bending moments, deflection angles,
+    deflections and strut forces as mainplate_bending_xz, with an
+    Euler-Bernoulli beam finite element model of the whole span instead of
+    integrating the curvature of one half. The nodes are the y-locations of
+    the strips and of the struts, and every node has a deflection and a
+    deflection angle in z (w) and in x (u). The unsymmetric bending couples
+    w and u through Ixz. The lift and drag may be asymmetric, for example
+    in sideslip. The struts are springs on w and u with the given stiffness
+    [N/m]; if no stiffness is given, they are rigid and the deflections at
+    the struts are eliminated from the system of equations. A single strut
+    is also clamped in rotation. The banded stiffness matrix is solved with
+    scipy.linalg.solveh_banded, such that the cost scales linearly with the
+    amount of strips. The results are returned at the strip nodes.
+
+    Note that the load sharing differs from mainplate_bending_xz, which
+    divides the total load equally over the struts. Here, the beam is
+    statically indeterminate for more than two struts, and the load is
+    shared according to the stiffness of the beam and the struts. The
+    strut forces that are returned are those of the most loaded strut, so
+    for more than two struts these forces and the moments differ from
+    those of mainplate_bending_xz; for two struts and a symmetric load they
+    are the same.
+    """
+    lift = np.asarray(lift, dtype=float)
+    drag = np.asarray(drag, dtype=float)
+    n = len(lift)
+
+    # y-coordinate of the strip nodes and strips, and the weight of each
+    # strip. Unlike in mainplate_bending_xz, the nodes are not rounded,
+    # since rounded nodes coincide for strips narrower than 1 mm.
+    di = spoiler_span / n
+    y_i = np.arange(n + 1) * di
+    y_ii = y_i[:-1] + (y_i[1:] - y_i[:-1]) / 2
+    weight_i = np.full(n, -spoiler_weight * g / n)
+    weight_i[0] += endplate_weight * g
+    weight_i[-1] += endplate_weight * g
+    strut_locations = np.array(strut_positions(spoiler_span,
+                                               strut_lat_location,
+                                               strut_amount))
+
+    # a node is added at every strut that does not coincide with a strip
+    # node, such that the struts act on the degrees of freedom of a node
+    distance = np.abs(strut_locations[:, np.newaxis] - y_i[np.newaxis, :])
+    separate = np.min(distance, axis=1) > 10 ** -3 * di
+    y_nodes = np.sort(np.concatenate((y_i, strut_locations[separate])))
+    strip_nodes = np.searchsorted(y_nodes, y_i)
+    strut_nodes = np.argmin(np.abs(strut_locations[:, np.newaxis]
+                                   - y_nodes[np.newaxis, :]), axis=1)
+    inertia = np.array([np.interp(y_nodes, y_i, np.asarray(moi, dtype=float)
+                                  * np.ones(n + 1))
+                        for moi in (Ixx, Ixz, Izz)])
+    inertia = np.array([[inertia[0], inertia[1]], [inertia[1], inertia[2]]])
+    n_elements = len(y_nodes) - 1
+
+    # assemble the element stiffness matrices (degrees of freedom per node:
+    # w, w', u, u') in upper banded storage
+    element_inertia = (inertia[:, :, 1:] + inertia[:, :, :-1]) / 2
+    hermite = hermite_stiffness(np.diff(y_nodes))
+    n_dof = 4 * len(y_nodes)
+    bands = 7
+    stiffness = np.zeros((bands + 1, n_dof))
+    local = np.array([[4 * (i // 2) + 2 * field + i % 2 for i in range(4)]
+                      for field in range(2)])
+    for a in range(2):
+        for b in range(2):
+            block = E * element_inertia[a, b][:, np.newaxis, np.newaxis] \
+                * hermite
+            rows, columns = np.broadcast_arrays(
+                4 * np.arange(n_elements)[:, np.newaxis, np.newaxis]
+                + local[a][np.newaxis, :, np.newaxis],
+                4 * np.arange(n_elements)[:, np.newaxis, np.newaxis]
+                + local[b][np.newaxis, np.newaxis, :])
+            upper = rows <= columns
+            np.add.at(stiffness, (bands + rows[upper] - columns[upper],
+                                  columns[upper]), block[upper])
+
+    # load vector: the strip forces act at the middle of each strip
+    loads = np.zeros(n_dof)
+    element, shape = hermite_shape(y_nodes, y_ii)
+    for field, force in ((0, lift + weight_i), (1, drag)):
+        dofs = 4 * element[:, np.newaxis] + local[field][np.newaxis, :]
+        np.add.at(loads, dofs, force[:, np.newaxis] * shape)
+
+    # supports of the struts on w and u (and on w' and u' for a single
+    # strut, which would otherwise allow a rotation of the whole plate)
+    strut_dofs = 4 * strut_nodes[:, np.newaxis] + np.array([0, 2])
+    constrained = [] if strut_stiffness is not None else strut_dofs.ravel()
+    if strut_stiffness is not None:
+        stiffness[bands, strut_dofs.ravel()] += strut_stiffness
+    if strut_amount == 1:
+        constrained = np.concatenate((constrained,
+                                      4 * strut_nodes + 1, 4 * strut_nodes + 3)
+                                     ).astype(int)
+
+    # the constrained deflections are zero, so they are eliminated by
+    # replacing their rows and columns with those of the identity matrix
+    reduced = stiffness.copy()
+    reduced_loads = loads.copy()
+    for dof in constrained:
+        for k in range(1, bands + 1):
+            if dof + k < n_dof:
+                reduced[bands - k, dof + k] = 0.
+            if dof - k >= 0:
+                reduced[bands - k, dof] = 0.
+        reduced[bands, dof] = 1.
+        reduced_loads[dof] = 0.
+    displacement = solveh_banded(reduced, reduced_loads)
+    if not np.all(np.isfinite(displacement)):
+        raise ValueError("The finite element model of the main plate has "
+                         "no finite solution")
+
+    # support reactions on the main plate: forces at the struts, and for a
+    # single strut also the couples
+    reaction = banded_product(stiffness, displacement) - loads
+    if strut_stiffness is not None:
+        reaction[strut_dofs.ravel()] = -strut_stiffness \
+            * displacement[strut_dofs.ravel()]
+    f_struts_z, f_struts_x = reaction[strut_dofs[:, 0]], \
+        reaction[strut_dofs[:, 1]]
+
+    # bending moments from the equilibrium of the forces inboard of each
+    # node, including the strut forces and couples
+    moment_x_i = distributed_force_moment(
+        np.concatenate((lift + weight_i, f_struts_z)),
+        np.concatenate((y_ii, strut_locations)), y_i)
+    moment_z_i = distributed_force_moment(
+        np.concatenate((drag, f_struts_x)),
+        np.concatenate((y_ii, strut_locations)), y_i)
+    if strut_amount == 1:
+        outboard = y_i > strut_locations[0]
+        moment_x_i[outboard] -= reaction[4 * strut_nodes[0] + 1]
+        moment_z_i[outboard] -= reaction[4 * strut_nodes[0] + 3]
+    moment_x_i[-1] = moment_z_i[-1] = 0.
+
+    displacement = displacement.reshape((-1, 4))[strip_nodes]
+    w_i, theta_x_i = displacement[:, 0], displacement[:, 1]
+    u_i, theta_z_i = displacement[:, 2], displacement[:, 3]
+    f_strut_z = f_struts_z[np.argmax(np.abs(f_struts_z))]
+    f_strut_x = f_struts_x[np.argmax(np.abs(f_struts_x))]
+    return theta_x_i, theta_z_i, w_i, u_i, y_i, moment_x_i, moment_z_i, \
+        f_strut_z, f_strut_x
+
+
+def hermite_stiffness(length):
+    """
+    Function which returns the bending stiffness matrices of Euler-Bernoulli
+    beam elements with the given lengths and unit bending stiffness, for
+    the degrees of freedom (deflection, angle) of both nodes. It returns an
+    array of shape (n_elements, 4, 4).
+    """
+    L = np.asarray(length, dtype=float)[:, np.newaxis, np.newaxis]
+    coefficients = np.array([[12., 6., -12., 6.],
+                             [6., 4., -6., 2.],
+                             [-12., -6., 12., -6.],
+                             [6., 2., -6., 4.]])
+    powers = np.array([[3., 2., 3., 2.],
+                       [2., 1., 2., 1.],
+                       [3., 2., 3., 2.],
+                       [2., 1., 2., 1.]])
+    return coefficients / L ** powers
+
+
+def hermite_shape(y_nodes, y_points):
+    """
+    Function which returns the element in which each of the points is
+    located, and the values of the Hermite shape functions of that element
+    at the point, for the degrees of freedom (deflection, angle) of both
+    nodes. Points outside of the nodes are assigned to the first or last
+    element.
+    """
+    y_nodes = np.asarray(y_nodes, dtype=float)
+    y_points = np.asarray(y_points, dtype=float)
+    element = np.clip(np.searchsorted(y_nodes, y_points, side='right') - 1,
+                      0, len(y_nodes) - 2)
+    L = y_nodes[element + 1] - y_nodes[element]
+    xi = (y_points - y_nodes[element]) / L
+    shape = np.stack((1 - 3 * xi ** 2 + 2 * xi ** 3,
+                      L * (xi - 2 * xi ** 2 + xi ** 3),
+                      3 * xi ** 2 - 2 * xi ** 3,
+                      L * (xi ** 3 - xi ** 2)), axis=1)
+    return element, shape
+
+
+def banded_product(upper, vector):
+    """
+    Function which multiplies a symmetric banded matrix, given in upper
+    banded storage (upper[bands + i - j, j] is the entry (i, j) for
+    i <= j), with a vector.
+    """
+    bands = upper.shape[0] - 1
+    product = upper[bands] * vector
+    for k in range(1, bands + 1):
+        product[:-k] += upper[bands - k, k:] * vector[k:]
+        product[k:] += upper[bands - k, k:] * vector[:-k]
+    return product
+
+
 def normal_stress_due_to_strut(force_in_y, y_i, area_distribution,
                                strut_lat_location, spoiler_span,
                                strut_amount):
@@ -189,37 +382,11 @@ def normal_stress_due_to_strut(force_in_y, y_i, area_distribution,
     the normal force which is present due to the cant angle of the struts.
     """
 
-    # retrieve y-location of the struts
-    strut_location_1 = spoiler_span / 2 * (1 - strut_lat_location)
-    strut_location_2 = spoiler_span / 2 * (1 + strut_lat_location)
-    strut_locations = []
-    amount = strut_amount - floor(strut_amount / 2)
-    if strut_amount % 2 == 0:
-        for i in range(amount):
-            strut_locations.append(strut_lat_location * spoiler_span
-                                   / (strut_amount - 1) / 2 * (2 * i + 1)
-                                   + spoiler_span / 2)
-            strut_locations.append(-strut_lat_location * spoiler_span
-                                   / (strut_amount - 1) / 2 * (2 * i + 1)
-                                   + spoiler_span / 2)
-        strut_locations = sorted(strut_locations)
-    else:
-        for i in range(amount):
-            if i == 0:
-                strut_locations.append(spoiler_span / 2)
-            else:
-                strut_locations.append(strut_lat_location * spoiler_span
-                                       / (strut_amount - 1) * i
-                                       + spoiler_span / 2)
-                strut_locations.append(-strut_lat_location * spoiler_span
-                                       / (strut_amount - 1) * i
-                                       + spoiler_span / 2)
-        strut_locations = sorted(strut_locations)
-
-    total_strut_locations = strut_locations
-    total_strut_locations.append(0.)
-    total_strut_locations.append(spoiler_span)
-    total_strut_locations = sorted(total_strut_locations)
+    # retrieve y-location of the struts, including the tips of the spoiler
+    total_strut_locations = [0.] + strut_positions(spoiler_span,
+                                                   strut_lat_location,
+                                                   strut_amount) \
+        + [spoiler_span]
 
     normal_force = np.zeros(len(y_i))
     tsl = total_strut_locations
@@ -244,39 +411,50 @@ def normal_stress_due_to_strut(force_in_y, y_i, area_distribution,
     return sigma_y
 
 
+def cutout_offsets(line_coordinates, centroid_list):
+    """
+    Function which returns the x and z coordinates of the cutouts along the
+    spoiler w.r.t. their centroid, as arrays of shape (n_cuts, n_points).
+    Leading dimensions, for example one per main plate, are kept.
+    """
+    coordinates = np.asarray(line_coordinates, dtype=float)
+    centroids = np.asarray(centroid_list, dtype=float)
+    return (coordinates[..., 0] - centroids[..., 0, np.newaxis],
+            coordinates[..., 2] - centroids[..., 2, np.newaxis])
+
+
+def signed_extreme(values):
+    """
+    Function which returns the value with the largest magnitude of each row
+    of a 2D array, keeping its sign. If the maximum and minimum have the
+    same magnitude, the minimum is returned.
+    """
+    maximum = np.max(values, axis=1)
+    minimum = np.min(values, axis=1)
+    return np.where(np.abs(maximum) > np.abs(minimum), maximum, minimum)
+
+
 def bending_stress(moment_x, moment_z, Ixx, Izz, Ixz, line_coordinates,
                    centroid_list):
     """
     Function which calculates the normal stress along the spoiler due to the
-    bending moment along the spoiler. It returns an array of the normal
-    bending stress along the spoiler, as well as the maximum stress along
-    the spoiler.
+    bending moment along the spoiler. The coordinates of the cutouts are
+    given as an array of shape (n_cuts, n_points, 3) and the centroids as an
+    array of shape (n_cuts, 3). It returns an array of shape (n_cuts,
+    n_points) of the normal bending stress along the spoiler, as well as the
+    maximum (absolute) stress of each cutout.
     """
+    moment_x, moment_z, Ixx, Izz, Ixz = [
+        np.asarray(values, dtype=float)[:, np.newaxis]
+        for values in (moment_x, moment_z, Ixx, Izz, Ixz)]
 
-    # initialise the x and z coordinates along the span w.r.t. the centroid
-    x = []
-    z = []
-    for i in range(len(line_coordinates)):
-        x.append([])
-        z.append([])
-        for j in range(len(line_coordinates[0])):
-            x[i].append(line_coordinates[i][j][0] - centroid_list[i][0])
-            z[i].append(line_coordinates[i][j][2] - centroid_list[i][2])
+    # x and z coordinates of the cutouts w.r.t. their centroid
+    x, z = cutout_offsets(line_coordinates, centroid_list)
 
     # calculate the normal stress due to bending
-    sigma_y = []
-    sigma_y_max = []
-    for i in range(len(line_coordinates)):
-        sigma_y.append([])
-        for j in range(len(line_coordinates[i])):
-            calc_sigma = moment_x[i] * (Izz[i] * z[i][j] - Ixz[i] * x[i][j]) \
-                         / (Ixx[i] * Izz[i] - Ixz[i] ** 2) + moment_z[i] \
-                         * (Ixx[i] * x[i][j] - Ixz[i] * z[i][j]) \
-                         / (Ixx[i] * Izz[i] - Ixz[i] ** 2)
-            sigma_y[i].append(calc_sigma)
-        sigma_y_max.append(max(sigma_y[i])
-                           if abs(max(sigma_y[i])) > abs(min(sigma_y[i]))
-                           else min(sigma_y[i]))
+    sigma_y = (moment_x * (Izz * z - Ixz * x)
+               + moment_z * (Ixx * x - Ixz * z)) / (Ixx * Izz - Ixz ** 2)
+    sigma_y_max = signed_extreme(sigma_y)
 
     return sigma_y, sigma_y_max
 
@@ -285,67 +463,57 @@ def max_shear_stress(force_x, force_z, skin_thickness, Ixx, Izz, Ixz,
                      line_coordinates, centroid_list):
     """
     Function which calculates the shear stress along the spoiler due to the
-    lift and drag forces along the spoiler. It returns an array of the
-    maximum shear stress along the spoiler.
-    """
-
-    # initialise the x and z coordinates along the span w.r.t. the centroid
-    x = []
-    z = []
-    for i in range(len(line_coordinates)):
-        x.append([])
-        z.append([])
-        for j in range(len(line_coordinates[0])):
-            x[i].append(line_coordinates[i][j][0] - centroid_list[i][0])
-            z[i].append(line_coordinates[i][j][2] - centroid_list[i][2])
-
-    # basic shear flow along the cutout along the spoiler span
-    q_b = []  # basic shear flow
-    q_b_i = []  # integration of q_b for calculating the q_s,0
-    q_s_0 = []  # closed section shear flow
-    q_total = []  # q_total = q_b + q_s_0
-    tau_total = []  # actual shear stress
-    line_length = []
-    for i in range(len(line_coordinates) - 1):
-        q_b.append([0])
-        q_b_i.append([0])
-        line_length.append(np.sqrt((line_coordinates[i][0][0]
-                                    - line_coordinates[i][1][0]) ** 2
-                                   + (line_coordinates[i][0][2]
-                                      - line_coordinates[i][1][2]) ** 2))
-        for j in range(1, len(line_coordinates[0])):
-            q_b[i].append(q_b[i][j - 1]
-                          - (force_x[i] * Ixx[i] - force_z[i] * Ixz[i])
-                          / (Ixx[i] * Izz[i] - Ixz[i] ** 2) * skin_thickness
-                          * ((x[i][j] - x[i][j - 1]) / 2 * line_length[i]
-                             + x[i][j] * line_length[i]))
-            q_b_i[i].append(q_b_i[i][j - 1]
-                            - (force_x[i] * Ixx[i] - force_z[i] * Ixz[i])
-                            / (Ixx[i] * Izz[i] - Ixz[i] ** 2) * skin_thickness
-                            * ((x[i][j] - x[i][j - 1]) / 6
-                               * line_length[i] ** 2
-                               + x[i][j] / 2 * line_length[i] ** 2))
-
-    # Calculate total shear flow along the cutout along the spoiler span
-    for i in range(len(line_coordinates) - 1):
-        q_total.append([])
-        q_s_0.append(
-            sum(q_b_i[i]) / (line_length[i] * len(line_coordinates[0])))
-        for j in range(len(line_coordinates[0])):
-            q_total[i].append(q_b[i][j] + q_s_0[i])
+    lift and drag forces along the spoiler. The coordinates of the cutouts
+    are given as an array of shape (n_cuts, n_points, 3) and the centroids
+    as an array of shape (n_cuts, 3). It returns an array of the maximum
+    shear stress along the spoiler. Several spoilers, for example the main
+    plates, are calculated at once if all inputs have the same leading
+    dimension.
+    """
+    # x coordinates of the cutouts w.r.t. their centroid, without the last
+    # cutout
+    coordinates = np.asarray(line_coordinates, dtype=float)[..., :-1, :, :]
+    n_cuts, n_points = coordinates.shape[-3:-1]
+    x = cutout_offsets(coordinates,
+                       np.asarray(centroid_list)[..., :-1, :])[0]
+    force_x, force_z, Ixx, Izz, Ixz = [
+        np.asarray(values, dtype=float)[..., :n_cuts, np.newaxis]
+        for values in (force_x, force_z, Ixx, Izz, Ixz)]
+
+    # length of the (equidistant) line segments of each cutout
+    line_length = np.sqrt((coordinates[..., 0, 0]
+                           - coordinates[..., 1, 0]) ** 2
+                          + (coordinates[..., 0, 2]
+                             - coordinates[..., 1, 2]) ** 2)[..., np.newaxis]
+
+    # basic shear flow along the cutout along the spoiler span (q_b) and
+    # its integral for calculating the closed section shear flow (q_s,0)
+    factor = -(force_x * Ixx - force_z * Ixz) / (Ixx * Izz - Ixz ** 2) \
+        * skin_thickness
+    dx = np.diff(x, axis=-1)
+    q_b = np.zeros(x.shape)
+    q_b_i = np.zeros(x.shape)
+    q_b[..., 1:] = np.cumsum(factor * (dx / 2 * line_length
+                                       + x[..., 1:] * line_length), axis=-1)
+    q_b_i[..., 1:] = np.cumsum(factor * (dx / 6 * line_length ** 2
+                                         + x[..., 1:] / 2
+                                         * line_length ** 2), axis=-1)
+
+    # Calculate total shear flow (q_b + q_s,0) along the cutouts
+    q_s_0 = np.sum(q_b_i, axis=-1, keepdims=True) \
+        / (line_length * n_points)
+    q_total = q_b + q_s_0
 
     # Calculate the maximum shear stress
-    for i in range(len(line_coordinates) - 1):
-        if max(q_total[i]) > abs(min(q_total[i])):
-            tau_total.append(max(q_total[i]) / skin_thickness)
-        else:
-            tau_total.append(min(q_total[i]) / skin_thickness)
+    q_max = np.max(q_total, axis=-1)
+    q_min = np.min(q_total, axis=-1)
+    tau_total = np.where(q_max > np.abs(q_min), q_max, q_min) \
+        / skin_thickness
 
     # Mirror one half of the shear to the other side of the spoiler
-    half_index = floor(len(tau_total) / 2)
-    tau_total = tau_total[0:half_index] + tau_total[0:half_index][::-1]
-
-    return tau_total
+    half_index = floor(n_cuts / 2)
+    return np.concatenate((tau_total[..., :half_index],
+                           tau_total[..., :half_index][..., ::-1]), axis=-1)
 
 
 def buckling_modes(n_ribs, span, chord, skin_thickness, Ixx_list, Izz_list,
@@ -419,3 +587,127 @@ def failure_modes(max_tensile_stress, max_compression_stress,
         due_to_ribs = True
 
     return failure, due_to_ribs, failure_mode
+
+
+def thin_walled_section_properties(coordinates, skin_thickness):
+    """
+    Function which calculates the thin-walled sectional properties of all
+    cross sectional cutouts of the spoiler at once. The coordinates are given
+    as an array of shape (n_cuts, n_discretise, 3), in which each cutout is
+    discretised by straight line segments between consecutive points. It
+    returns the cross sectional area, the centroid, the moments of
+    inertia (Ixx, Izz and Ixz) and the area enclosed by each cutout, which
+    is used as the rib area.
+    """
+    coordinates = np.asarray(coordinates, dtype=float)
+    x = coordinates[:, :, 0]
+    y = coordinates[:, :, 1]
+    z = coordinates[:, :, 2]
+
+    # length, midpoint and direction of each of the line segments
+    dx = np.diff(x, axis=1)
+    dz = np.diff(z, axis=1)
+    length = np.sqrt(dx ** 2 + np.diff(y, axis=1) ** 2 + dz ** 2)
+    mid_x = (x[:, 1:] + x[:, :-1]) / 2
+    mid_z = (z[:, 1:] + z[:, :-1]) / 2
+    theta = np.where(np.abs(dx) < 10 ** -10, np.radians(90),
+                     np.arctan(dz / np.where(dx == 0., 1., dx)))
+
+    # cross sectional area and centroid of each cutout
+    segment_area = length * skin_thickness
+    area = np.sum(segment_area, axis=1)
+    centroid = np.stack((np.mean(mid_x, axis=1), np.mean(y, axis=1),
+                         np.mean(mid_z, axis=1)), axis=1)
+
+    # moment of inertia due to the displaced area of the line segments
+    x_bar = mid_x - centroid[:, 0, np.newaxis]
+    z_bar = mid_z - centroid[:, 2, np.newaxis]
+    ixx_area = np.sum(segment_area * z_bar ** 2, axis=1)
+    izz_area = np.sum(segment_area * x_bar ** 2, axis=1)
+    ixz_area = np.sum(segment_area * z_bar * x_bar, axis=1)
+
+    # moment of inertia of the (angled) rectangular line segments themselves
+    iu = 1 / 12 * length * skin_thickness ** 3
+    iw = 1 / 12 * skin_thickness * length ** 3
+    ixx_rectangle = np.sum((iu + iw) / 2 + (iu - iw) / 2 * np.cos(2 * theta),
+                           axis=1)
+    izz_rectangle = np.sum((iu + iw) / 2 - (iu - iw) / 2 * np.cos(2 * theta),
+                           axis=1)
+    ixz_rectangle = np.sum((iu - iw) / 2 * np.sin(2 * theta), axis=1)
+
+    moment_of_inertia = np.stack((ixx_area + ixx_rectangle,
+                                  izz_area + izz_rectangle,
+                                  ixz_area + ixz_rectangle), axis=1)
+
+    # area enclosed by each (closed) cutout, using the shoelace formula
+    enclosed_area = 0.5 * np.abs(np.sum(x * np.roll(z, -1, axis=1)
+                                        - np.roll(x, -1, axis=1) * z,
+                                        axis=1))
+
+    return area, centroid, moment_of_inertia, enclosed_area
+
+
+def equispaced_polylines(points, n_points):
+    """
+    Function which resamples polylines, given as an array of shape
+    (n_lines, n_samples, 3), to n_points equidistant points along each line
+    (measured along the line). The first and last point of each line are
+    kept, such that a closed line stays closed. It returns an array of shape
+    (n_lines, n_points, 3).
+    """
+    points = np.asarray(points, dtype=float)
+    n_samples = points.shape[1]
+
+    # normalised length along each of the lines at every sample
+    length = np.zeros(points.shape[:2])
+    length[:, 1:] = np.cumsum(np.linalg.norm(np.diff(points, axis=1),
+                                             axis=2), axis=1)
+    length = length / length[:, -1:]
+
+    # segment of each line in which the equidistant points are located
+    target = np.linspace(0., 1., n_points)
+    index = np.sum(length[:, np.newaxis, :] <= target[np.newaxis, :,
+                                                       np.newaxis],
+                   axis=2) - 1
+    index = np.clip(index, 0, n_samples - 2)
+    start = np.take_along_axis(length, index, axis=1)
+    end = np.take_along_axis(length, index + 1, axis=1)
+    fraction = ((target - start) / np.where(end > start, end - start, 1.)
+                )[:, :, np.newaxis]
+
+    start_points = np.take_along_axis(points, index[:, :, np.newaxis], axis=1)
+    end_points = np.take_along_axis(points, index[:, :, np.newaxis] + 1,
+                                    axis=1)
+    return start_points + fraction * (end_points - start_points)
+
+
+def plane_cuts(grid, y_planes):
+    """
+    Function which cuts a surface, sampled on a grid of shape (n_v, n_u, 3),
+    with the planes y = y_planes. Every iso-u column of the grid is a
+    polyline along the surface, which is intersected with each of the planes
+    by linear interpolation between the two samples that enclose the plane.
+    The columns do not need to be at a constant y, such that the cutouts lie
+    on the exact planes for any shape of the surface. The y-coordinate must
+    be monotone along each column. It returns an array of shape (n_planes,
+    n_u, 3).
+    """
+    grid = np.asarray(grid, dtype=float)
+    y_planes = np.asarray(y_planes, dtype=float)
+    if grid[-1, 0, 1] < grid[0, 0, 1]:
+        grid = grid[::-1]
+    y = grid[:, :, 1]
+
+    # segment of each column in which each of the planes is located
+    index = np.sum(y[:, np.newaxis, :] <= y_planes[np.newaxis, :,
+                                                   np.newaxis], axis=0) - 1
+    index = np.clip(index, 0, len(grid) - 2)
+    columns = np.arange(grid.shape[1])[np.newaxis, :]
+    start = grid[index, columns]
+    end = grid[index + 1, columns]
+    dy = end[:, :, 1] - start[:, :, 1]
+    fraction = ((y_planes[:, np.newaxis] - start[:, :, 1])
+                / np.where(dy != 0., dy, 1.))[:, :, np.newaxis]
+    cuts = start + fraction * (end - start)
+    cuts[:, :, 1] = y_planes[:, np.newaxis]
+    return cuts
@@ -0,0 +1,340 @@
+from collections import OrderedDict
+
+import numpy as np
+
+###############################################################################
+# VORTEX LATTICE METHODS                                                      #
+# In this file, an in-process vortex lattice method is defined, which can be  #
+# used instead of the external AVL executable. It follows the conventions of  #
+# AVL: the surfaces are flat, the incidence and camber of the sections only   #
+# rotate the normal vectors, and every panel holds a horseshoe vortex of      #
+# which the trailing legs run in positive x direction. Forces are calculated  #
+# with the Kutta-Joukowski theorem and the induced drag in the Trefftz plane. #
+# All results are non-dimensional, such that they do not depend on velocity,  #
+# and the lattice is solved once per geometry for all angles of attack.       #
+###############################################################################
+
+# Relative distance below which a vortex segment induces no velocity
+CORE_SIZE = 1e-8
+
+
+def section_geometry(points, chord_fractions):
+    """
+    Function which determines the AVL section properties from the points
+    of a (closed) airfoil curve in 3D. The trailing edge is the mid of the
+    first and last point and the leading edge is the point furthest from
+    the trailing edge. It returns the leading edge point, the chord, the
+    incidence angle [deg] (positive nose up) and the slope of the camber
+    line at the given chord fractions.
+    """
+    points = np.asarray(points, dtype=float)
+    trailing_edge = 0.5 * (points[0] + points[-1])
+    i_le = np.argmax(np.linalg.norm(points - trailing_edge, axis=1))
+    leading_edge = points[i_le]
+
+    # Chord direction and upward normal in the x-z plane
+    chord_vector = trailing_edge - leading_edge
+    chord = np.hypot(chord_vector[0], chord_vector[2])
+    x_axis = np.array([chord_vector[0], 0., chord_vector[2]]) / chord
+    z_axis = np.array([-x_axis[2], 0., x_axis[0]])
+    incidence = np.degrees(np.arctan2(-x_axis[2], x_axis[0]))
+
+    # Camber line as the mean of both sides of the airfoil
+    local_x = (points - leading_edge).dot(x_axis) / chord
+    local_z = (points - leading_edge).dot(z_axis) / chord
+    sides = []
+    for side in (slice(i_le, None, -1), slice(i_le, None)):
+        x_side, z_side = local_x[side], local_z[side]
+        order = np.argsort(x_side)
+        sides.append((x_side[order], z_side[order]))
+    grid = np.linspace(0., 1., 101)
+    camber = 0.5 * (np.interp(grid, *sides[0]) + np.interp(grid, *sides[1]))
+    slopes = np.interp(chord_fractions, grid, np.gradient(camber, grid))
+    return leading_edge, chord, incidence, slopes
+
+
+def surface_lattice(sections, n_chordwise, n_spanwise, angle):
+    """
+    Function which creates the vortex lattice of a surface from its
+    sections, as returned by section_geometry. Just like in AVL, the
+    spanwise vortices are distributed equally over the span of the whole
+    surface and the chordwise vortices equally over the chord. The bound
+    vortex is placed at the quarter chord and the control point at the
+    three quarter chord of each panel. The angle of the surface is added to
+    the incidence of all sections. Panels are ordered strip by strip, from
+    the first to the last section and from leading to trailing edge.
+    """
+    leading_edges = np.array([section[0] for section in sections])
+    chords = np.array([section[1] for section in sections])
+    incidences = np.radians([section[2] + angle for section in sections])
+    slopes = np.array([section[3] for section in sections])
+
+    # Spanwise stations, equidistant along the leading edge line
+    lengths = np.linalg.norm(np.diff(leading_edges[:, 1:], axis=0), axis=1)
+    section_s = np.concatenate(([0.], np.cumsum(lengths))) / np.sum(lengths)
+    station_s = np.linspace(0., 1., n_spanwise + 1)
+    strip_s = 0.5 * (station_s[:-1] + station_s[1:])
+
+    def interpolate(s, values):
+        return np.array([np.interp(s, section_s, column)
+                         for column in np.asarray(values).reshape(
+                             len(section_s), -1).T]).T
+
+    station_le = interpolate(station_s, leading_edges)
+    station_chord = interpolate(station_s, chords)[:, 0]
+    strip_le = interpolate(strip_s, leading_edges)
+    strip_chord = interpolate(strip_s, chords)[:, 0]
+    strip_incidence = interpolate(strip_s, incidences)[:, 0]
+    strip_slopes = interpolate(strip_s, slopes)
+
+    # Chordwise positions of the bound vortices and control points
+    fractions = np.arange(n_chordwise) / float(n_chordwise)
+    bound = fractions + 0.25 / n_chordwise
+    control = fractions + 0.75 / n_chordwise
+    x_axis = np.array([1., 0., 0.])
+
+    a = (station_le[:-1, None, :] + np.outer(
+        station_chord[:-1], bound)[:, :, None] * x_axis).reshape(-1, 3)
+    b = (station_le[1:, None, :] + np.outer(
+        station_chord[1:], bound)[:, :, None] * x_axis).reshape(-1, 3)
+    control_points = (strip_le[:, None, :] + np.outer(
+        strip_chord, control)[:, :, None] * x_axis).reshape(-1, 3)
+
+    # Normal vectors of the flat strips, rotated for incidence and camber
+    span_vectors = station_le[1:] - station_le[:-1]
+    flat_normals = np.cross(x_axis, span_vectors)
+    flat_normals /= np.linalg.norm(flat_normals, axis=1)[:, None]
+    rotation = (np.arctan(strip_slopes)
+                - strip_incidence[:, None]).reshape(-1)
+    normals = (np.cos(rotation)[:, None] * np.repeat(flat_normals,
+                                                     n_chordwise, axis=0)
+               - np.sin(rotation)[:, None] * x_axis)
+
+    return {'a': a, 'b': b, 'control_points': control_points,
+            'normals': normals,
+            'strip_edges': (station_le[:-1], station_le[1:]),
+            'strip_le': strip_le, 'strip_chord': strip_chord,
+            'strip_area': strip_chord * np.linalg.norm(span_vectors[:, 1:],
+                                                       axis=1),
+            'n_chordwise': n_chordwise}
+
+
+def mirror_lattice(lattice, y_duplicate):
+    """
+    Function which mirrors a vortex lattice in the plane y = y_duplicate,
+    like the YDUPLICATE keyword of AVL. The end points of the bound vortices
+    are swapped, such that a positive circulation gives lift on both sides.
+    """
+    def mirror(points):
+        mirrored = np.array(points, dtype=float)
+        mirrored[..., 1] = 2 * y_duplicate - mirrored[..., 1]
+        return mirrored
+
+    normals = np.array(lattice['normals'])
+    normals[:, 1] = -normals[:, 1]
+    return dict(lattice, a=mirror(lattice['b']), b=mirror(lattice['a']),
+                control_points=mirror(lattice['control_points']),
+                normals=normals,
+                strip_edges=(mirror(lattice['strip_edges'][1]),
+                             mirror(lattice['strip_edges'][0])),
+                strip_le=mirror(lattice['strip_le']))
+
+
+def horseshoe_velocities(points, a, b):
+    """
+    Function which calculates the velocity induced at each of the points by
+    each of the horseshoe vortices with unit circulation. The bound vortex
+    runs from a to b, and the trailing legs from a and b to infinity in
+    positive x direction. The result has the shape (points, vortices, 3).
+    """
+    r_a = points[:, None, :] - a[None, :, :]
+    r_b = points[:, None, :] - b[None, :, :]
+    length_a = np.linalg.norm(r_a, axis=2)
+    length_b = np.linalg.norm(r_b, axis=2)
+    x_axis = np.array([1., 0., 0.])
+    scale = CORE_SIZE * np.max(np.linalg.norm(b - a, axis=1)) ** 2
+
+    def segment(numerator, denominator):
+        safe = np.abs(denominator) > scale
+        return np.where(safe[:, :, None], numerator, 0.) \
+            / np.where(safe, denominator, 1.)[:, :, None]
+
+    bound = segment(np.cross(r_a, r_b) * (length_a + length_b)[:, :, None],
+                    length_a * length_b * (length_a * length_b
+                                           + np.sum(r_a * r_b, axis=2)))
+    leg_a = segment(np.cross(r_a, x_axis),
+                    length_a * (length_a - r_a[:, :, 0]))
+    leg_b = segment(np.cross(r_b, x_axis),
+                    length_b * (length_b - r_b[:, :, 0]))
+    return (bound + leg_a - leg_b) / (4 * np.pi)
+
+
+def trefftz_velocities(points, left, right):
+    """
+    Function which calculates the velocity induced in the Trefftz plane (the
+    y-z plane far behind the surfaces) at each of the points by the trailing
+    vortex pairs of each strip with unit circulation. The result has the
+    shape (points, strips, 2), with the y and z components.
+    """
+    velocity = np.zeros((len(points), len(left), 2))
+    for edges, sign in ((left, -1.), (right, 1.)):
+        dy = points[:, None, 0] - edges[None, :, 0]
+        dz = points[:, None, 1] - edges[None, :, 1]
+        distance = dy ** 2 + dz ** 2
+        distance = np.where(distance > 0., distance, np.inf)
+        velocity += sign * np.stack((-dz, dy), axis=2) \
+            / (2 * np.pi * distance[:, :, None])
+    return velocity
+
+
+def lattice_solution(lattices):
+    """
+    Function which solves the vortex lattice for the two unit components of
+    the freestream, in x and in z direction. Since the lattice is linear,
+    the solution for any angle of attack is a combination of these two, so
+    the influence matrix only has to be solved once per geometry. The
+    lattices are a dictionary with the name and a list of lattices
+    (original and mirrored) of each surface. All surfaces are solved as one
+    system, such that they influence each other. It returns the unit
+    circulations, the unit induced velocities at the bound vortices and in
+    the Trefftz plane, and the strip data of each surface.
+    """
+    names = list(lattices)
+    parts = [lattice for name in names for lattice in lattices[name]]
+    a = np.concatenate([part['a'] for part in parts])
+    b = np.concatenate([part['b'] for part in parts])
+    control_points = np.concatenate([part['control_points']
+                                     for part in parts])
+    normals = np.concatenate([part['normals'] for part in parts])
+
+    # Influence matrix, solved for both unit freestream components at once
+    influence = np.einsum('ijk,ik->ij',
+                          horseshoe_velocities(control_points, a, b),
+                          normals)
+    circulation = np.linalg.solve(influence, -normals[:, [0, 2]])
+    induced = np.einsum('ijk,jn->ink',
+                        horseshoe_velocities(0.5 * (a + b), a, b),
+                        circulation)
+
+    # Strip circulation and the velocity induced in the Trefftz plane
+    n_strips = sum(len(part['strip_chord']) for part in parts)
+    strip_index = np.repeat(np.arange(n_strips),
+                            [part['n_chordwise'] for part in parts
+                             for _ in range(len(part['strip_chord']))])
+    strip_circulation = np.zeros((n_strips, 2))
+    np.add.at(strip_circulation, strip_index, circulation)
+    left = np.concatenate([part['strip_edges'][0] for part in parts])[:, 1:]
+    right = np.concatenate([part['strip_edges'][1] for part in parts])[:, 1:]
+    trefftz = np.einsum('ijk,jn->ink', trefftz_velocities(
+        0.5 * (left + right), left, right), strip_circulation)
+
+    strips = {}
+    start = 0
+    for name in names:
+        end = start + sum(len(part['strip_chord'])
+                          for part in lattices[name])
+        strips[name] = slice(start, end)
+        start = end
+
+    return {'circulation': circulation, 'induced': induced,
+            'bound_vectors': b - a, 'strip_index': strip_index,
+            'strip_circulation': strip_circulation, 'trefftz': trefftz,
+            'strip_segments': right - left,
+            'strip_le': np.concatenate([part['strip_le'] for part in parts]),
+            'strip_chord': np.concatenate([part['strip_chord']
+                                           for part in parts]),
+            'strip_area': np.concatenate([part['strip_area']
+                                          for part in parts]),
+            'strips': strips}
+
+
+def vortex_lattice_analysis(solution, alphas, reference_area):
+    """
+    Function which returns the results of a solved vortex lattice (see
+    lattice_solution) for each of the angles of attack [deg], in the same
+    format as the AVL interface: a dictionary per case with the 'Totals'
+    (CLtot, CDind) and the 'StripForces' (Xle, Yle, Zle, Chord, Area, c cl,
+    cl, cd) of each surface. Only combinations of the unit solutions are
+    made, so no linear system is solved.
+    """
+    alphas = np.radians(np.atleast_1d(alphas))
+    components = np.stack((np.cos(alphas), np.sin(alphas)))
+    freestream = np.stack((components[0], np.zeros_like(alphas),
+                           components[1]), axis=1)
+    circulation = solution['circulation'].dot(components)
+
+    # Kutta-Joukowski forces on the bound vortices
+    velocity = freestream[None, :, :] + np.einsum(
+        'ink,na->iak', solution['induced'], components)
+    forces = circulation[:, :, None] * np.cross(
+        velocity, solution['bound_vectors'][:, None, :])
+    lift_axis = np.stack((-np.sin(alphas), np.zeros_like(alphas),
+                          np.cos(alphas)), axis=1)
+    panel_lift = np.einsum('ink,nk->in', forces, lift_axis)
+    strip_lift = np.zeros((len(solution['strip_chord']), len(alphas)))
+    np.add.at(strip_lift, solution['strip_index'], panel_lift)
+
+    # Induced drag in the Trefftz plane
+    segments = solution['strip_segments']
+    trefftz = np.einsum('ink,na->iak', solution['trefftz'], components)
+    normal_wash = trefftz[:, :, 0] * -segments[:, None, 1] \
+        + trefftz[:, :, 1] * segments[:, None, 0]
+    strip_drag = -0.5 * solution['strip_circulation'].dot(components) \
+        * normal_wash
+
+    # Non-dimensional results, with a unit velocity and density
+    strip_area = solution['strip_area']
+    strip_chord = solution['strip_chord']
+    strip_le = solution['strip_le']
+    strip_cl = strip_lift / (0.5 * strip_area[:, None])
+    strip_cd = strip_drag / (0.5 * strip_area[:, None])
+
+    results = []
+    for n in range(len(alphas)):
+        strip_forces = {}
+        for name, strips in solution['strips'].items():
+            strip_forces[name] = {
+                'Xle': list(strip_le[strips, 0]),
+                'Yle': list(strip_le[strips, 1]),
+                'Zle': list(strip_le[strips, 2]),
+                'Chord': list(strip_chord[strips]),
+                'Area': list(strip_area[strips]),
+                'c cl': list(strip_chord[strips] * strip_cl[strips, n]),
+                'cl': list(strip_cl[strips, n]),
+                'cd': list(strip_cd[strips, n])}
+        results.append({
+            'Totals': {'Alpha': np.degrees(alphas[n]),
+                       'CLtot': np.sum(strip_lift[:, n])
+                       / (0.5 * reference_area),
+                       'CDind': np.sum(strip_drag[:, n])
+                       / (0.5 * reference_area)},
+            'StripForces': strip_forces})
+    return results
+
+
+class SolutionCache(object):
+    """ In-memory cache of solved vortex lattices, keyed by a hash of the
+    geometry. When it is full, the least recently used solution is removed.
+    """
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self.solutions = OrderedDict()
+
+    def get(self, key, lattices_function):
+        """ Returns the solution of the given geometry key. If it is not in
+        the cache, the lattices are created with lattices_function and
+        solved. """
+        if key in self.solutions:
+            self.solutions.move_to_end(key)
+            return self.solutions[key]
+        solution = lattice_solution(lattices_function())
+        self.solutions[key] = solution
+        while len(self.solutions) > self.max_entries:
+            self.solutions.popitem(last=False)
+        return solution
+
+
+# The solutions are shared by all analyses in the process, such that a new
+# analysis of the same geometry (e.g. at another velocity) solves nothing.
+solution_cache = SolutionCache()
@@ -1,8 +1,12 @@
 from analysis.spoiler_files.assembly import Spoiler
 from analysis.section_properties import SectionProperties
+from analysis.spoiler_files.level_of_detail import mesh_deflection
 
 from parapy.geom import *
 from parapy.core import *
+from parapy.core.validate import OneOf
+
+import numpy as np
 
 
 ###############################################################################
@@ -15,6 +19,14 @@ from parapy.core import *
 # - The area of the ribs, as defined from the SectionalProperties class.      #
 # - The spoiler geometry, as defined in the Spoiler class.                    #
 # - The amount of struts used in the assembly.                                #
+# - The cross sectional area of the main plate skin at each spanwise cut, as  #
+#   defined from the SectionalProperties class.                               #
+# - (OPTIONAL) The method of the volume calculation: "analytic" integrates    #
+#   the sectional areas along the span, "occ" measures the OCC solids (thick  #
+#   shell, struts and endplates), which is slower but can be used to          #
+#   validate the analytic volumes.                                            #
+# - (OPTIONAL) The main plates in the weight: "critical" counts every plate   #
+#   with the weight of the first one, "all" scales it with each plate span.   #
 ###############################################################################
 
 class WeightEstimation(GeomBase):
@@ -25,6 +37,12 @@ class WeightEstimation(GeomBase):
     ribs_area = Input()
     spoiler_geometry = Input(in_tree=False)
     strut_amount = Input()
+    section_areas = Input()
+    volume_method = Input("analytic", validator=OneOf(["analytic", "occ"]))
+    # "critical" uses the weight of the first main plate for every plate,
+    # "all" uses the span of each plate
+    plate_mode = Input("critical", validator=OneOf(["critical", "all"]))
+    level_of_detail = Input("analysis")
 
     @Part(in_tree=False)
     def surface_lofted(self):
@@ -40,7 +58,8 @@ class WeightEstimation(GeomBase):
         the inside). """
         return ThickShell(built_from=self.surface_lofted,
                           offset=-self.spoiler_skin_thickness,
-                          mesh_deflection=1e-5)
+                          mesh_deflection=mesh_deflection(
+                              self.level_of_detail, fine=True))
 
     @Part(in_tree=False)
     def thick_mainplate_mirror(self):
@@ -50,27 +69,71 @@ class WeightEstimation(GeomBase):
                              reference_point=Point(0, 0, 0),
                              vector1=Vector(1, 0, 0),
                              vector2=Vector(0, 0, 1),
-                             mesh_deflection=1e-5)
+                             mesh_deflection=mesh_deflection(
+                                 self.level_of_detail, fine=True))
 
     @Attribute
     def volume_mainplate(self):
-        """ This attribute retrieves the volume of the thick main plate and
-        converts it to m^3. """
+        """ This attribute calculates the volume of the thick main plate in
+        m^3. For a thin skin, the volume is the cross sectional area of the
+        skin (perimeter times skin thickness) integrated along the span. The
+        sectional areas are given at equidistant cuts over the half-span. """
+        if self.volume_method == "occ":
+            return self.occ_volume_mainplate
+        half_span = self.spoiler_geometry.main_plate[0].span / 2 / 1000
+        areas = np.asarray(self.section_areas, dtype=float)
+        y = np.linspace(0., half_span, len(areas))
+        # trapezoidal rule, written out since np.trapz is removed in NumPy 2
+        return np.sum((areas[1:] + areas[:-1]) * np.diff(y))
+
+    @Attribute
+    def occ_volume_mainplate(self):
+        """ This attribute retrieves the volume of the OCC thick main plate
+        and converts it to m^3. """
         calculated_volume = abs(self.thick_mainplate.volume) * 2
         return calculated_volume / 10 ** 9
 
     @Attribute
     def volume_endplate(self):
-        """ This attribute retrieves the volume of a single endplate and
+        """ This attribute calculates the volume of a single endplate in
+        m^3. The swept endplate has the volume of a prism with the chord and
+        thickness as base (the small fillets are neglected). """
+        if not self.spoiler_geometry.endplate_present:
+            return 0.
+        if self.volume_method == "occ":
+            return self.occ_volume_endplate
+        endplates = self.spoiler_geometry.endplates
+        return endplates.chord * endplates.height * endplates.thickness \
+            / 10 ** 9
+
+    @Attribute
+    def occ_volume_endplate(self):
+        """ This attribute retrieves the volume of the OCC endplate and
         converts it to m^3. """
-        return self.spoiler_geometry.endplates.solid.built_from.volume / 10 ** 9 \
-            if self.spoiler_geometry.endplate_present else 0.
+        return self.spoiler_geometry.endplates.solid.built_from.volume \
+            / 10 ** 9
 
     @Attribute
     def volume_strut(self):
-        """ This attribute retrieves the volume of a single strut and
-        converts it to m^3. """
-        return self.spoiler_geometry.struts.struts_right[0].volume / 10 ** 9
+        """ This attribute calculates the volume of a single strut in m^3,
+        from the cross sectional area of the strut and its mean length. The
+        struts are cut off at the lower side of the main plate, so the
+        length differs from the strut height. """
+        if self.volume_method == "occ":
+            return self.occ_volume_strut
+        struts = self.spoiler_geometry.struts
+        return struts.struts.section_area * struts.mean_strut_length \
+            / 10 ** 9
+
+    @Attribute
+    def occ_volume_strut(self):
+        """ This attribute retrieves the mean volume of the OCC cut-off
+        struts and converts it to m^3. """
+        struts = self.spoiler_geometry.struts
+        volumes = [abs(strut.volume) for strut in struts.cut_struts]
+        weights = [1 if struts.strut_amount % 2 != 0 and index == 0 else 2
+                   for index in range(len(volumes))]
+        return np.average(volumes, weights=weights) / 10 ** 9
 
     @Attribute
     def volume_ribs(self):
@@ -110,10 +173,24 @@ class WeightEstimation(GeomBase):
         in kg. """
         return self.volume_ribs * self.material_density
 
+    @Attribute
+    def weight_mainplates(self):
+        """ This attribute calculates the weight of each of the main plates,
+        in kg. The weight of the first main plate is scaled with the span of
+        each plate, which differs due to the endplate cant. """
+        plates = self.spoiler_geometry.main_plate
+        return [self.weight_mainplate * plate.span / plates[0].span
+                for plate in plates]
+
     @Attribute
     def total_weight(self):
         """ This attribute calculates the total weight of the spoiler
         assembly, in kg. """
-        return self.weight_mainplate * self.spoiler_geometry.plate_amount \
+        if self.plate_mode == "all":
+            weight_mainplates = sum(self.weight_mainplates)
+        else:
+            weight_mainplates = self.weight_mainplate \
+                * self.spoiler_geometry.plate_amount
+        return weight_mainplates \
                + self.weight_endplate * 2  \
                + self.weight_strut * self.strut_amount + self.weight_ribs
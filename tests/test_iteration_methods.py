@@ -0,0 +1,82 @@
+import numpy as np
+
+from analysis.iteration_methods import find_root, bisect_monotone
+
+
+class Counted(object):
+    """ Function wrapper which counts the evaluations. """
+
+    def __init__(self, function):
+        self.function = function
+        self.evaluations = 0
+
+    def __call__(self, x):
+        self.evaluations += 1
+        return self.function(x)
+
+
+def test_find_root_converges():
+    function = Counted(lambda x: x ** 3 - 2.)
+    x, fx, evaluations, converged = find_root(function, 0., -2., 0.5, -10.,
+                                              10., 1e-10)
+    assert converged
+    assert np.isclose(x, 2. ** (1. / 3.))
+    assert abs(fx) <= 1e-10
+    assert evaluations == function.evaluations
+
+
+def test_find_root_at_start_value():
+    function = Counted(lambda x: x - 1.)
+    assert find_root(function, 1., 0., 0.5, 0., 2., 1e-6) == (1., 0., 0,
+                                                              True)
+    assert function.evaluations == 0
+
+
+def test_find_root_without_bracket():
+    # The root at x = -10 lies below the lower bound
+    function = Counted(lambda x: x + 10.)
+    x, fx, evaluations, converged = find_root(function, 0., 10., 1., -5.,
+                                              5., 1e-6)
+    assert (x, fx, converged) == (None, None, False)
+    assert evaluations == function.evaluations == 3
+
+
+def test_find_root_without_convergence():
+    function = Counted(lambda x: x ** 3 - 2.)
+    x, fx, evaluations, converged = find_root(function, 0., -2., 0.5, -10.,
+                                              10., 1e-12, max_evaluations=4)
+    assert not converged
+    assert evaluations == function.evaluations == 4
+    assert abs(fx) > 1e-12
+    assert 1. <= x <= 2.
+
+
+def test_bisect_monotone_converges():
+    is_feasible = Counted(lambda x: x >= 3.3)
+    value, evaluations = bisect_monotone(is_feasible, 1., 100., 1e-3)
+    assert 3.3 <= value <= 3.3 + 1e-3
+    assert evaluations == is_feasible.evaluations
+
+
+def test_bisect_monotone_feasible_lower_bound():
+    value, evaluations = bisect_monotone(lambda x: True, 1., 100., 1e-3)
+    assert (value, evaluations) == (1., 1)
+
+
+def test_bisect_monotone_infeasible_upper_limit():
+    is_feasible = Counted(lambda x: x >= 200.)
+    value, evaluations = bisect_monotone(is_feasible, 1., 100., 1e-3)
+    assert value is None
+    assert evaluations == is_feasible.evaluations
+    # The search stops at the upper limit: 1, 2, 4, ..., 64, 100
+    assert evaluations == 8
+
+
+def test_bisect_monotone_without_convergence():
+    is_feasible = Counted(lambda x: x >= 3.3)
+    value, evaluations = bisect_monotone(is_feasible, 1., 100., 1e-9,
+                                         max_evaluations=6)
+    # The last feasible value is returned, before the interval is small
+    assert is_feasible(value)
+    assert value - 3.3 > 1e-9
+    assert evaluations == 6
@@ -0,0 +1,33 @@
+import numpy as np
+
+from analysis.panel_method import panel_method
+
+
+def naca_symmetric(thickness, n_points=80):
+    """ Coordinates of a symmetric NACA 4-digit section with a closed
+    trailing edge, from the trailing edge over the upper side to the
+    leading edge and back over the lower side. """
+    x = 0.5 * (1 - np.cos(np.linspace(0., np.pi, n_points + 1)))
+    y = thickness / 0.2 * (0.2969 * np.sqrt(x) - 0.1260 * x
+                           - 0.3516 * x ** 2 + 0.2843 * x ** 3
+                           - 0.1036 * x ** 4)
+    return np.concatenate((np.stack((x[::-1], y[::-1]), axis=1),
+                           np.stack((x[1:], -y[1:]), axis=1)))
+
+
+def test_naca0012_matches_thin_airfoil_theory():
+    alphas = np.array([0., 2., 4., 8.])
+    c_l, c_m = panel_method(naca_symmetric(0.12), alphas)
+
+    # Thin airfoil lift slope, with the first order thickness correction
+    lift_slope = 2 * np.pi * (1 + 0.77 * 0.12)
+    assert np.isclose(c_l[0], 0., atol=1e-10)
+    assert np.allclose(c_l, lift_slope * np.radians(alphas), rtol=1e-2)
+    assert np.all(c_l[1:] > 2 * np.pi * np.radians(alphas[1:]))
+    # The moment about the quarter chord of a symmetric section is zero
+    assert np.allclose(c_m, 0., atol=1.5e-2)
+
+
+def test_thin_section_approaches_thin_airfoil_theory():
+    c_l, c_m = panel_method(naca_symmetric(0.01, n_points=160), 5.)
+    assert np.isclose(c_l[0], 2 * np.pi * np.radians(5.), rtol=1e-2)
@@ -0,0 +1,30 @@
+from analysis.polar_database import PolarDatabase
+
+ALPHA_RANGE = (0., 2., 1.)
+
+
+def polar(offset):
+    return [(alpha, 0.1 * alpha + offset, 0.01) for alpha in (0., 1., 2.)]
+
+
+def test_polars_of_separate_processes_are_kept(tmp_path):
+    # two databases on the same directory, as in parallel station workers
+    first = PolarDatabase(str(tmp_path))
+    second = PolarDatabase(str(tmp_path))
+    first.put("shape", 1.0e6, 9, ALPHA_RANGE, polar(0.))
+    second.put("shape", 2.0e6, 9, ALPHA_RANGE, polar(1.))
+
+    database = PolarDatabase(str(tmp_path))
+    assert database.get("shape", 1.0e6, 9, ALPHA_RANGE) == polar(0.)
+    assert database.get("shape", 2.0e6, 9, ALPHA_RANGE) == polar(1.)
+    assert database.get("shape", 1.0e6, 5, ALPHA_RANGE) is None
+
+
+def test_polar_is_interpolated_between_close_reynolds_numbers(tmp_path):
+    database = PolarDatabase(str(tmp_path), reynolds_tolerance=0.1)
+    database.put("shape", 1.00e6, 9, ALPHA_RANGE, polar(0.))
+    database.put("shape", 1.05e6, 9, ALPHA_RANGE, polar(1.))
+    interpolated = database.get("shape", 1.02e6, 9, ALPHA_RANGE)
+    assert len(interpolated) == 3
+    assert 0. < interpolated[0][1] < 1.
+    assert database.get("shape", 1.2e6, 9, ALPHA_RANGE) is None
@@ -0,0 +1,27 @@
+import os
+
+from analysis.result_cache import ResultCache, content_hash
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    for time, key in enumerate(["a", "b", "c"]):
+        cache.put(key, bytes(1000))
+        os.utime(cache.path(key), (1000. * (time + 1), 1000. * (time + 1)))
+    size = os.path.getsize(cache.path("a"))
+    cache.max_size = 3 * size
+
+    # Reading "a" makes "b" the least recently used result
+    assert cache.get("a") == bytes(1000)
+    cache.put("d", bytes(1000))
+    assert sorted(cache.keys()) == ["a", "c", "d"]
+    assert cache.get("b") is None
+
+    cache.put("e", bytes(1000))
+    assert sorted(cache.keys()) == ["a", "d", "e"]
+
+
+def test_content_hash_is_canonical():
+    assert content_hash({'a': 1, 'b': [2., 3.]}) \
+        == content_hash({'b': [2., 3.], 'a': 1})
+    assert content_hash({'a': 1}) != content_hash({'a': 2})
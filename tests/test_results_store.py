@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+import pytest
+
+from analysis.results_store import ResultsStore
+
+
+def test_append_and_read_round_trip(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    store.append_report({'inputs': {'spoiler_angle': 6.,
+                                    'spoiler_airfoils': ["cam", "naca6408"]},
+                         'weights': {'total_weight': 1.5,
+                                     'distribution': [1., 2., 3.]}})
+    store.append_report({'inputs': {'spoiler_angle': 8.},
+                         'weights': {'total_weight': 2.5,
+                                     'distribution': [4., 5.]},
+                         'error': "ValueError: no convergence"})
+    assert len(store) == 2
+
+    # The store is read again from disk, the numbers are memory-mapped
+    columns = ResultsStore(str(tmp_path)).read()
+    assert isinstance(columns['weights.total_weight'], np.memmap)
+    assert np.array_equal(columns['inputs.spoiler_angle'], [6., 8.])
+    assert np.array_equal(columns['weights.total_weight'], [1.5, 2.5])
+    assert np.array_equal(columns['weights.distribution'],
+                          [[1., 2., 3.], [4., 5., np.nan]], equal_nan=True)
+    assert columns['inputs.spoiler_airfoils'] == [["cam", "naca6408"], None]
+    # A column added later is filled with null for the earlier rows
+    assert columns['error'] == [None, "ValueError: no convergence"]
+
+
+def test_partially_written_row_is_removed(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    store.append({'a': 1., 'b': [1., 2.]})
+    store.append({'a': 2., 'b': [3., 4.]})
+    # Simulate a crash after only one of the columns was written
+    with open(store.path('a'), 'ab') as f:
+        f.write(store.encode('a', 3.))
+
+    store = ResultsStore(str(tmp_path))
+    assert len(store) == 2
+    assert os.path.getsize(store.path('a')) == 2 * store.row_size('a')
+    assert np.array_equal(store.column('a'), [1., 2.])
+
+
+def test_too_wide_value_is_rejected(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    store.append({'b': [1., 2.]})
+    with pytest.raises(ValueError):
+        store.append({'b': [1., 2., 3.]})
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from analysis.structural_methods import plane_cuts, \
+    thin_walled_section_properties
+
+
+def test_plane_cuts_of_sheared_surface():
+    # ellipse-like sections whose y-location varies along the chord, as for
+    # a section that is not normal to the span
+    u = np.linspace(0., 2 * np.pi, 60)
+    v = np.linspace(0., 1., 40)
+    x = np.cos(u)[np.newaxis, :] * (1 + v[:, np.newaxis])
+    y = v[:, np.newaxis] + 0.05 * x
+    z = 0.2 * np.sin(u)[np.newaxis, :] * np.ones((len(v), 1))
+    grid = np.stack((x, y, z), axis=2)
+
+    y_planes = np.array([0.3, 0.5, 0.7])
+    cuts = plane_cuts(grid, y_planes)
+    assert cuts.shape == (3, 60, 3)
+    assert np.allclose(cuts[:, :, 1], y_planes[:, np.newaxis])
+
+    # on the plane y = c, x = cos(u) * (1 + c - 0.05 * x)
+    expected_x = np.cos(u) * (1 + y_planes[:, np.newaxis]) \
+        / (1 + 0.05 * np.cos(u))
+    assert np.allclose(cuts[:, :, 0], expected_x, atol=1e-3)
+    assert np.allclose(cuts[:, :, 2], 0.2 * np.sin(u))
+
+
+def test_plane_cuts_of_reversed_grid():
+    v = np.linspace(0., 1., 11)
+    u = np.linspace(0., 1., 5)
+    grid = np.stack(np.broadcast_arrays(u[np.newaxis, :], v[:, np.newaxis],
+                                        v[:, np.newaxis] * 2), axis=2)
+    cuts = plane_cuts(grid[::-1], [0.25])
+    assert np.allclose(cuts[0, :, 2], 0.5)
+
+
+def test_parametric_cutouts_match_intersections():
+    pytest.importorskip("parapy")
+    from analysis.section_properties import SectionProperties
+
+    properties = {}
+    for method in ("intersection", "parametric"):
+        section = SectionProperties(airfoils=["cam", "naca6408", "naca6406"],
+                                    spoiler_span=2.,
+                                    spoiler_chord=0.3,
+                                    spoiler_angle=6.,
+                                    spoiler_skin_thickness=0.002,
+                                    n_ribs=2,
+                                    n_cuts=11,
+                                    cut_method=method)
+        properties[method] = thin_walled_section_properties(
+            section.section_coordinates, 0.002)
+
+    for intersection, parametric in zip(properties["intersection"],
+                                        properties["parametric"]):
+        assert np.allclose(parametric, intersection, rtol=1e-2,
+                           atol=1e-2 * np.max(np.abs(intersection)))
@@ -0,0 +1,59 @@
+import numpy as np
+
+from analysis.structural_methods import mainplate_bending_fe, \
+    mainplate_bending_xz, strut_positions
+
+E = 70e9
+SPAN = 1.6
+CHORD = 0.3
+
+
+def section_inertia(n):
+    return (np.full(n + 1, 1e-6), np.full(n + 1, 1e-5),
+            np.full(n + 1, 1e-7))
+
+
+def test_finite_element_matches_integration_for_two_struts():
+    n = 40
+    lift = np.full(n, -1000. / n)
+    drag = np.full(n, 50. / n)
+    arguments = (lift, drag, E) + section_inertia(n) \
+        + (2., 0.5, SPAN, CHORD, 0.6, 2)
+    fe = mainplate_bending_fe(*arguments)
+    integration = mainplate_bending_xz(*arguments)
+
+    assert np.isclose(fe[7], integration[7])
+    assert np.isclose(fe[8], integration[8])
+    for i in (5, 6):
+        assert np.allclose(fe[i], integration[i],
+                           atol=1e-6 * np.max(np.abs(integration[i])))
+    for i in (2, 3):
+        assert np.allclose(fe[i], integration[i],
+                           atol=2e-2 * np.max(np.abs(integration[i])))
+
+
+def test_finite_element_asymmetric_load_satisfies_statics():
+    n = 50
+    lift = np.linspace(-40., -10., n)
+    drag = np.linspace(1., 3., n)
+    fe = mainplate_bending_fe(lift, drag, E, *section_inertia(n), 0., 0.,
+                              SPAN, CHORD, 0.6, 2)
+    y_strips = (np.arange(n) + 0.5) * SPAN / n
+    s1, s2 = strut_positions(SPAN, 0.6, 2)
+
+    # strut reactions from the equilibrium of forces and moments
+    for force, reaction in ((lift, fe[7]), (drag, fe[8])):
+        r2 = -np.sum(force * (y_strips - s1)) / (s2 - s1)
+        r1 = -np.sum(force) - r2
+        assert np.isclose(reaction, max((r1, r2), key=abs))
+        assert not np.isclose(r1, r2)
+
+
+def test_finite_element_single_strut_and_fine_strips():
+    for n, strut_amount in ((40, 1), (4000, 3)):
+        lift = np.linspace(-40., -10., n) * 40 / n
+        fe = mainplate_bending_fe(lift, np.zeros(n), E, *section_inertia(n),
+                                  2., 0.5, SPAN, CHORD, 0.6, strut_amount)
+        for result in fe:
+            assert np.all(np.isfinite(result))
+        assert len(fe[2]) == n + 1
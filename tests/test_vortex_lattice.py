@@ -0,0 +1,43 @@
+import numpy as np
+
+from analysis.vortex_lattice import surface_lattice, mirror_lattice, \
+    lattice_solution, vortex_lattice_analysis
+
+
+def elliptic_wing(aspect_ratio, span=1., n_chordwise=4, n_spanwise=40):
+    """ Solve the lattice of a flat elliptic wing with a straight quarter
+    chord line and return its reference area and solution. """
+    root_chord = 4 * span / (np.pi * aspect_ratio)
+    y = np.linspace(0., span / 2, 41)
+    chords = root_chord * np.sqrt(np.clip(1 - (2 * y / span) ** 2, 0., None))
+    sections = [(np.array([-0.25 * chord, y_section, 0.]), chord, 0.,
+                 np.zeros(n_chordwise))
+                for y_section, chord in zip(y, chords)]
+    lattice = surface_lattice(sections, n_chordwise, n_spanwise, 0.)
+    solution = lattice_solution({'A': [lattice,
+                                       mirror_lattice(lattice, 0.)]})
+    return np.pi / 4 * root_chord * span, solution
+
+
+def test_elliptic_wing_matches_lifting_line():
+    aspect_ratio = 20.
+    reference_area, solution = elliptic_wing(aspect_ratio)
+    results = vortex_lattice_analysis(solution, [0., 4.], reference_area)
+    c_l = [result['Totals']['CLtot'] for result in results]
+    c_d = [result['Totals']['CDind'] for result in results]
+
+    # Lift curve slope and induced drag of an elliptic lift distribution
+    lift_slope = 2 * np.pi / (1 + 2 / aspect_ratio)
+    assert np.isclose(c_l[0], 0., atol=1e-12)
+    assert np.isclose((c_l[1] - c_l[0]) / np.radians(4.), lift_slope,
+                      rtol=3e-2)
+    assert np.isclose(c_d[1], c_l[1] ** 2 / (np.pi * aspect_ratio),
+                      rtol=2e-2)
+
+
+def test_mirrored_lift_is_symmetric():
+    reference_area, solution = elliptic_wing(8.)
+    strips = vortex_lattice_analysis(solution, 5., reference_area)[0][
+        'StripForces']['A']
+    cl = np.array(strips['cl'])
+    assert np.allclose(cl[:len(cl) // 2], cl[len(cl) // 2:])
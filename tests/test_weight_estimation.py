@@ -0,0 +1,40 @@
+import os
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_analytic_volumes_match_occ():
+    pytest.importorskip("parapy")
+    from Main import Main, read_main_inputs
+    from analysis.section_properties import SectionProperties
+    from analysis.weight_estimation import WeightEstimation
+
+    inputs = read_main_inputs(
+        os.path.join(ROOT, "inputs", "input_geometry.dat"),
+        os.path.join(ROOT, "inputs", "input_flow_conditions.dat"),
+        os.path.join(ROOT, "inputs", "input_material_properties.dat"))
+    spoiler = Main(**inputs).geometry
+    section = SectionProperties(airfoils=spoiler.spoiler_airfoils,
+                                spoiler_span=spoiler.spoiler_span / 1000,
+                                spoiler_chord=spoiler.spoiler_chord / 1000,
+                                spoiler_angle=spoiler.spoiler_angle,
+                                spoiler_skin_thickness=0.002,
+                                n_ribs=2,
+                                n_cuts=21)
+    weights = WeightEstimation(material_density=1.,
+                               spoiler_skin_thickness=2.,
+                               ribs_area=section.ribs_area,
+                               spoiler_geometry=spoiler,
+                               strut_amount=spoiler.strut_amount,
+                               section_areas=section.area_along_spoiler)
+
+    assert np.isclose(weights.volume_mainplate,
+                      weights.occ_volume_mainplate, rtol=5e-2)
+    assert np.isclose(weights.volume_strut,
+                      weights.occ_volume_strut, rtol=5e-2)
+    if spoiler.endplate_present:
+        assert np.isclose(weights.volume_endplate,
+                          weights.occ_volume_endplate, rtol=5e-2)